@@ -0,0 +1,282 @@
+"""
+Reproducible Benchmark Suite
+
+Builds workloads from the OSM place-name sample (optionally grown into a larger
+synthetic corpus) with typo'd query sets, and measures every distance kernel and
+index: build time, p50/p99 query latency, throughput and peak memory. Results are
+written to JSON; --compare flags regressions against a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --synthetic-size 20000 --only bktree_rapidfuzz,linear_rapidfuzz
+    python benchmarks/run_benchmarks.py --output new.json --compare baseline.json --tolerance 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from rapidfuzz.distance import Levenshtein
+from algorithms.levenshtein import levenshtein_distance
+from algorithms.bit_parallel import bit_parallel_levenshtein
+from algorithms.damerau_levenshtein import damerau_levenshtein_distance, bit_parallel_osa_distance
+from algorithms.weighted_edit_distance import weighted_edit_distance
+from optimizations.bk_tree import BKTree
+from optimizations.corpus_stream import iter_corpus
+from optimizations.sharded_bk_tree import ShardedBKForest
+from optimizations.vp_tree import VPTree
+from optimizations.parallel_processing import parallel_fuzzy_search, BatchScorer
+from techniques.ngram_search import NGramSearch
+from techniques.phonetic_search import PhoneticSearch
+from use_cases.tourism.search import TourismSearchEngine
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+ALPHABET = "abcdefghijklmnopqrstuvwxyz "
+
+# Pairwise kernels: name -> distance(str1, str2)
+KERNELS = {
+    'levenshtein': levenshtein_distance,
+    'bit_parallel_levenshtein': bit_parallel_levenshtein,
+    'damerau_levenshtein': damerau_levenshtein_distance,
+    'bit_parallel_osa': bit_parallel_osa_distance,
+    'weighted_edit_distance': lambda a, b: weighted_edit_distance(a, b, (1, 1, 1, 1)),
+    'rapidfuzz_levenshtein': Levenshtein.distance,
+}
+
+# Indexes: name -> (build(corpus, radius), query(index, query, radius))
+INDEXES = {
+    'linear_rapidfuzz': (
+        lambda corpus, k: BatchScorer(corpus),
+        lambda index, q, k: parallel_fuzzy_search(q, index, k, min_parallel_size=float('inf')),
+    ),
+    'bktree_python': (
+        lambda corpus, k: BKTree(corpus, levenshtein_distance),
+        lambda index, q, k: index.search(q, k),
+    ),
+    'bktree_rapidfuzz': (
+        lambda corpus, k: BKTree(corpus, Levenshtein.distance),
+        lambda index, q, k: index.search(q, k),
+    ),
+    'sharded_bk_forest': (
+        lambda corpus, k: ShardedBKForest(corpus, Levenshtein.distance, n_shards=8),
+        lambda index, q, k: index.search(q, k),
+    ),
+    'vptree_rapidfuzz': (
+        lambda corpus, k: VPTree(corpus, Levenshtein.distance),
+        lambda index, q, k: index.range_search(q, k),
+    ),
+    'ngram': (
+        lambda corpus, k: NGramSearch(corpus, n=3),
+        lambda index, q, k: index.search(q),
+    ),
+    'phonetic': (
+        lambda corpus, k: PhoneticSearch(corpus),
+        lambda index, q, k: index.search(q),
+    ),
+    'tourism_engine': (
+        lambda corpus, k: TourismSearchEngine(corpus, cache_size=0),
+        lambda index, q, k: index.search(q),
+    ),
+}
+
+# Metrics where a larger value is a regression (throughput is the only "higher is better")
+LOWER_IS_BETTER = ('build_seconds', 'p50_ms', 'p99_ms', 'peak_memory_bytes', 'mean_us')
+HIGHER_IS_BETTER = ('queries_per_second',)
+
+
+def synthesize_corpus(base, size, seed=0):
+    """
+    Grow a corpus to `size` distinct names by recombining and mutating base tokens.
+
+    Args:
+        base (list): Seed names (e.g. the OSM sample).
+        size (int): Target number of names.
+        seed (int): Random seed.
+
+    Returns:
+        list: `base` followed by synthetic names.
+    """
+    rng = random.Random(seed)
+    tokens = [t for name in base for t in name.split()]
+    corpus = list(dict.fromkeys(base))
+    seen = set(corpus)
+    while len(corpus) < size:
+        name = " ".join(rng.choice(tokens) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.5:
+            name = add_typos(name, 1, rng)
+        if name not in seen:
+            seen.add(name)
+            corpus.append(name)
+    return corpus[:size]
+
+
+def add_typos(s, edits, rng):
+    """Apply random insertions, deletions, substitutions and transpositions"""
+    s = list(s)
+    for _ in range(edits):
+        op = rng.choice(('insert', 'delete', 'substitute', 'transpose'))
+        i = rng.randrange(len(s) + 1)
+        if op == 'insert' or not s:
+            s.insert(i, rng.choice(ALPHABET))
+        elif op == 'delete':
+            del s[min(i, len(s) - 1)]
+        elif op == 'substitute':
+            s[min(i, len(s) - 1)] = rng.choice(ALPHABET)
+        elif len(s) > 1:
+            i = min(i, len(s) - 2)
+            s[i], s[i + 1] = s[i + 1], s[i]
+    return "".join(s)
+
+
+def make_queries(corpus, count, max_edits, seed=0):
+    """Sample corpus names and corrupt each with 0..max_edits random typos"""
+    rng = random.Random(seed)
+    return [add_typos(rng.choice(corpus), rng.randint(0, max_edits), rng) for _ in range(count)]
+
+
+def _percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _peak_memory(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_kernel(kernel, pairs):
+    """Mean per-call latency of a pairwise distance function"""
+    start = time.perf_counter()
+    for a, b in pairs:
+        kernel(a, b)
+    elapsed = time.perf_counter() - start
+    return {'pairs': len(pairs), 'mean_us': elapsed / len(pairs) * 1e6}
+
+
+def bench_index(build, query, corpus, queries, radius):
+    """Build time, peak build memory, latency percentiles and throughput of one index"""
+    start = time.perf_counter()
+    index = build(corpus, radius)
+    build_seconds = time.perf_counter() - start
+    # Memory is measured on a separate build, since tracing distorts timings
+    del index
+    index, peak = _peak_memory(lambda: build(corpus, radius))
+
+    latencies = []
+    total_start = time.perf_counter()
+    for q in queries:
+        t0 = time.perf_counter()
+        query(index, q, radius)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - total_start
+    latencies.sort()
+    return {
+        'build_seconds': build_seconds,
+        'peak_memory_bytes': peak,
+        'p50_ms': _percentile(latencies, 50) * 1e3,
+        'p99_ms': _percentile(latencies, 99) * 1e3,
+        'queries_per_second': len(queries) / total if total else float('inf'),
+    }
+
+
+def run(corpus, queries, radius=2, pairs=2000, only=None, seed=0):
+    """
+    Run every selected benchmark.
+
+    Returns:
+        dict: Results keyed by "kernel/<name>" and "index/<name>".
+    """
+    rng = random.Random(seed)
+    pair_list = [(rng.choice(queries), rng.choice(corpus)) for _ in range(pairs)]
+    results = {}
+    for name, kernel in KERNELS.items():
+        if only and name not in only:
+            continue
+        results[f'kernel/{name}'] = bench_kernel(kernel, pair_list)
+    for name, (build, query) in INDEXES.items():
+        if only and name not in only:
+            continue
+        results[f'index/{name}'] = bench_index(build, query, corpus, queries, radius)
+    return results
+
+
+def compare(current, baseline, tolerance=0.10):
+    """
+    Flag metrics that got worse than the baseline by more than `tolerance`.
+
+    Returns:
+        list: Tuples (benchmark, metric, baseline value, current value, relative change).
+    """
+    regressions = []
+    for bench, metrics in current.items():
+        for metric, value in metrics.items():
+            old = baseline.get(bench, {}).get(metric)
+            if not old or not isinstance(value, (int, float)):
+                continue
+            change = (value - old) / old
+            if (metric in LOWER_IS_BETTER and change > tolerance) or \
+                    (metric in HIGHER_IS_BETTER and change < -tolerance):
+                regressions.append((bench, metric, old, value, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark distance kernels and indexes")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--synthetic-size', type=int, default=0,
+                        help="Grow the corpus to this many names (0 = use it as is)")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--max-edits', type=int, default=2)
+    parser.add_argument('--radius', type=int, default=2)
+    parser.add_argument('--pairs', type=int, default=2000, help="Pairs timed per kernel")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', help="Comma-separated kernel/index names")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    corpus = list(iter_corpus(args.corpus))
+    if args.synthetic_size:
+        corpus = synthesize_corpus(corpus, args.synthetic_size, args.seed)
+    queries = make_queries(corpus, args.queries, args.max_edits, args.seed)
+    only = set(args.only.split(',')) if args.only else None
+
+    results = run(corpus, queries, args.radius, args.pairs, only, args.seed)
+    report = {
+        'meta': {
+            'corpus': os.path.basename(args.corpus), 'corpus_size': len(corpus),
+            'queries': len(queries), 'max_edits': args.max_edits, 'radius': args.radius,
+            'seed': args.seed, 'python': platform.python_version(), 'machine': platform.machine(),
+        },
+        'results': results,
+    }
+    for bench, metrics in results.items():
+        print(bench, " ".join(f"{k}={v:.4g}" for k, v in metrics.items()))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for bench, metric, old, new, change in regressions:
+            print(f"REGRESSION {bench} {metric}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
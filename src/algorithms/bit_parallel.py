@@ -4,11 +4,100 @@ Bit-Parallel Implementation of Levenshtein Distance
 This module provides a bit-parallel implementation of the Levenshtein distance algorithm,
 which uses bitwise operations to optimize performance.
 
+The pattern (the shorter string) is compiled once into per-symbol match bit-masks, so the
+same compiled pattern can be reused against many texts. Patterns may be `str` or
+integer-encoded sequences (see `algorithms.encoding`); for encoded input the masks are a
+flat list indexed by symbol code instead of a dict.
+
+The semi-global variant (`SemiGlobalMatcher`, `find_approximate`) finds approximate
+occurrences of many patterns inside a long text: the top row of the matrix is zero, so a
+match may start anywhere, patterns of equal length are packed into the lanes of one
+bit-vector, and the text is consumed as a stream in a single pass.
+
 References:
 - Myers, G. (1999). "A fast bit-vector algorithm for approximate string matching based on dynamic programming".
   Journal of the ACM, 46(3), 395-415.
+- Hyyrö, H. (2001). "Explaining and extending the bit-parallel approximate string matching
+  algorithm of Myers". Technical Report A-2001-10, University of Tampere.
+- Hyyrö, H., Fredriksson, K., & Navarro, G. (2005). "Increased bit-parallelism for
+  approximate and multiple string matching". ACM Journal of Experimental Algorithmics, 10.
 """
 
+from collections import deque
+
+
+class _MatchMasks(dict):
+    """Symbol -> match mask; symbols absent from the pattern map to 0 without being stored"""
+
+    def __missing__(self, key):
+        return 0
+
+
+def compile_pattern(pattern, alphabet_size=None):
+    """
+    Precompute the match bit-masks of a pattern.
+
+    Args:
+        pattern (str or sequence of int): The pattern.
+        alphabet_size (int): For integer-encoded patterns, the number of symbol codes;
+            the masks are then returned as a list indexed by code, with one extra
+            all-zero mask for the unknown code `alphabet_size` (see
+            `Alphabet.encode_known`).
+
+    Returns:
+        dict or list: Bit i of mask[symbol] is set where pattern[i] == symbol. An
+        unknown code matches nothing, in the pattern as in the text.
+    """
+    if alphabet_size is None:
+        peq = _MatchMasks()
+        for i, symbol in enumerate(pattern):
+            peq[symbol] |= 1 << i
+        return peq
+    peq = [0] * (alphabet_size + 1)
+    for i, symbol in enumerate(pattern):
+        if symbol < alphabet_size:
+            peq[symbol] |= 1 << i
+    return peq
+
+
+def myers_distance(peq, m, text):
+    """
+    Levenshtein distance between a compiled pattern of length m and a text.
+
+    Args:
+        peq (dict or list): Match masks from `compile_pattern`.
+        m (int): Length of the pattern.
+        text (str or sequence of int): The text.
+
+    Returns:
+        int: The Levenshtein distance.
+    """
+    if m == 0:
+        return len(text)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    VP = mask
+    VN = 0
+    score = m
+
+    for symbol in text:
+        PM = peq[symbol]
+        D0 = ((((PM & VP) + VP) ^ VP) | PM | VN) & mask
+        HP = VN | (~(D0 | VP) & mask)
+        HN = VP & D0
+        if HP & last:
+            score += 1
+        elif HN & last:
+            score -= 1
+        HP = (HP << 1) | 1
+        HN = HN << 1
+        VP = (HN | ~(D0 | HP)) & mask
+        VN = HP & D0 & mask
+
+    return score
+
+
 def bit_parallel_levenshtein(str1, str2):
     """
     Compute the Levenshtein distance between two strings using bit-parallel operations.
@@ -23,27 +112,277 @@ def bit_parallel_levenshtein(str1, str2):
     if len(str1) < len(str2):
         return bit_parallel_levenshtein(str2, str1)
 
-    if len(str2) == 0:
-        return len(str1)
+    return myers_distance(compile_pattern(str2), len(str2), str1)
 
-    # Initialize bit vectors
-    Peq = {}
-    for i, char in enumerate(str2):
-        Peq[char] = (Peq.get(char, 0) | (1 << i))
 
-    # Initialize state vectors
-    VP = (1 << len(str2)) - 1
-    VN = 0
+def bit_parallel_levenshtein_encoded(seq1, seq2, alphabet_size):
+    """
+    Bit-parallel Levenshtein distance of two integer-encoded strings.
 
-    for char in str1:
-        # Compute the new state vectors
-        X = Peq.get(char, 0) | VN
-        D0 = ((VP + (X & VP)) ^ VP) | X
+    Args:
+        seq1 (sequence of int): The first encoded string (e.g. an `EncodedCorpus` view).
+        seq2 (sequence of int): The second encoded string.
+        alphabet_size (int): Number of symbol codes in use; either string may hold the
+            unknown code `alphabet_size` (a query character outside the corpus alphabet).
+
+    Returns:
+        int: The Levenshtein distance between seq1 and seq2.
+    """
+    if len(seq1) < len(seq2):
+        seq1, seq2 = seq2, seq1
+
+    return myers_distance(compile_pattern(seq2, alphabet_size), len(seq2), seq1)
+
+
+def _lane_add(a, b, high):
+    """Add packed lanes independently: the carry out of a lane's top bit is dropped"""
+    return ((a & ~high) + (b & ~high)) ^ ((a ^ b) & high)
+
+
+def _prefix_scores(peq, m, text):
+    """Distances between the pattern and every prefix of `text`, longest prefix last"""
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    VP = mask
+    VN = 0
+    score = m
+    scores = [m]
+    for symbol in text:
+        PM = peq[symbol]
+        D0 = ((((PM & VP) + VP) ^ VP) | PM | VN) & mask
+        HP = VN | (~(D0 | VP) & mask)
         HN = VP & D0
-        HP = VN | ~(VP | D0)
-        X = HP << 1 | 1
-        VN = X & D0
-        VP = (HN << 1) | ~(X | D0)
+        if HP & last:
+            score += 1
+        elif HN & last:
+            score -= 1
+        HP = (HP << 1) | 1
+        HN = HN << 1
+        VP = (HN | ~(D0 | HP)) & mask
+        VN = HP & D0 & mask
+        scores.append(score)
+    return scores
 
-    # The Levenshtein distance is the number of set bits in VN
-    return bin(VN).count('1')
\ No newline at end of file
+
+class _PatternBlock:
+    """
+    Patterns packed side by side into lanes of equal width w (lane i in bits [i*w, (i+1)*w)).
+
+    A pattern shorter than w is right-aligned in its lane and preceded by wildcard rows
+    that match every symbol and start at distance 0; they keep the row above the pattern
+    at zero, so every lane still computes the plain semi-global distance.
+
+    The block only holds the compiled masks; the DP columns of a scan live in `_BlockScan`.
+    """
+
+    def __init__(self, width, pattern_ids, patterns, max_distance):
+        self.m = m = width
+        self.pattern_ids = pattern_ids
+        n = len(pattern_ids)
+        self.lane_mask = (1 << m) - 1
+        self.mask = (1 << (n * m)) - 1
+        low = sum(1 << (i * m) for i in range(n))
+        self.high = low << (m - 1)
+        self.not_low = self.mask & ~low
+        # Scores are stored in the lanes of C; C + bias carries out of a lane exactly
+        # when that lane's score exceeds max_distance
+        self.bias = low * max(0, self.lane_mask - max_distance)
+        self.peq = {}
+        self.pad = 0
+        self.VP = 0
+        self.C = 0
+        for i, p in enumerate(pattern_ids):
+            offset = i * m + m - len(patterns[p])
+            self.pad |= (1 << offset) - (1 << (i * m))
+            self.VP |= ((1 << len(patterns[p])) - 1) << offset
+            self.C |= len(patterns[p]) << (i * m)
+            for j, symbol in enumerate(patterns[p]):
+                self.peq[symbol] = self.peq.get(symbol, 0) | (1 << (offset + j))
+
+
+class _BlockScan:
+    """DP columns of one `_PatternBlock` over the text scanned so far"""
+
+    def __init__(self, block):
+        self.block = block
+        self.VP = block.VP
+        self.VN = 0
+        self.C = block.C
+        self.hits = 0
+
+    def step(self, symbol):
+        """Advance every lane by one text symbol; returns the bits of lanes within k"""
+        block = self.block
+        m, high, mask = block.m, block.high, block.mask
+        VP, VN = self.VP, self.VN
+        Eq = block.peq.get(symbol, 0) | block.pad
+        Xv = Eq | VN
+        Xh = (_lane_add(Eq & VP, VP, high) ^ VP) | Eq
+        Ph = VN | (~(Xh | VP) & mask)
+        Mh = VP & Xh
+        self.C += ((Ph & high) >> (m - 1)) - ((Mh & high) >> (m - 1))
+        # No carry-in: row 0 of the semi-global matrix is all zeros
+        Ph = (Ph << 1) & block.not_low
+        Mh = (Mh << 1) & block.not_low
+        self.VP = Mh | (~(Xv | Ph) & mask)
+        self.VN = Ph & Xv
+
+        C, bias = self.C, block.bias
+        S = _lane_add(C, bias, high)
+        carry = ((C & bias) | ((C | bias) & ~S)) & high
+        return high & ~carry
+
+    def score(self, lane):
+        return (self.C >> (lane * self.block.m)) & self.block.lane_mask
+
+
+class SemiGlobalMatcher:
+    def __init__(self, patterns, max_distance, max_padding=0.5):
+        """
+        Find approximate occurrences of many patterns in a streamed text.
+
+        Patterns of similar length share one packed bit-vector, so every text symbol
+        costs a constant number of big-integer operations per block, and lanes are only
+        visited individually when they are within `max_distance`. A pattern no longer
+        than `max_distance` matches everywhere.
+
+        The compiled blocks are read-only: `scan` starts an independent scan of another
+        text, so one matcher can be kept and shared between threads. `feed` and `finish`
+        drive a default scan, restarted once it is finished.
+
+        Args:
+            patterns (list): Non-empty pattern strings; matches refer to them by index.
+            max_distance (int): The maximum allowed Levenshtein distance.
+            max_padding (float): A block's lane width may exceed its shortest pattern by
+                this fraction; more padding means fewer, wider blocks.
+        """
+        self.patterns = list(patterns)
+        self.max_distance = max_distance
+        # Lengths are grouped greedily; each block's lanes are as wide as its longest pattern
+        by_length = {}
+        for p, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError("patterns must be non-empty")
+            by_length.setdefault(len(pattern), []).append(p)
+        groups = []
+        for m in sorted(by_length):
+            if not groups or m > groups[-1][0] * (1 + max_padding):
+                groups.append((m, []))
+            groups[-1][1].extend(by_length[m])
+        self.blocks = [_PatternBlock(len(self.patterns[ids[-1]]), ids, self.patterns, max_distance)
+                       for _, ids in groups]
+        self.window = max(by_length, default=0) + max_distance
+        self._reversed = {}  # Compiled reversed patterns, filled by the scans that need them
+        self._scan = None
+
+    def scan(self):
+        """
+        Start scanning a new text.
+
+        Returns:
+            SemiGlobalScan: Scan state with its own `feed` and `finish`.
+        """
+        return SemiGlobalScan(self)
+
+    def feed(self, chunk):
+        """Process the next piece of the text with the default scan (see `SemiGlobalScan.feed`)"""
+        if self._scan is None:
+            self._scan = self.scan()
+        return self._scan.feed(chunk)
+
+    def finish(self):
+        """Flush the default scan's open occurrences; the next `feed` starts a new text"""
+        scan, self._scan = self._scan, None
+        return scan.finish() if scan is not None else []
+
+    def _reversed_pattern(self, p):
+        # Benign race: concurrent scans compile identical masks
+        compiled = self._reversed.get(p)
+        if compiled is None:
+            compiled = self._reversed[p] = compile_pattern(self.patterns[p][::-1])
+        return compiled
+
+
+class SemiGlobalScan:
+    """Per-text state of a `SemiGlobalMatcher`: the DP columns and the open match runs"""
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.blocks = [_BlockScan(block) for block in matcher.blocks]
+        self._recent = deque(maxlen=matcher.window)
+        self._position = 0
+        self._runs = {}  # (block, lane) -> (distance, end, window) of the run's best end
+
+    def feed(self, chunk):
+        """
+        Process the next piece of the text.
+
+        Args:
+            chunk (str or sequence): Text symbols following the previously fed ones.
+
+        Returns:
+            list: Occurrences completed so far, as tuples
+            (pattern index, start, end, distance) with text[start:end] the match.
+        """
+        found = []
+        for symbol in chunk:
+            self._recent.append(symbol)
+            self._position += 1
+            for b, block in enumerate(self.blocks):
+                hits = block.step(symbol)
+                ended = block.hits & ~hits
+                block.hits = hits
+                m = block.block.m
+                while ended:
+                    bit = ended & -ended
+                    ended ^= bit
+                    found.append(self._emit((b, (bit.bit_length() - 1) // m)))
+                while hits:
+                    bit = hits & -hits
+                    hits ^= bit
+                    lane = (bit.bit_length() - 1) // m
+                    distance = block.score(lane)
+                    best = self._runs.get((b, lane))
+                    if best is None or distance < best[0]:
+                        self._runs[(b, lane)] = (distance, self._position, tuple(self._recent))
+        return found
+
+    def finish(self):
+        """Flush the occurrences still open at the end of the text"""
+        found = [self._emit(run) for run in list(self._runs)]
+        for block in self.blocks:
+            block.hits = 0
+        return sorted(found, key=lambda x: (x[2], x[0]))
+
+    def _emit(self, run):
+        """Locate the start of a run's best end with a reverse pass over its window"""
+        distance, end, window = self._runs.pop(run)
+        b, lane = run
+        p = self.blocks[b].block.pattern_ids[lane]
+        m = len(self.matcher.patterns[p])
+        scores = _prefix_scores(self.matcher._reversed_pattern(p), m, window[::-1])
+        length = min(range(len(scores)), key=lambda L: (scores[L], abs(L - m)))
+        return (p, end - length, end, distance)
+
+
+def find_approximate(patterns, text, max_distance):
+    """
+    Find every approximate occurrence of the patterns in a text, in one pass.
+
+    Each maximal run of end positions within `max_distance` is reported once, at its
+    lowest-distance end.
+
+    Args:
+        patterns (list): Non-empty pattern strings.
+        text (str or iterable of str): The text, or a stream of text chunks.
+        max_distance (int): The maximum allowed Levenshtein distance.
+
+    Returns:
+        list: Tuples (pattern index, start, end, distance), ordered by end then pattern.
+    """
+    scan = SemiGlobalMatcher(patterns, max_distance).scan()
+    found = []
+    for chunk in ([text] if isinstance(text, str) else text):
+        found.extend(scan.feed(chunk))
+    found.extend(scan.finish())
+    return sorted(found, key=lambda x: (x[2], x[0]))
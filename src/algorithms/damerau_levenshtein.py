@@ -8,8 +8,14 @@ References:
 - Damerau, F. J. (1964). "A technique for computer detection and correction of spelling errors".
   Communications of the ACM, 7(3), 171-176.
 - Wikipedia: Damerau-Levenshtein distance. https://en.wikipedia.org/wiki/Damerau-Levenshtein_distance
+- Hyyrö, H. (2003). "A bit-vector algorithm for computing Levenshtein and Damerau edit distances".
+  Nordic Journal of Computing, 10(1), 29-39.
 """
 
+from rapidfuzz.distance import DamerauLevenshtein
+
+from algorithms.bit_parallel import compile_pattern
+
 def damerau_levenshtein_distance(str1, str2):
     """
     Compute the Damerau-Levenshtein distance between two strings.
@@ -48,4 +54,114 @@ def damerau_levenshtein_distance(str1, str2):
                     d[(i - 2, j - 2)] + substitution_cost  # Transposition
                 )
 
-    return d[(len1 - 1, len2 - 1)]
\ No newline at end of file
+    return d[(len1 - 1, len2 - 1)]
+
+
+def unrestricted_damerau_levenshtein_distance(str1, str2):
+    """
+    Compute the unrestricted Damerau-Levenshtein distance between two strings.
+
+    Unlike the optimal string alignment distance above, a transposed pair may be
+    edited again, which makes this distance a metric and never larger than the OSA
+    distance: it can route a BK-tree whose results are then rescored with OSA.
+
+    Args:
+        str1 (str): The first string.
+        str2 (str): The second string.
+
+    Returns:
+        int: The unrestricted Damerau-Levenshtein distance between str1 and str2.
+    """
+    return DamerauLevenshtein.distance(str1, str2)
+
+
+def osa_myers_distance(peq, m, text, max_distance=None):
+    """
+    Optimal string alignment distance between a compiled pattern and a text.
+
+    Hyyrö's extension of Myers' algorithm: a transposition is detected when the
+    current text character matches pattern position i while the previous text
+    character matched position i + 1, and that diagonal did not already match.
+
+    Args:
+        peq (dict or list): Match masks from `bit_parallel.compile_pattern`.
+        m (int): Length of the pattern.
+        text (str or sequence of int): The text.
+        max_distance (int): Optional bound; the scan stops as soon as the distance is
+            known to exceed it.
+
+    Returns:
+        int: The distance, or max_distance + 1 if it exceeds `max_distance`.
+    """
+    n = len(text)
+    if max_distance is not None and abs(n - m) > max_distance:
+        return max_distance + 1
+    if m == 0:
+        return n
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    VP = mask
+    VN = 0
+    D0 = 0
+    PM_previous = 0
+    score = m
+
+    for j, symbol in enumerate(text, 1):
+        PM = peq[symbol]
+        TR = (((~D0 & PM) << 1) & PM_previous)
+        D0 = ((((PM & VP) + VP) ^ VP) | PM | VN | TR) & mask
+        HP = VN | (~(D0 | VP) & mask)
+        HN = VP & D0
+        if HP & last:
+            score += 1
+        elif HN & last:
+            score -= 1
+        # Each remaining column can lower the last-row score by at most one
+        if max_distance is not None and score - (n - j) > max_distance:
+            return max_distance + 1
+        HP = (HP << 1) | 1
+        HN = HN << 1
+        VP = (HN | ~(D0 | HP)) & mask
+        VN = HP & D0 & mask
+        PM_previous = PM
+
+    return score
+
+
+def bit_parallel_osa_distance(str1, str2):
+    """
+    Compute the Damerau-Levenshtein (optimal string alignment) distance between two
+    strings using bit-parallel operations.
+
+    Gives the same result as `damerau_levenshtein_distance`.
+
+    Args:
+        str1 (str): The first string.
+        str2 (str): The second string.
+
+    Returns:
+        int: The optimal string alignment distance between str1 and str2.
+    """
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+
+    return osa_myers_distance(compile_pattern(str2), len(str2), str1)
+
+
+def bit_parallel_osa_distance_bounded(str1, str2, max_distance):
+    """
+    Bounded variant of `bit_parallel_osa_distance`.
+
+    Args:
+        str1 (str): The first string.
+        str2 (str): The second string.
+        max_distance (int): The maximum distance of interest.
+
+    Returns:
+        int: The distance if it is <= max_distance, otherwise max_distance + 1.
+    """
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+
+    return osa_myers_distance(compile_pattern(str2), len(str2), str1, max_distance)
\ No newline at end of file
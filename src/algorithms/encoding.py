@@ -0,0 +1,165 @@
+"""
+Integer-Encoded Corpus Representation
+
+This module provides an interned alphabet that maps characters to small integers and a
+corpus container that stores every encoded string as a slice of one contiguous uint16
+(or, for alphabets beyond 65536 symbols, uint32) buffer. Strings are exposed as
+zero-copy `memoryview` slices, which every pure-Python kernel in `algorithms` accepts
+as-is (they only index, compare and take `len`), and which `bit_parallel` can compile
+into list-indexed match masks. The buffer can be copied once into shared memory and
+attached by worker processes without pickling the corpus.
+
+References:
+- Navarro, G. (2001). "A guided tour to approximate string matching".
+  ACM Computing Surveys, 33(1), 31-88.
+- Python Documentation: multiprocessing.shared_memory.
+  https://docs.python.org/3/library/multiprocessing.shared_memory.html
+"""
+
+from array import array
+from multiprocessing import shared_memory
+
+UINT16_SYMBOLS = 1 << 16
+
+
+class Alphabet:
+    def __init__(self, chars=()):
+        """
+        Initialize the alphabet, optionally pre-interning characters.
+
+        Args:
+            chars (iterable): Characters assigned the first codes, in order.
+        """
+        self.codes = {}
+        self.chars = []
+        for char in chars:
+            self.intern(char)
+
+    def intern(self, char):
+        """Return the code of `char`, assigning the next free code if it is new"""
+        code = self.codes.get(char)
+        if code is None:
+            code = self.codes[char] = len(self.chars)
+            self.chars.append(char)
+        return code
+
+    def encode(self, s):
+        """Encode a string, interning unseen characters"""
+        return [self.intern(char) for char in s]
+
+    def encode_known(self, s, unknown=None):
+        """
+        Encode a string without growing the alphabet (e.g. a query).
+
+        Args:
+            s (str): The string.
+            unknown (int): Code for characters outside the alphabet (default: one past
+                the last code, which never matches any corpus symbol).
+
+        Returns:
+            list: Symbol codes.
+        """
+        if unknown is None:
+            unknown = len(self.chars)
+        return [self.codes.get(char, unknown) for char in s]
+
+    def decode(self, codes):
+        return "".join(self.chars[code] for code in codes)
+
+    def __len__(self):
+        return len(self.chars)
+
+
+class EncodedCorpus:
+    def __init__(self, strings=(), alphabet=None):
+        """
+        Encode strings into one contiguous buffer.
+
+        Args:
+            strings (iterable): Strings to encode; string i gets id i.
+            alphabet (Alphabet): Alphabet to share with other corpora or queries.
+        """
+        self.alphabet = alphabet or Alphabet()
+        self.buffer = array('H')
+        self.offsets = array('Q', [0])
+        self._shm = None
+        for s in strings:
+            self.add(s)
+
+    def add(self, s):
+        """
+        Append a string.
+
+        Args:
+            s (str): The string.
+
+        Returns:
+            int: The id of the string.
+        """
+        codes = self.alphabet.encode(s)
+        if self.buffer.typecode == 'H' and len(self.alphabet) > UINT16_SYMBOLS:
+            self.buffer = array('I', self.buffer)  # Widen once the alphabet outgrows uint16
+        self.buffer.extend(codes)
+        self.offsets.append(len(self.buffer))
+        return len(self.offsets) - 2
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        """Zero-copy view of encoded string i"""
+        return memoryview(self.buffer)[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def decode(self, i):
+        return self.alphabet.decode(self[i])
+
+    def share(self):
+        """
+        Copy the corpus into a new shared-memory block.
+
+        Returns:
+            tuple: (SharedMemory, handle). The handle is small and picklable; pass it to
+            `EncodedCorpus.attach` in the workers. The caller owns the block and must
+            `close()` and `unlink()` it once the workers are done.
+        """
+        offsets = self.offsets.tobytes()
+        data = self.buffer.tobytes()
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(offsets) + len(data)))
+        shm.buf[:len(offsets)] = offsets
+        shm.buf[len(offsets):len(offsets) + len(data)] = data
+        handle = (shm.name, len(self), self.buffer.typecode, "".join(self.alphabet.chars))
+        return shm, handle
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Read-only corpus backed by a shared-memory block created with `share`.
+
+        Args:
+            handle (tuple): Handle returned by `share`.
+
+        Returns:
+            EncodedCorpus: Corpus whose buffers are views into the shared block. Call
+            `close()` on it when done.
+        """
+        name, count, typecode, chars = handle
+        corpus = cls(alphabet=Alphabet(chars))
+        corpus._shm = shared_memory.SharedMemory(name=name)
+        offsets_size = (count + 1) * array('Q').itemsize
+        corpus.offsets = corpus._shm.buf[:offsets_size].cast('Q')
+        end = corpus.offsets[count]
+        itemsize = array(typecode).itemsize
+        corpus.buffer = corpus._shm.buf[offsets_size:offsets_size + end * itemsize].cast(typecode)
+        return corpus
+
+    def close(self):
+        """Release the views into an attached shared-memory block"""
+        if self._shm is not None:
+            self.buffer.release()
+            self.offsets.release()
+            self._shm.close()
+            self._shm = None
@@ -3,12 +3,21 @@ Weighted Edit Distance Implementation
 
 This module provides an implementation of the weighted edit distance algorithm,
 which assigns different costs to insertions, deletions, substitutions, and transpositions.
+`cost_matrix_edit_distance` extends it to character-dependent costs (keyboard slips,
+sound-alike letters, accents) compiled into dense tables indexed by encoded characters.
 
 References:
 - Wagner, R. A., & Fischer, M. J. (1974). "The string-to-string correction problem".
   Journal of the ACM, 21(1), 168-173.
+- Kernighan, M. D., Church, K. W., & Gale, W. A. (1990). "A spelling correction program
+  based on a noisy channel model". Proceedings of COLING-90, 205-210.
 """
 
+import math
+import unicodedata
+
+from algorithms.encoding import Alphabet
+
 def weighted_edit_distance(str1, str2, weights):
     """
     Compute the weighted edit distance between two strings.
@@ -50,4 +59,176 @@ def weighted_edit_distance(str1, str2, weights):
                     d[(i - 2, j - 2)] + transpose_cost  # Transposition
                 )
 
-    return d[(len1 - 1, len2 - 1)]
\ No newline at end of file
+    return d[(len1 - 1, len2 - 1)]
+
+QWERTY_ROWS = ("1234567890", "qwertyuiop", "asdfghjkl", "zxcvbnm")
+
+# Common confusions in Spanish place names (mostly equal pronunciation)
+SPANISH_CONFUSIONS = (("b", "v"), ("s", "z"), ("c", "s"), ("c", "z"), ("c", "k"),
+                      ("q", "k"), ("g", "j"), ("y", "i"), ("n", "ñ"))
+
+
+def keyboard_adjacent_pairs(rows=QWERTY_ROWS):
+    """Pairs of horizontally or diagonally adjacent keys on the given keyboard rows"""
+    pairs = set()
+    for r, row in enumerate(rows):
+        for c, key in enumerate(row):
+            if c + 1 < len(row):
+                pairs.add((key, row[c + 1]))
+            if r + 1 < len(rows):
+                below = rows[r + 1]
+                for dc in (-1, 0):
+                    if 0 <= c + dc < len(below):
+                        pairs.add((key, below[c + dc]))
+    return sorted(pairs)
+
+
+def accent_pairs(chars):
+    """Pairs (accented character, base letter) for every accented character in `chars`"""
+    pairs = []
+    for char in sorted(set(chars)):
+        base = unicodedata.normalize('NFKD', char)[0]
+        if base != char and base.isalpha():
+            pairs.append((char, base))
+    return pairs
+
+
+class EditCostModel:
+    def __init__(self, substitution=1.0, insertion=1.0, deletion=1.0, transposition=1.0,
+                 substitution_costs=None, insertion_costs=None, deletion_costs=None,
+                 symmetric=True):
+        """
+        Character-dependent edit costs, compiled into dense tables indexed by symbol code.
+
+        Args:
+            substitution (float): Default cost of substituting two different characters.
+            insertion (float): Default cost of inserting a character.
+            deletion (float): Default cost of deleting a character.
+            transposition (float): Cost of swapping two adjacent characters.
+            substitution_costs (dict): {(a, b): cost} overrides for substituting a by b.
+            insertion_costs (dict): {char: cost} overrides for inserting char.
+            deletion_costs (dict): {char: cost} overrides for deleting char.
+            symmetric (bool): Also apply every (a, b) substitution cost to (b, a).
+        """
+        substitution_costs = dict(substitution_costs or {})
+        insertion_costs = insertion_costs or {}
+        deletion_costs = deletion_costs or {}
+        if symmetric:
+            for (a, b), cost in list(substitution_costs.items()):
+                substitution_costs.setdefault((b, a), cost)
+
+        chars = set(insertion_costs) | set(deletion_costs)
+        for a, b in substitution_costs:
+            chars.update((a, b))
+        self.alphabet = Alphabet(sorted(chars))
+        self.transposition = transposition
+
+        # Code len(alphabet) stands for every character without specific costs
+        size = len(self.alphabet) + 1
+        self.size = size
+        self.insertion = [insertion] * size
+        self.deletion = [deletion] * size
+        for char, cost in insertion_costs.items():
+            self.insertion[self.alphabet.codes[char]] = cost
+        for char, cost in deletion_costs.items():
+            self.deletion[self.alphabet.codes[char]] = cost
+        # Flat row-major table: substitution[a * size + b]; the diagonal is 0 except for the
+        # catch-all code, whose "equal codes" case is resolved by comparing characters
+        self.substitution = [substitution] * (size * size)
+        for a in range(size - 1):
+            self.substitution[a * size + a] = 0.0
+        codes = self.alphabet.codes
+        for (a, b), cost in substitution_costs.items():
+            self.substitution[codes[a] * size + codes[b]] = cost
+
+    def encode(self, s):
+        return self.alphabet.encode_known(s, unknown=self.size - 1)
+
+
+def tourism_cost_model(extra_chars="áéíóúüñàèìòùâêîôûäëïöç"):
+    """
+    Cost model for tourist misspellings of (Latin American) place names.
+
+    Keyboard-adjacent slips cost 0.7, Spanish sound-alike confusions 0.5, accent
+    differences 0.1, and a silent 'h' can be inserted or dropped for 0.5. The tables
+    are lowercase; normalize both strings first (as the tourism engine does).
+
+    Args:
+        extra_chars (str): Accented characters that get cheap accent substitutions.
+
+    Returns:
+        EditCostModel: The compiled model.
+    """
+    costs = {}
+    for pairs, cost in ((keyboard_adjacent_pairs(), 0.7), (SPANISH_CONFUSIONS, 0.5),
+                        (accent_pairs(extra_chars), 0.1)):
+        for a, b in pairs:
+            # A pair listed in several groups keeps its cheapest cost, in both directions
+            costs[(a, b)] = costs[(b, a)] = min(cost, costs.get((a, b), cost))
+    return EditCostModel(substitution_costs=costs, insertion_costs={'h': 0.5}, deletion_costs={'h': 0.5})
+
+
+def cost_matrix_edit_distance(str1, str2, model, max_cost=None):
+    """
+    Weighted edit distance (with adjacent transpositions) transforming str1 into str2
+    under a character-dependent cost model.
+
+    Only two previous DP rows are kept, and with `max_cost` the computation stops as
+    soon as every cell of two consecutive rows exceeds the bound: later cells extend a
+    cell of one of the last two rows (transpositions reach back two rows) by a
+    non-negative cost.
+
+    Args:
+        str1 (str): The source string.
+        str2 (str): The target string.
+        model (EditCostModel): Compiled cost tables.
+        max_cost (float): Optional bound; larger distances are reported as infinity.
+
+    Returns:
+        float: The weighted edit distance, or `math.inf` if it exceeds `max_cost`.
+    """
+    a = model.encode(str1)
+    b = model.encode(str2)
+    size = model.size
+    unknown = size - 1
+    ins = model.insertion
+    dele = model.deletion
+    sub = model.substitution
+    transpose_cost = model.transposition
+    bound = math.inf if max_cost is None else max_cost
+
+    previous = [0.0] * (len(b) + 1)
+    for j in range(1, len(b) + 1):
+        previous[j] = previous[j - 1] + ins[b[j - 1]]
+    before_previous = None
+    previous_min = min(previous)
+
+    for i in range(1, len(a) + 1):
+        ai = a[i - 1]
+        row_offset = ai * size
+        delete_cost = dele[ai]
+        current = [previous[0] + delete_cost] + [0.0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            bj = b[j - 1]
+            if ai == bj and (ai != unknown or str1[i - 1] == str2[j - 1]):
+                substitution_cost = 0.0
+            else:
+                substitution_cost = sub[row_offset + bj]
+            cost = min(
+                previous[j] + delete_cost,  # Deletion
+                current[j - 1] + ins[bj],  # Insertion
+                previous[j - 1] + substitution_cost  # Substitution
+            )
+            if (i > 1 and j > 1 and str1[i - 1] == str2[j - 2] and str1[i - 2] == str2[j - 1]
+                    and str1[i - 1] != str1[i - 2]):
+                cost = min(cost, before_previous[j - 2] + transpose_cost)  # Transposition
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > bound and previous_min > bound:
+            return math.inf
+        before_previous, previous = previous, current
+        previous_min = row_min
+
+    return previous[-1] if previous[-1] <= bound else math.inf
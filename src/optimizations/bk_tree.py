@@ -9,19 +9,110 @@ References:
   Communications of the ACM, 16(4), 230-236.
 - Wikipedia: BK-tree. https://en.wikipedia.org/wiki/BK-tree
 """
+from array import array
+
+from optimizations import instrumentation as metrics
+
+
 class BKTree:
-    def __init__(self, words, distance_func):
+    def __init__(self, words, distance_func, key=None, rescore=None):
         """
         Initialize the BK-tree with a list of words and a distance function.
         
         Args:
             words (list): A list of words to insert into the tree.
             distance_func (callable): A function that computes the distance between two strings.
+                Pruning is only exact if it is a metric (obeys the triangle inequality).
+            key (callable): Optional mapping from a stored item to its string, e.g.
+                `StringTable.normalized` to store integer ids instead of strings.
+            rescore (callable): Optional distance reported by `search` instead of
+                `distance_func`, for distances that are not metrics themselves. It must
+                never be below `distance_func`, which then only routes the search: e.g.
+                optimal string alignment rescoring a tree routed by the unrestricted
+                Damerau-Levenshtein metric.
         """
         self.root = None
         self.distance_func = distance_func
-        for word in words:
-            self.insert(word)
+        self.key = key
+        self.rescore = rescore
+        self.deleted = set()  # Tombstones of removed words
+        self._shared = False  # Nodes may be shared with another tree (see copy)
+        self.add(words)
+
+    def copy(self):
+        """
+        Return a copy-on-write clone that shares all nodes with this tree.
+
+        Inserts into either tree afterwards copy only the nodes on the insertion
+        path, so the other tree never observes the change.
+
+        Returns:
+            BKTree: The clone.
+        """
+        clone = BKTree([], self.distance_func, self.key, self.rescore)
+        clone.root = self.root
+        clone.deleted = set(self.deleted)
+        clone._shared = True
+        self._shared = True
+        return clone
+
+    def to_arrays(self):
+        """
+        Flatten the tree in preorder for persistence.
+
+        Only trees whose items are integers (e.g. string table ids, see `key`) can be
+        flattened.
+
+        Returns:
+            tuple: array('q') of items, array('q') of the position of each node's
+            parent (-1 for the root), array of the distance from each node to its parent
+            ('q' for integer distances, else 'd'; 0 for the root) and array('q') of
+            deleted items.
+        """
+        items, parents, distances = array('q'), array('q'), []
+        if self.root is not None:
+            stack = [(-1, 0, self.root)]
+            while stack:
+                parent, distance, (item, children) = stack.pop()
+                position = len(items)
+                items.append(item)
+                parents.append(parent)
+                distances.append(distance)
+                stack.extend((position, d, child) for d, child in reversed(list(children.items())))
+        integral = all(isinstance(d, int) for d in distances)
+        return items, parents, array('q' if integral else 'd', distances), array('q', sorted(self.deleted))
+
+    @classmethod
+    def from_arrays(cls, items, parents, distances, deleted, distance_func, key=None, rescore=None):
+        """
+        Rebuild a tree flattened with `to_arrays` without computing any distance.
+
+        Args:
+            items, parents, distances, deleted: Sequences returned by `to_arrays`
+                (memory-mapped views work as-is).
+            distance_func (callable): The distance the tree was built with.
+            key, rescore (callable): As in the constructor.
+
+        Returns:
+            BKTree: The rebuilt tree.
+
+        Raises:
+            ValueError: If the arrays do not describe a tree.
+        """
+        tree = cls([], distance_func, key, rescore)
+        tree.deleted = set(deleted)
+        if len(items) == 0:
+            return tree
+        if not len(items) == len(parents) == len(distances):
+            raise ValueError("BK-tree arrays differ in length")
+        items, parents, distances = items.tolist(), parents.tolist(), distances.tolist()
+        children = [{} for _ in items]
+        for i in range(1, len(items)):
+            if not 0 <= parents[i] < i:
+                raise ValueError("BK-tree arrays are not in preorder")
+            children[parents[i]][distances[i]] = (items[i], children[i])
+        tree.root = (items[0], children[0])
+        return tree
 
     def insert(self, word):
         """
@@ -29,22 +120,97 @@ class BKTree:
         
         Args:
             word (str): The word to insert.
+
+        Returns:
+            The stored item: `word`, or the equal item already in the tree.
         """
         if self.root is None:
             self.root = (word, {})
-            return
+            return word
 
+        key = self.key
+        word_str = word if key is None else key(word)
+        path = []
         current_node = self.root
         while True:
             current_word, children = current_node
-            distance = self.distance_func(current_word, word)
+            distance = self.distance_func(current_word if key is None else key(current_word), word_str)
             if distance == 0:
-                return  # Word already exists in the tree
+                self.deleted.discard(current_word)  # Re-inserting revives a removed word
+                return current_word  # Word already exists in the tree
             if distance in children:
+                path.append((current_node, distance))
                 current_node = children[distance]
-            else:
+            elif not self._shared:
                 children[distance] = (word, {})
-                break
+                return word
+            else:
+                # Path copying: rebuild the nodes from the new leaf up to the root
+                new_children = dict(children)
+                new_children[distance] = (word, {})
+                new_node = (current_word, new_children)
+                for (parent_word, parent_children), d in reversed(path):
+                    parent_children = dict(parent_children)
+                    parent_children[d] = new_node
+                    new_node = (parent_word, parent_children)
+                self.root = new_node
+                return word
+
+    def add(self, words):
+        """
+        Insert every word of an iterable (e.g. one chunk of a streamed corpus).
+
+        Args:
+            words (iterable): The words to insert.
+        """
+        for word in words:
+            self.insert(word)
+
+    def find(self, word):
+        """
+        Look up the stored item equal to a word, following a single path of the tree.
+
+        Args:
+            word (str): The word to look up (a string even when items are keyed ids).
+
+        Returns:
+            The stored item, or None if the word is not in the tree (or was removed).
+        """
+        key = self.key
+        current_node = self.root
+        while current_node is not None:
+            current_word, children = current_node
+            distance = self.distance_func(current_word if key is None else key(current_word), word)
+            if distance == 0:
+                return None if current_word in self.deleted else current_word
+            current_node = children.get(distance)
+        return None
+
+    def remove(self, word):
+        """
+        Remove a word from the BK-tree.
+
+        The node stays in place as a routing point for the search and is only
+        marked as deleted, so removal never restructures the tree.
+
+        Args:
+            word (str): The word to remove (a string even when items are keyed ids).
+
+        Returns:
+            bool: True if the word was present.
+        """
+        key = self.key
+        current_node = self.root
+        while current_node is not None:
+            current_word, children = current_node
+            distance = self.distance_func(current_word if key is None else key(current_word), word)
+            if distance == 0:
+                if current_word in self.deleted:
+                    return False
+                self.deleted.add(current_word)
+                return True
+            current_node = children.get(distance)
+        return False
 
     def search(self, query, max_distance):
         """
@@ -59,16 +225,56 @@ class BKTree:
         """
         if self.root is None:
             return []
+        if metrics.enabled:
+            return self._search_instrumented(query, max_distance)
 
+        key = self.key
         results = []
         stack = [self.root]
         while stack:
             current_word, children = stack.pop()
-            distance = self.distance_func(current_word, query)
-            if distance <= max_distance:
+            distance = self.distance_func(current_word if key is None else key(current_word), query)
+            if distance <= max_distance and current_word not in self.deleted:
                 results.append((current_word, distance))
             # Search only existing children
             for d, child in children.items():
                 if abs(d - distance) <= max_distance:
                     stack.append(child)
-        return sorted(results, key=lambda x: x[1])  # Sort by closest match
+        return sorted(self._rescored(results, query, max_distance), key=lambda x: x[1])  # Sort by closest match
+
+    def _rescored(self, results, query, max_distance):
+        """Replace routing distances by `rescore` and drop what it puts out of range"""
+        if self.rescore is None:
+            return results
+        key = self.key
+        rescored = []
+        for word, _ in results:
+            distance = self.rescore(word if key is None else key(word), query)
+            if distance <= max_distance:
+                rescored.append((word, distance))
+        return rescored
+
+    def _search_instrumented(self, query, max_distance):
+        """`search` with node counters, kept separate so the default path stays untouched"""
+        key = self.key
+        results = []
+        visited = pruned = 0
+        stack = [self.root]
+        while stack:
+            current_word, children = stack.pop()
+            distance = self.distance_func(current_word if key is None else key(current_word), query)
+            visited += 1
+            if distance <= max_distance and current_word not in self.deleted:
+                results.append((current_word, distance))
+            for d, child in children.items():
+                if abs(d - distance) <= max_distance:
+                    stack.append(child)
+                else:
+                    pruned += 1
+        metrics.incr('bk_tree.searches')
+        metrics.incr('bk_tree.distance_calls', visited)
+        metrics.incr('bk_tree.nodes_visited', visited)
+        metrics.incr('bk_tree.subtrees_pruned', pruned)
+        if self.rescore is not None:
+            metrics.incr('bk_tree.rescore_calls', len(results))
+        return sorted(self._rescored(results, query, max_distance), key=lambda x: x[1])
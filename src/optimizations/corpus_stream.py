@@ -0,0 +1,122 @@
+"""
+Streaming Corpus Loading and Bounded-Memory Index Building
+
+This module provides a generator over memory-mapped text or CSV corpora (e.g. place
+names extracted from Geofabrik OSM dumps) with normalization and de-duplication, and a
+helper that feeds any index supporting `add(chunk)` (BKTree, NGramSearch, PhoneticSearch)
+from such a stream chunk by chunk. Only one chunk of raw strings is alive at a time, so
+the peak memory of a build is the size of the index itself plus one chunk.
+
+References:
+- Python Documentation: mmap - Memory-mapped file support. https://docs.python.org/3/library/mmap.html
+- Python Documentation: tracemalloc - Trace memory allocations. https://docs.python.org/3/library/tracemalloc.html
+- Geofabrik Download Server. https://download.geofabrik.de/
+"""
+
+import csv
+import hashlib
+import mmap
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from optimizations.parallel_processing import chunker
+
+
+@dataclass
+class BuildReport:
+    items: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    peak_memory_bytes: int = None  # None when memory tracking is disabled
+
+
+def _iter_lines(path, encoding):
+    """Decode a memory-mapped file line by line without reading it into memory"""
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            return
+        with mm:
+            for line in iter(mm.readline, b''):
+                yield line.decode(encoding)
+
+
+def iter_corpus(path, column=None, delimiter=',', normalize=str.strip, dedupe=True, encoding='utf-8'):
+    """
+    Stream the strings of a plain-text (one per line) or CSV corpus.
+
+    Args:
+        path (str): Path of the corpus file.
+        column (int or str): CSV column to read, by index or by header name
+            (None = plain text, one string per line).
+        delimiter (str): CSV field delimiter.
+        normalize (callable): Applied to every string; empty results are skipped.
+        dedupe (bool): Skip strings whose normalized form was already yielded. Only an
+            8-byte digest per distinct string is remembered, not the string itself.
+        encoding (str): Text encoding of the file.
+
+    Yields:
+        str: Normalized corpus strings in file order.
+    """
+    lines = _iter_lines(path, encoding)
+    if column is None:
+        values = (line.rstrip('\r\n') for line in lines)
+    else:
+        reader = csv.reader(lines, delimiter=delimiter)
+        if isinstance(column, str):
+            header = next(reader, None)
+            if header is None:
+                return
+            column = header.index(column)
+        values = (row[column] for row in reader if len(row) > column)
+
+    seen = set()
+    for value in values:
+        if normalize is not None:
+            value = normalize(value)
+        if not value:
+            continue
+        if dedupe:
+            digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+        yield value
+
+
+def build_from_stream(index, stream, chunk_size=10000, track_memory=True):
+    """
+    Populate an index from a string iterator in fixed-size chunks.
+
+    Args:
+        index: Any index with an `add(iterable)` method (BKTree, NGramSearch, PhoneticSearch).
+        stream (iterable): Strings to index, e.g. from `iter_corpus`.
+        chunk_size (int): Number of strings materialized at a time.
+        track_memory (bool): Measure the peak traced allocation during the build.
+
+    Returns:
+        BuildReport: Item/chunk counts, wall time and peak memory of the build.
+    """
+    report = BuildReport()
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if track_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    try:
+        for chunk in chunker(stream, chunk_size):
+            index.add(chunk)
+            report.items += len(chunk)
+            report.chunks += 1
+    finally:
+        report.seconds = time.perf_counter() - start
+        if track_memory:
+            report.peak_memory_bytes = tracemalloc.get_traced_memory()[1] - baseline
+        if started_tracing:
+            tracemalloc.stop()
+    return report
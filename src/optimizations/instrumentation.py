@@ -0,0 +1,214 @@
+"""
+Hot-Path Instrumentation for Fuzzy Search
+
+This module provides a process-wide metrics switch with pluggable sinks. Instrumented
+code checks the module-level `enabled` flag once per call and only then counts or times
+anything, so a disabled build pays a single attribute lookup per search.
+
+Sinks:
+- InMemorySink: counters and fixed-bucket histograms kept in memory.
+- LoggingSink: forwards every event to a `logging` logger.
+- PrometheusTextSink: in-memory sink that writes the Prometheus text exposition format
+  to a file (for the node_exporter textfile collector).
+
+Usage:
+    from optimizations import instrumentation as metrics
+    sink = metrics.InMemorySink()
+    metrics.set_sink(sink)
+    ...
+    sink.snapshot()
+
+References:
+- Prometheus Documentation: Exposition formats.
+  https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+enabled = False
+_sink = None
+
+# Upper bounds (seconds) of the default latency histogram buckets
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_NULL_TIMER = nullcontext()
+
+
+def set_sink(sink):
+    """
+    Install a sink and enable instrumentation (None disables it again).
+
+    Args:
+        sink: Object with `incr(name, value)` and `observe(name, value)` methods.
+    """
+    global _sink, enabled
+    _sink = sink
+    enabled = sink is not None
+
+
+def get_sink():
+    return _sink
+
+
+def incr(name, value=1):
+    """Add `value` to counter `name`"""
+    sink = _sink
+    if sink is not None:
+        sink.incr(name, value)
+
+
+def observe(name, value):
+    """Record one sample (e.g. a duration in seconds) of histogram `name`"""
+    sink = _sink
+    if sink is not None:
+        sink.observe(name, value)
+
+
+@contextmanager
+def _timer(sink, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        sink.observe(name, time.perf_counter() - start)
+
+
+def timer(name):
+    """Context manager observing the elapsed seconds of its block (no-op when disabled)"""
+    sink = _sink
+    return _timer(sink, name) if sink is not None else _NULL_TIMER
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bucket bound containing the q-quantile (inf if beyond the last bucket)"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+
+class InMemorySink:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Keep counters and histograms in memory.
+
+        Args:
+            buckets (tuple): Histogram bucket upper bounds.
+        """
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def snapshot(self):
+        """
+        Current values of every metric.
+
+        Returns:
+            dict: {'counters': {name: value}, 'histograms': {name: {count, sum, p50, p99}}}.
+        """
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': {
+                    name: {'count': h.count, 'sum': h.sum,
+                           'p50': h.quantile(0.5), 'p99': h.quantile(0.99)}
+                    for name, h in self.histograms.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+class LoggingSink:
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger('fuzzysearch.metrics')
+        self.level = level
+
+    def incr(self, name, value=1):
+        self.logger.log(self.level, "%s += %s", name, value)
+
+    def observe(self, name, value):
+        self.logger.log(self.level, "%s = %.6f", name, value)
+
+
+def _prometheus_name(prefix, name):
+    return prefix + "".join(c if c.isalnum() else "_" for c in name)
+
+
+class PrometheusTextSink(InMemorySink):
+    def __init__(self, path, prefix="fuzzysearch_", buckets=DEFAULT_BUCKETS):
+        """
+        In-memory sink exportable in the Prometheus text format.
+
+        Args:
+            path (str): File rewritten (atomically) by `write`.
+            prefix (str): Prefix of every exported metric name.
+            buckets (tuple): Histogram bucket upper bounds.
+        """
+        super().__init__(buckets)
+        self.path = path
+        self.prefix = prefix
+
+    def render(self):
+        """Prometheus text exposition of the current metrics"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = _prometheus_name(self.prefix, name) + "_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            for name, h in sorted(self.histograms.items()):
+                metric = _prometheus_name(self.prefix, name)
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum {h.sum}")
+                lines.append(f"{metric}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Write the exposition to `path` via a temporary file and rename"""
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, self.path)
@@ -1,18 +1,25 @@
 """
 Parallel Processing for Large-Scale Fuzzy Search
 
-This module provides an implementation of parallel processing for fuzzy search using
-the `joblib` library, which is useful for speeding up computations on large datasets.
+This module provides batch edit-distance scoring on top of rapidfuzz's native
+multi-string routines (`process.extract`, `process.cdist`), which compare one or many
+queries against many choices in C++ and spread the work over their own thread pool.
+A `BatchScorer` deduplicates the targets and sorts them by length, so every query is
+only compared once with each distinct target of the contiguous band whose length is
+within the distance bound of its own, and the matches are mapped back to the original
+target ids. `parallel_fuzzy_search` scores plain target lists through one as well; build
+the scorer once to reuse it across queries.
 
 References:
-- Pedregosa, F., et al. (2011). "Scikit-learn: Machine Learning in Python".
-  Journal of Machine Learning Research, 12, 2825-2830.
-- Joblib Documentation. https://joblib.readthedocs.io/
+- Ukkonen, E. (1985). "Algorithms for approximate string matching".
+  Information and Control, 64(1-3), 100-118.
+- RapidFuzz Documentation. https://rapidfuzz.github.io/RapidFuzz/
 """
 
-from multiprocessing import Pool, cpu_count
-from functools import partial
 from itertools import islice
+
+import numpy as np
+from rapidfuzz import process
 from rapidfuzz.distance import Levenshtein  # Faster than python-Levenshtein
 
 def chunker(iterable, chunk_size):
@@ -21,42 +28,153 @@ def chunker(iterable, chunk_size):
     while chunk := list(islice(iterator, chunk_size)):
         yield chunk
 
-def search_worker(query, threshold, target):
-    """Optimized search worker with pre-bound parameters"""
-    distance = Levenshtein.distance(query, target)
-    return (target, distance) if distance <= threshold else None
+def native_scan(query, choices, max_distance, workers=1):
+    """
+    Score one query against a list of choices in a single native call.
+
+    Args:
+        query (str): Search string.
+        choices (list): Candidate strings.
+        max_distance (int): Score cutoff; choices beyond it are dropped natively.
+        workers (int): Threads of the native routine (-1 = all cores).
+
+    Returns:
+        list: Tuples (index into choices, distance) of every choice within max_distance.
+    """
+    if workers == 1:
+        return [
+            (index, distance)
+            for _, distance, index in process.extract(
+                query, choices, scorer=Levenshtein.distance, score_cutoff=max_distance, limit=None
+            )
+        ]
+    row = process.cdist([query], choices, scorer=Levenshtein.distance, score_cutoff=max_distance,
+                        dtype=np.int32, workers=workers)[0]
+    hits = np.flatnonzero(row <= max_distance)
+    return list(zip(hits.tolist(), row[hits].tolist()))
+
+class BatchScorer:
+    def __init__(self, targets):
+        """
+        Deduplicate the targets and group them by length.
+
+        Args:
+            targets (iterable): Target strings; a target's id is its position.
+        """
+        ids = {}
+        for i, target in enumerate(targets):
+            ids.setdefault(target, []).append(i)
+        self.choices = sorted(ids, key=len)  # Unique targets, shortest first
+        self.ids = [ids[choice] for choice in self.choices]  # Original ids per choice
+        self.lengths = np.fromiter(map(len, self.choices), dtype=np.int64, count=len(self.choices))
+        self.size = sum(len(i) for i in self.ids)
+
+    def __len__(self):
+        return self.size
+
+    def _band(self, length, max_distance):
+        """Slice of `choices` whose lengths are within max_distance of `length`"""
+        low = int(np.searchsorted(self.lengths, length - max_distance, side='left'))
+        high = int(np.searchsorted(self.lengths, length + max_distance, side='right'))
+        return low, high
+
+    def _unique_matches(self, query, max_distance, workers):
+        """(choice index, distance) of every unique target within max_distance"""
+        low, high = self._band(len(query), max_distance)
+        if low == high:
+            return []
+        return [(low + index, distance)
+                for index, distance in native_scan(query, self.choices[low:high], max_distance, workers)]
+
+    def match_ids(self, query, max_distance, workers=1):
+        """
+        Original ids of every target within max_distance of the query.
 
-def parallel_fuzzy_search(query, targets, max_distance=2, min_parallel_size=5000, n_jobs=None):
+        Args:
+            query (str): Search string.
+            max_distance (int): Maximum allowed Levenshtein distance.
+            workers (int): Threads of the native routine (-1 = all cores).
+
+        Returns:
+            list: Tuples (target id, distance), ordered by distance then id.
+        """
+        matches = self._unique_matches(query, max_distance, workers)
+        return sorted(((i, distance) for choice, distance in matches for i in self.ids[choice]),
+                      key=lambda m: (m[1], m[0]))
+
+    def search(self, query, max_distance, workers=1):
+        """
+        Every target within max_distance of the query (repeated targets repeat).
+
+        Args:
+            query (str): Search string.
+            max_distance (int): Maximum allowed Levenshtein distance.
+            workers (int): Threads of the native routine (-1 = all cores).
+
+        Returns:
+            list: Tuples (target, distance), ordered by distance then target.
+        """
+        matches = [
+            (self.choices[choice], distance)
+            for choice, distance in self._unique_matches(query, max_distance, workers)
+            for _ in self.ids[choice]
+        ]
+        return sorted(matches, key=lambda x: (x[1], x[0]))
+
+    def search_many(self, queries, max_distance, workers=-1):
+        """
+        Match a batch of queries.
+
+        Queries of equal length share one band of targets and are scored together in
+        a single `cdist` call.
+
+        Args:
+            queries (list): Search strings.
+            max_distance (int): Maximum allowed Levenshtein distance.
+            workers (int): Threads of the native routine (-1 = all cores).
+
+        Returns:
+            list: For every query, what `search` returns.
+        """
+        by_length = {}
+        for position, query in enumerate(queries):
+            by_length.setdefault(len(query), []).append(position)
+        results = [[] for _ in queries]
+        for length, positions in by_length.items():
+            low, high = self._band(length, max_distance)
+            if low == high:
+                continue
+            matrix = process.cdist([queries[p] for p in positions], self.choices[low:high],
+                                   scorer=Levenshtein.distance, score_cutoff=max_distance,
+                                   dtype=np.int32, workers=workers)
+            rows, columns = np.nonzero(matrix <= max_distance)
+            distances = matrix[rows, columns]
+            for row, column, distance in zip(rows.tolist(), columns.tolist(), distances.tolist()):
+                choice = low + column
+                results[positions[row]].extend([(self.choices[choice], distance)] * len(self.ids[choice]))
+        return [sorted(matches, key=lambda x: (x[1], x[0])) for matches in results]
+
+def parallel_fuzzy_search(query, targets, max_distance=2, min_parallel_size=5000, n_jobs=None, prefilter=None):
     """
     Hybrid parallel/linear search with automatic mode switching
-    
+
     Args:
         query: Search string
-        targets: List of target strings
+        targets: List of target strings (scored through a BatchScorer built for this
+            query), or a BatchScorer built over them and reused across queries
         max_distance: Maximum allowed Levenshtein distance
         min_parallel_size: Minimum dataset size to trigger parallel mode
-        n_jobs: Number of parallel workers (None = auto-detect)
+        n_jobs: Number of native worker threads (None = all cores)
+        prefilter: Optional LowerBoundFilter built over `targets`; candidates it
+            rejects are never compared
     """
-    # Fallback to linear search for small datasets
-    if len(targets) < min_parallel_size:
-        return sorted(
-            ((t, Levenshtein.distance(query, t)) for t in targets if Levenshtein.distance(query, t) <= max_distance),
-            key=lambda x: (x[1], x[0])
-        )
-
-    # Configure parallel execution
-    n_jobs = n_jobs or cpu_count()
-    worker = partial(search_worker, query, max_distance)
-    
-    # Optimized chunk size calculation
-    chunk_size = max(1000, len(targets) // (n_jobs * 4))
-    
-    with Pool(n_jobs) as pool:
-        results = []
-        # Process in chunks to balance load and memory usage
-        for chunk in chunker(targets, chunk_size):
-            chunk_results = pool.map(worker, chunk)
-            results.extend(r for r in chunk_results if r is not None)
-
-    # Final sorting and deduplication
-    return sorted(results, key=lambda x: (x[1], x[0]))
\ No newline at end of file
+    if prefilter is not None:
+        targets = prefilter.filter(query, max_distance)
+
+    if not isinstance(targets, BatchScorer):
+        # Repeated targets are scored once, and only targets of compatible length at all
+        targets = BatchScorer(targets)
+
+    # Single-threaded native scan for small datasets
+    workers = 1 if len(targets) < min_parallel_size else (n_jobs or -1)
+    return targets.search(query, max_distance, workers=workers)
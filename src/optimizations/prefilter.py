@@ -0,0 +1,106 @@
+"""
+Lower-Bound Prefilter for Edit-Distance Search
+
+This module provides a reusable filter stage that rejects candidates using cheap lower
+bounds on the Levenshtein distance before any exact computation:
+
+- Length: ed(x, y) >= | |x| - |y| |.
+- Character histogram: every edit changes the character-frequency vector by at most one
+  unit "up" and one unit "down", so ed(x, y) >= max(surplus, deficit) of the two
+  histograms. Characters are folded into a few buckets, which keeps the vectors small
+  and the bound valid (folding can only shrink surplus and deficit).
+- Q-gram count (Ukkonen): x and y share at least max(|x|, |y|) - q + 1 - k*q q-grams
+  when ed(x, y) <= k.
+
+The length and histogram bounds are evaluated for a whole batch of candidates at once
+with numpy; the q-gram bound runs only on the survivors.
+
+References:
+- Ukkonen, E. (1992). "Approximate string-matching with q-grams and maximal matches".
+  Theoretical Computer Science, 92(1), 191-211.
+- Kahveci, T., & Singh, A. K. (2001). "Efficient index structures for string databases".
+  Proceedings of VLDB 2001, 351-360.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+
+class LowerBoundFilter:
+    def __init__(self, targets, q=2, histogram_size=32):
+        """
+        Precompute the per-target length, folded histogram and q-gram profile.
+
+        Args:
+            targets (list): Strings to filter; candidates are referred to by index.
+            q (int): Q-gram length for the count bound.
+            histogram_size (int): Number of buckets characters are folded into.
+        """
+        self.targets = list(targets)
+        self.q = q
+        self.histogram_size = histogram_size
+        self.lengths = np.fromiter((len(t) for t in self.targets), dtype=np.int32, count=len(self.targets))
+        self.histograms = np.zeros((len(self.targets), histogram_size), dtype=np.int16)
+        for i, target in enumerate(self.targets):
+            self.histograms[i] = self._histogram(target)
+        self.qgrams = [self._qgrams(t) for t in self.targets]
+        self.reset_stats()
+
+    def _histogram(self, s):
+        histogram = np.zeros(self.histogram_size, dtype=np.int16)
+        for char in s:
+            histogram[ord(char) % self.histogram_size] += 1
+        return histogram
+
+    def _qgrams(self, s):
+        return Counter(s[i:i + self.q] for i in range(len(s) - self.q + 1))
+
+    def reset_stats(self):
+        self.stats = {'checked': 0, 'length': 0, 'histogram': 0, 'qgram': 0, 'passed': 0}
+
+    def candidates(self, query, max_distance, ids=None):
+        """
+        Indexes of the targets that may lie within `max_distance` of the query.
+
+        Never rejects a true match; rejections are tallied per bound in `stats`.
+
+        Args:
+            query (str): The query string.
+            max_distance (int): The maximum allowed Levenshtein distance.
+            ids (array-like): Optional subset of target indexes to check (default: all).
+
+        Returns:
+            np.ndarray: Surviving target indexes, in input order.
+        """
+        ids = np.arange(len(self.targets)) if ids is None else np.asarray(ids, dtype=np.intp)
+        self.stats['checked'] += len(ids)
+
+        # Length bound
+        keep = np.abs(self.lengths[ids] - len(query)) <= max_distance
+        self.stats['length'] += int(len(ids) - keep.sum())
+        ids = ids[keep]
+
+        # Histogram bound
+        diff = self.histograms[ids] - self._histogram(query)
+        surplus = np.clip(diff, 0, None).sum(axis=1)
+        deficit = np.clip(-diff, 0, None).sum(axis=1)
+        keep = np.maximum(surplus, deficit) <= max_distance
+        self.stats['histogram'] += int(len(ids) - keep.sum())
+        ids = ids[keep]
+
+        # Q-gram count bound (only informative when the required overlap is positive)
+        query_qgrams = self._qgrams(query)
+        survivors = []
+        for i in ids:
+            required = max(len(query), self.lengths[i]) - self.q + 1 - max_distance * self.q
+            if required > 0 and sum((query_qgrams & self.qgrams[i]).values()) < required:
+                self.stats['qgram'] += 1
+            else:
+                survivors.append(i)
+        self.stats['passed'] += len(survivors)
+        return np.array(survivors, dtype=np.intp)
+
+    def filter(self, query, max_distance, ids=None):
+        """Like `candidates`, but returns the surviving target strings"""
+        return [self.targets[i] for i in self.candidates(query, max_distance, ids)]
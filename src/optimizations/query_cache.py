@@ -0,0 +1,120 @@
+"""
+Query Result Cache for Fuzzy Search
+
+This module provides a bounded, thread-safe result cache with least-recently-used
+eviction and an optional time-to-live, intended to sit in front of expensive search
+calls whose traffic is dominated by a small set of frequent (normalized) queries.
+
+References:
+- Mattson, R. L., Gecsei, J., Slutz, D. R., & Traiger, I. L. (1970). "Evaluation
+  techniques for storage hierarchies". IBM Systems Journal, 9(2), 78-117.
+- Python Documentation: collections.OrderedDict. https://docs.python.org/3/library/collections.html
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from optimizations import instrumentation as metrics
+
+
+class QueryCache:
+    def __init__(self, max_size=1024, ttl=None, clock=time.monotonic, name='query_cache'):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int): Maximum number of entries kept (0 disables caching).
+            ttl (float): Optional lifetime of an entry in seconds (None = no expiry).
+            clock (callable): Monotonic time source, injectable for testing.
+            name (str): Metric name prefix used when instrumentation is enabled.
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be non-negative")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.name = name
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """
+        Look up a key, refreshing its recency on a hit.
+
+        Args:
+            key: A hashable cache key.
+            default: Value returned on a miss.
+
+        Returns:
+            The cached value, or `default` if absent or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                if metrics.enabled:
+                    metrics.incr(self.name + '.misses')
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                if metrics.enabled:
+                    metrics.incr(self.name + '.misses')
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if metrics.enabled:
+                metrics.incr(self.name + '.hits')
+            return value
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entries beyond `max_size`.
+
+        Args:
+            key: A hashable cache key.
+            value: The value to cache.
+        """
+        if self.max_size == 0:
+            return
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                if metrics.enabled:
+                    metrics.incr(self.name + '.evictions')
+
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Snapshot of the cache counters.
+
+        Returns:
+            dict: hits, misses, evictions, expirations, size and max_size.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
@@ -0,0 +1,145 @@
+"""
+Cost-Based Query Planner
+
+This module picks, per query, the cheapest of several exact execution plans for each
+search stage, using simple linear cost models whose unit costs are calibrated from
+benchmark runs (or measured directly, see `TourismSearchEngine.calibrate_planner`).
+
+Edit-distance stage (all candidates within radius k):
+- 'bktree': BK-tree search; cost = visited fraction(k, |q|) * n * routing call. The
+  fraction is high for short queries, where the triangle inequality prunes little. The
+  tree is routed by a metric, which for optimal string alignment is the (much cheaper,
+  native) unrestricted Damerau-Levenshtein distance; its few results are rescored.
+- 'scan': one distance call per key whose length is within k of |q| (keys are kept
+  sorted by length, so these form one contiguous range whose size is known exactly).
+- 'qgram': q-gram count filter over an inverted index. A unit-cost edit destroys at most
+  q q-grams and an adjacent transposition at most q + 1, so a match shares at least
+  max(|x|, |q|) - q + 1 - k(q + 1) q-grams with the query; when that bound is positive
+  every match appears in the posting lists of the query's q-grams. Favoured by long
+  queries.
+
+N-gram similarity stage (targets scoring at least min_score > 0):
+- 'scan': score every target.
+- 'index': score only the targets in the posting lists of the query's n-grams (a
+  target sharing no n-gram scores 0).
+
+References:
+- Selinger, P. G., Astrahan, M. M., Chamberlin, D. D., Lorie, R. A., & Price, T. G.
+  (1979). "Access path selection in a relational database management system".
+  Proceedings of SIGMOD '79, 23-34.
+- Ukkonen, E. (1992). "Approximate string-matching with q-grams and maximal matches".
+  Theoretical Computer Science, 92(1), 191-211.
+"""
+
+import json
+from dataclasses import dataclass, field
+
+
+def default_bk_fraction(radius, query_length):
+    """Rough share of a BK-tree visited by a search (measured on place-name corpora)"""
+    return 0.3 * (radius / 2) ** 2 * max(0.3, 1 - query_length / 40)
+
+
+@dataclass
+class CostModel:
+    distance_call: float = 2e-6     # Seconds per edit-distance evaluation
+    routing_call: float = 4e-7      # Seconds per BK-tree routing distance evaluation
+    ngram_score: float = 3e-6       # Seconds per n-gram similarity evaluation
+    posting_entry: float = 2e-7     # Seconds per inverted-index posting visited
+    qgram_pass_fraction: float = 0.25  # Share of q-gram candidates surviving the count filter
+    # (radius, query length) -> measured fraction of the BK-tree visited
+    bk_visit_fraction: dict = field(default_factory=dict)
+    bk_fraction_scale: float = 1.0  # Correction of the default curve for unmeasured lengths
+
+    def bk_fraction(self, radius, query_length):
+        """Measured visited fraction, or a default curve that shrinks with query length"""
+        fraction = self.bk_visit_fraction.get((radius, query_length))
+        if fraction is None:
+            fraction = self.bk_fraction_scale * default_bk_fraction(radius, query_length)
+        return min(1.0, fraction)
+
+    @classmethod
+    def from_benchmark(cls, path, kernel='bit_parallel_osa', **overrides):
+        """
+        Unit costs from a `benchmarks/run_benchmarks.py` result file.
+
+        Args:
+            path (str): Benchmark JSON file.
+            kernel (str): Kernel whose mean latency is the distance call cost.
+            **overrides: Unit costs to set explicitly.
+
+        Returns:
+            CostModel: The calibrated model (unmeasured costs keep their defaults).
+        """
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+        results = report['results']
+        size = report['meta']['corpus_size']
+        costs = {}
+        if f'kernel/{kernel}' in results:
+            costs['distance_call'] = results[f'kernel/{kernel}']['mean_us'] * 1e-6
+        if 'index/ngram' in results and size:
+            costs['ngram_score'] = results['index/ngram']['p50_ms'] * 1e-3 / size
+        costs.update(overrides)
+        return cls(**costs)
+
+
+@dataclass
+class Plan:
+    levenshtein: str
+    ngram: str
+    costs: dict  # (stage, plan) -> estimated seconds
+
+
+class QueryPlanner:
+    def __init__(self, cost_model=None):
+        """
+        Args:
+            cost_model (CostModel): Unit costs (default: uncalibrated defaults).
+        """
+        self.cost_model = cost_model or CostModel()
+
+    def levenshtein_costs(self, n, query_length, radius, length_candidates, postings=None, q=3,
+                          bounded=True):
+        """
+        Estimated cost of every exact edit-distance plan.
+
+        Args:
+            n (int): Number of indexed keys.
+            query_length (int): Length of the query.
+            radius (int): Search radius k.
+            length_candidates (int): Keys whose length is within k of the query's.
+            postings (int): Posting entries of the query's q-grams (None = no q-gram index).
+            q (int): Q-gram length of the inverted index.
+            bounded (bool): Whether the distance is a unit-cost edit distance, for which
+                the length and q-gram bounds hold; otherwise only 'bktree' is exact.
+
+        Returns:
+            dict: Plan name -> estimated seconds.
+        """
+        model = self.cost_model
+        costs = {'bktree': model.bk_fraction(radius, query_length) * n * model.routing_call}
+        if bounded:
+            costs['scan'] = length_candidates * model.distance_call
+            if postings is not None and query_length - q + 1 - radius * (q + 1) > 0:
+                survivors = model.qgram_pass_fraction * min(length_candidates, postings)
+                costs['qgram'] = postings * model.posting_entry + survivors * model.distance_call
+        return costs
+
+    def ngram_costs(self, n, postings, min_score):
+        """Estimated cost of every exact n-gram plan ('index' needs min_score > 0)"""
+        model = self.cost_model
+        costs = {'scan': n * model.ngram_score}
+        if min_score > 0:
+            costs['index'] = postings * model.posting_entry + min(n, postings) * model.ngram_score
+        return costs
+
+    def plan(self, levenshtein_costs, ngram_costs):
+        """Cheapest plan per stage (ties keep the first listed, i.e. the default path)"""
+        costs = {('levenshtein', name): c for name, c in levenshtein_costs.items()}
+        costs.update({('ngram', name): c for name, c in ngram_costs.items()})
+        return Plan(
+            levenshtein=min(levenshtein_costs, key=levenshtein_costs.get),
+            ngram=min(ngram_costs, key=ngram_costs.get),
+            costs=costs,
+        )
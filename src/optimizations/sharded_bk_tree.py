@@ -0,0 +1,178 @@
+"""
+Sharded BK-Tree Forest with Scatter-Gather Search
+
+This module partitions a corpus into independent BK-trees, either by string length or
+by a stable hash. Since ed(x, y) >= | |x| - |y| |, a query with radius k only needs the
+length shards whose length range overlaps [|q| - k, |q| + k]; every other shard is
+skipped without a single distance computation. Shards can be searched serially or
+scattered over a process pool whose workers hold the forest (inherited on fork, rebuilt
+once per worker otherwise); the per-shard results are merged into the same set a single
+BK-tree would return.
+
+References:
+- Burkhard, W. A., & Keller, R. M. (1973). "Some approaches to best-match file searching".
+  Communications of the ACM, 16(4), 230-236.
+- Dean, J., & Barroso, L. A. (2013). "The tail at scale". Communications of the ACM, 56(2), 74-80.
+"""
+
+import zlib
+from multiprocessing import Pool, cpu_count
+
+from optimizations.bk_tree import BKTree
+
+_FOREST = None  # Forest available to pool workers
+
+
+class ShardedBKForest:
+    def __init__(self, words, distance_func, n_shards=8, partition='length'):
+        """
+        Partition the words and build one BK-tree per shard.
+
+        Args:
+            words (iterable): Words to index.
+            distance_func (callable): A metric; must be picklable for the 'spawn' start method.
+            n_shards (int): Maximum number of shards.
+            partition (str): 'length' (contiguous, balanced length ranges) or 'hash'.
+        """
+        if partition not in ('length', 'hash'):
+            raise ValueError("partition must be 'length' or 'hash'")
+        self.distance_func = distance_func
+        self.partition = partition
+        words = list(dict.fromkeys(words))
+
+        if partition == 'hash':
+            groups = [[] for _ in range(n_shards)]
+            for word in words:
+                groups[zlib.crc32(word.encode('utf-8')) % n_shards].append(word)
+            self.ranges = [None] * n_shards
+        else:
+            groups, self.ranges = self._length_groups(words, n_shards)
+
+        self.shard_words = groups
+        self.shards = [BKTree(group, distance_func) for group in groups]
+
+    @staticmethod
+    def _length_groups(words, n_shards):
+        """Split into contiguous length ranges of roughly equal size (a length is never split)"""
+        by_length = {}
+        for word in words:
+            by_length.setdefault(len(word), []).append(word)
+        target = max(1, -(-len(words) // n_shards))
+        groups, ranges = [], []
+        current, low = [], None
+        for length in sorted(by_length):
+            if low is None:
+                low = length
+            current.extend(by_length[length])
+            if len(current) >= target:
+                groups.append(current)
+                ranges.append((low, length))
+                current, low = [], None
+        if current:
+            groups.append(current)
+            ranges.append((low, max(by_length)))
+        return groups, ranges
+
+    def shards_for(self, query, max_distance):
+        """Indexes of the shards that can contain a match within `max_distance`"""
+        if self.partition == 'hash':
+            return list(range(len(self.shards)))
+        low, high = len(query) - max_distance, len(query) + max_distance
+        return [i for i, (lo, hi) in enumerate(self.ranges) if lo <= high and hi >= low]
+
+    @staticmethod
+    def merge(partial_results):
+        """Merge per-shard result lists, ordered by distance then word"""
+        return sorted((r for results in partial_results for r in results), key=lambda x: (x[1], x[0]))
+
+    def search(self, query, max_distance):
+        """
+        Search the relevant shards in this process.
+
+        Args:
+            query (str): The query string.
+            max_distance (int): The maximum allowed distance.
+
+        Returns:
+            list: Tuples (word, distance), ordered by distance then word.
+        """
+        return self.merge(self.shards[i].search(query, max_distance)
+                          for i in self.shards_for(query, max_distance))
+
+    def pool(self, n_jobs=None):
+        """
+        Start a process pool with this forest preloaded in every worker.
+
+        Args:
+            n_jobs (int): Number of worker processes (None = all cores).
+
+        Returns:
+            ForestPool: Use as a context manager, or call `close()`.
+        """
+        return ForestPool(self, n_jobs)
+
+
+def _init_worker(shard_words, distance_func, partition, ranges):
+    global _FOREST
+    if _FOREST is None:  # Only rebuilt under the 'spawn' start method
+        forest = ShardedBKForest.__new__(ShardedBKForest)
+        forest.distance_func = distance_func
+        forest.partition = partition
+        forest.ranges = ranges
+        forest.shard_words = shard_words
+        forest.shards = [BKTree(group, distance_func) for group in shard_words]
+        _FOREST = forest
+
+
+def _search_shard(task):
+    shard, query, max_distance = task
+    return _FOREST.shards[shard].search(query, max_distance)
+
+
+class ForestPool:
+    def __init__(self, forest, n_jobs=None):
+        global _FOREST
+        self.forest = forest
+        _FOREST = forest  # Inherited by forked workers, so they skip the rebuild
+        self._pool = Pool(
+            n_jobs or cpu_count(),
+            initializer=_init_worker,
+            initargs=(forest.shard_words, forest.distance_func, forest.partition, forest.ranges),
+        )
+
+    def search(self, query, max_distance):
+        """Scatter one query over the relevant shards and gather the merged results"""
+        return self.search_many([query], max_distance)[0]
+
+    def search_many(self, queries, max_distance):
+        """
+        Scatter a batch of queries over their relevant shards in one round trip.
+
+        Args:
+            queries (list): Query strings.
+            max_distance (int): The maximum allowed distance.
+
+        Returns:
+            list: One merged result list per query, in input order.
+        """
+        tasks, owners = [], []
+        for q, query in enumerate(queries):
+            for shard in self.forest.shards_for(query, max_distance):
+                tasks.append((shard, query, max_distance))
+                owners.append(q)
+        gathered = [[] for _ in queries]
+        for owner, results in zip(owners, self._pool.map(_search_shard, tasks)):
+            gathered[owner].append(results)
+        return [ShardedBKForest.merge(parts) for parts in gathered]
+
+    def close(self):
+        global _FOREST
+        self._pool.close()
+        self._pool.join()
+        _FOREST = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
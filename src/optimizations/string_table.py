@@ -0,0 +1,176 @@
+"""
+Compact String Table
+
+This module provides a read-mostly table of strings addressed by integer id, stored as
+an offset array plus one UTF-8 blob, with an optional second column holding a
+normalized form of every string. Indexes keep ids into one shared table instead of
+their own copies of the corpus, and a saved table can be memory-mapped so that every
+worker process shares the same physical pages.
+
+File layout (little-endian):
+    magic  b"FZST"            4 bytes
+    version                   uint32
+    count                     uint64
+    flags                     uint64 (bit 0: normalized column present)
+    offsets                   uint64[count + 1]   into the string blob
+    normalized offsets        uint64[count + 1]   (only with the normalized column)
+    string blob               UTF-8
+    normalized blob           UTF-8 (only with the normalized column)
+
+References:
+- Witten, I. H., Moffat, A., & Bell, T. C. (1999). "Managing Gigabytes: Compressing and
+  Indexing Documents and Images" (2nd ed.). Morgan Kaufmann.
+- Python Documentation: mmap - Memory-mapped file support. https://docs.python.org/3/library/mmap.html
+"""
+
+import mmap
+import os
+import struct
+from array import array
+
+MAGIC = b"FZST"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQQ")
+_HAS_NORMALIZED = 1
+
+
+class StringTable:
+    def __init__(self, strings=(), normalized=None):
+        """
+        Build a growable in-memory table.
+
+        Args:
+            strings (iterable): Strings; string i gets id i.
+            normalized (callable): If given, adds a normalized column computed with it.
+        """
+        self._offsets = array('Q', [0])
+        self._blob = bytearray()
+        self.has_normalized = normalized is not None
+        self._normalized_offsets = array('Q', [0]) if self.has_normalized else None
+        self._normalized_blob = bytearray() if self.has_normalized else None
+        self._mmap = None
+        for s in strings:
+            self.append(s, normalized(s) if normalized else None)
+
+    def append(self, s, normalized=None):
+        """
+        Append a string (and its normalized form when the table has that column).
+
+        Returns:
+            int: The id of the new string.
+        """
+        if self._mmap is not None:
+            raise TypeError("memory-mapped string tables are read-only; use copy()")
+        self._blob += s.encode('utf-8')
+        self._offsets.append(len(self._blob))
+        if self.has_normalized:
+            self._normalized_blob += (s if normalized is None else normalized).encode('utf-8')
+            self._normalized_offsets.append(len(self._normalized_blob))
+        return len(self._offsets) - 2
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+
+    def normalized(self, i):
+        """Normalized form of string i (the string itself without that column)"""
+        if not self.has_normalized:
+            return self[i]
+        return str(self._normalized_blob[self._normalized_offsets[i]:self._normalized_offsets[i + 1]], 'utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def copy(self):
+        """
+        Growable in-memory copy (ids are preserved). Raw bytes are copied, nothing is
+        decoded, but the cost is linear in the table size; a copy of a memory-mapped
+        table no longer shares its pages.
+        """
+        table = StringTable()
+        table._offsets = array('Q', self._offsets)
+        table._blob = bytearray(self._blob)
+        table.has_normalized = self.has_normalized
+        if self.has_normalized:
+            table._normalized_offsets = array('Q', self._normalized_offsets)
+            table._normalized_blob = bytearray(self._normalized_blob)
+        return table
+
+    def save(self, path):
+        """
+        Write the table in the binary layout described in the module docstring.
+
+        Args:
+            path (str): Destination file (written via a temporary file and renamed).
+        """
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(self), _HAS_NORMALIZED if self.has_normalized else 0))
+            f.write(array('Q', self._offsets).tobytes())
+            if self.has_normalized:
+                f.write(array('Q', self._normalized_offsets).tobytes())
+            f.write(self._blob)
+            if self.has_normalized:
+                f.write(self._normalized_blob)
+        os.replace(tmp, path)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-map a saved table (read-only).
+
+        Args:
+            path (str): File written by `save`.
+
+        Returns:
+            StringTable: Table whose offsets and blobs are views into the mapping.
+        """
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mm) < _HEADER.size:
+            mm.close()
+            raise ValueError(f"{path} is truncated")
+        magic, version, count, flags = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} string table")
+        # The last entry of each offset array is the size of its blob
+        columns = 2 if flags & _HAS_NORMALIZED else 1
+        offsets_size = (count + 1) * 8
+        size = _HEADER.size + columns * offsets_size
+        if len(mm) >= size:
+            size += sum(struct.unpack_from("<Q", mm, _HEADER.size + c * offsets_size + count * 8)[0]
+                        for c in range(columns))
+        if len(mm) < size:
+            mm.close()
+            raise ValueError(f"{path} is truncated")
+
+        table = cls.__new__(cls)
+        table._mmap = mm
+        table.has_normalized = bool(flags & _HAS_NORMALIZED)
+        view = memoryview(mm)
+        position = _HEADER.size
+        table._offsets = view[position:position + offsets_size].cast('Q')
+        position += offsets_size
+        if table.has_normalized:
+            table._normalized_offsets = view[position:position + offsets_size].cast('Q')
+            position += offsets_size
+        table._blob = view[position:position + table._offsets[count]]
+        position += table._offsets[count]
+        if table.has_normalized:
+            table._normalized_blob = view[position:position + table._normalized_offsets[count]]
+        else:
+            table._normalized_offsets = table._normalized_blob = None
+        return table
+
+    def close(self):
+        """Release the memory mapping of an opened table"""
+        if self._mmap is not None:
+            for view in (self._offsets, self._blob, self._normalized_offsets, self._normalized_blob):
+                if view is not None:
+                    view.release()
+            self._mmap.close()
+            self._mmap = None
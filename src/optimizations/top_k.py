@@ -0,0 +1,78 @@
+"""
+Threshold-Algorithm Top-k Merging
+
+This module combines ranked lists from several scoring techniques into the k best
+items by weighted score sum, without materializing every item's combined score. Lists
+are read in parallel by sorted access (best first) and every newly seen item is
+completed by random access to the other lists. The weighted sum of the last score read
+from each list bounds the combined score of any item not seen yet, so reading stops as
+soon as the current k-th best combined score beats that bound.
+
+References:
+- Fagin, R., Lotem, A., & Naor, M. (2003). "Optimal aggregation algorithms for
+  middleware". Journal of Computer and System Sciences, 66(4), 614-656.
+- Ilyas, I. F., Beskales, G., & Soliman, M. A. (2008). "A survey of top-k query
+  processing techniques in relational database systems". ACM Computing Surveys,
+  40(4), 11:1-11:58.
+"""
+
+import bisect
+
+from optimizations import instrumentation as metrics
+
+
+def threshold_top_k(sources, k, expand=None):
+    """
+    Exact top-k of the weighted score sums over several ranked lists.
+
+    Args:
+        sources (list): One (weight, ranked, lookup) tuple per technique: `ranked`
+            iterates (item, score) pairs in non-increasing score order, `lookup(item)`
+            returns the item's score in that list or None when it is not listed. An
+            item's combined score adds weight * score over the lists it appears in,
+            in source order.
+        k (int): Number of results.
+        expand (callable): Maps an item to the result entries it stands for (default:
+            the item itself); all of them share the item's combined score.
+
+    Returns:
+        list: Up to k tuples (entry, score), ordered by score descending, then entry.
+    """
+    if k <= 0:
+        return []
+    iterators = [iter(ranked) for _, ranked, _ in sources]
+    last = [0.0] * len(sources)  # Last score read per list; None once exhausted
+    top = []  # The k best (-score, entry) pairs so far, sorted
+    seen = set()
+    reads = 0
+    active = list(range(len(sources)))
+    while active:
+        for i in list(active):
+            pair = next(iterators[i], None)
+            if pair is None:
+                active.remove(i)
+                last[i] = None
+                continue
+            reads += 1
+            item, last[i] = pair
+            if item in seen:
+                continue
+            seen.add(item)
+            combined = 0.0
+            for weight, _, lookup in sources:
+                score = lookup(item)
+                if score is not None:
+                    combined += weight * score
+            for entry in (expand(item) if expand is not None else (item,)):
+                if len(top) < k or (-combined, entry) < top[-1]:
+                    bisect.insort(top, (-combined, entry))
+                    del top[k:]
+        # No unseen item can score more than the weighted last scores of the lists
+        # still being read (exhausted lists do not contain it at all)
+        threshold = sum(weight * last[i] for i, (weight, _, _) in enumerate(sources) if last[i] is not None)
+        if len(top) == k and -top[-1][0] > threshold:
+            break
+    if metrics.enabled:
+        metrics.incr('top_k.sorted_reads', reads)
+        metrics.incr('top_k.items_combined', len(seen))
+    return [(entry, -score) for score, entry in top]
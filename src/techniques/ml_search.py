@@ -55,17 +55,27 @@ def ml_fuzzy_search(query, targets, threshold=0.4):  # Lowered threshold
     matches.sort(key=lambda x: x[1], reverse=True)
     return matches
 
-def hybrid_fuzzy_search(query, targets, ml_threshold=0.4, edit_threshold=2):
+def hybrid_fuzzy_search(query, targets, ml_threshold=0.4, edit_threshold=2, prefilter=None):
     """
     Perform fuzzy search using a hybrid approach (ML-based + edit distance).
+
+    With a `prefilter` (LowerBoundFilter over `targets`), the edit distance is only
+    computed for targets whose lower bound is within `edit_threshold`.
     """
+    edit_candidates = None
+    if prefilter is not None:
+        edit_candidates = set(prefilter.candidates(query, edit_threshold).tolist())
+
     matches = []
-    for target in targets:
+    for i, target in enumerate(targets):
         # Compute ML-based similarity
         ml_similarity = semantic_similarity(query, target)
         
         # Compute edit distance
-        edit_distance = jellyfish.levenshtein_distance(query, target)
+        if edit_candidates is None or i in edit_candidates:
+            edit_distance = jellyfish.levenshtein_distance(query, target)
+        else:
+            edit_distance = float('inf')
         
         # Match if either condition is met
         if ml_similarity >= ml_threshold or edit_distance <= edit_threshold:
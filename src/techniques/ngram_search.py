@@ -11,11 +11,15 @@ References:
   Stanford University. https://web.stanford.edu/~jurafsky/slp3/
 """
 
+import heapq
+from array import array
 from collections import defaultdict, Counter
+from collections.abc import Mapping
 from nltk.util import ngrams
+from optimizations import instrumentation as metrics
 
 class NGramSearch:
-    def __init__(self, targets, n=2, preprocess=True):
+    def __init__(self, targets, n=2, preprocess=True, key=None):
         """
         Initialize search engine with precomputed n-gram profiles
         
@@ -23,11 +27,180 @@ class NGramSearch:
             targets (list): List of strings to search in
             n (int): N-gram size
             preprocess (bool): Enable lowercase/normalization
+            key (callable): Optional mapping from a target to its string (targets
+                can then be integer ids into a shared string table)
         """
         self.n = n
         self.preprocess = preprocess
+        self.key = key
         self.target_profiles = self._create_profiles(targets)
-        
+        self._postings = None  # Inverted index, built on first use
+
+    @property
+    def target_profiles(self):
+        """Target -> n-gram profile; targets restored by `from_arrays` are profiled here"""
+        if self._profiles is None:
+            self._profiles = self._create_profiles(self._unprofiled)
+            self._unprofiled = None
+        return self._profiles
+
+    @target_profiles.setter
+    def target_profiles(self, profiles):
+        self._profiles = profiles
+        self._unprofiled = None
+
+    def __len__(self):
+        return len(self._profiles) if self._profiles is not None else len(self._unprofiled)
+
+    def _total(self, target):
+        """Number of n-grams of a target, without profiling it"""
+        if self._profiles is not None:
+            return self._profiles[target]['total']
+        return max(0, len(self._normalize(target if self.key is None else self.key(target))) - self.n + 1)
+
+    def _profile(self, target):
+        if self._profiles is not None:
+            return self._profiles[target]
+        return self._create_profiles([target])[target]
+
+    def add(self, targets):
+        """Profile and add new targets (existing ones are left untouched); a built inverted index is patched"""
+        if self._profiles is None:
+            known = set(self._unprofiled)
+            profiles = self._create_profiles(t for t in targets if t not in known)
+            self._unprofiled.extend(profiles)
+        else:
+            profiles = self._create_profiles(t for t in targets if t not in self._profiles)
+            self._profiles.update(profiles)
+        self._patch_postings(profiles, {})
+
+    def remove(self, targets):
+        """Drop targets from the search space; a built inverted index is patched"""
+        if self._profiles is None:
+            known = set(self._unprofiled)
+            removed = [t for t in dict.fromkeys(targets) if t in known]
+            dropped = set(removed)
+            self._unprofiled = [t for t in self._unprofiled if t not in dropped]
+            profiles = self._create_profiles(removed) if self._postings is not None else {}
+        else:
+            profiles = {}
+            for target in targets:
+                profile = self._profiles.pop(target, None)
+                if profile is not None:
+                    profiles[target] = profile
+        self._patch_postings({}, profiles)
+
+    def _patch_postings(self, added, removed):
+        """Replace the posting lists an update touches; lists shared with copies are never mutated"""
+        if self._postings is None or not (added or removed):
+            return
+        updates = {}
+        for profile in removed.values():
+            for gram in profile['counts']:
+                if gram not in updates:
+                    updates[gram] = [entry for entry in self._postings.get(gram, ()) if entry[0] not in removed]
+        for target, profile in added.items():
+            for gram, count in profile['counts'].items():
+                if gram not in updates:
+                    updates[gram] = list(self._postings.get(gram, ()))
+                updates[gram].append((target, count))
+        if isinstance(self._postings, _FlatPostings):
+            self._postings = self._postings.patched(updates)
+            return
+        postings = dict(self._postings)
+        for gram, entries in updates.items():
+            if entries:
+                postings[gram] = entries
+            else:
+                del postings[gram]
+        self._postings = postings
+
+    def copy(self):
+        """
+        Copy sharing the per-target profiles and the inverted index, which updates
+        replace rather than mutate; linear in the number of targets.
+        """
+        clone = NGramSearch([], n=self.n, preprocess=self.preprocess, key=self.key)
+        if self._profiles is None:
+            clone._profiles, clone._unprofiled = None, list(self._unprofiled)
+        else:
+            clone.target_profiles = dict(self._profiles)
+        clone._postings = self._postings
+        return clone
+
+    def to_arrays(self):
+        """
+        Flatten the targets and the inverted index for persistence.
+
+        Only integer targets (e.g. string table ids, see `key`) can be flattened.
+
+        Returns:
+            tuple: array('q') of targets, list of the n-grams (as strings), array('q')
+            of posting offsets (the postings of n-gram i are entries offsets[i] to
+            offsets[i + 1]), and array('q') of the target and of the occurrence count
+            of every posting entry.
+        """
+        postings = self.postings()
+        if isinstance(postings, _FlatPostings) and not postings.replaced:
+            grams, offsets, posting_targets, counts = postings.arrays
+            return (array('q', self._unprofiled if self._profiles is None else self._profiles),
+                    grams, array('q', offsets), array('q', posting_targets), array('q', counts))
+        grams, offsets, posting_targets, counts = [], array('q', [0]), array('q'), array('q')
+        for gram, entries in postings.items():
+            grams.append("".join(gram))
+            for target, count in entries:
+                posting_targets.append(target)
+                counts.append(count)
+            offsets.append(len(posting_targets))
+        return array('q', self.target_profiles), grams, offsets, posting_targets, counts
+
+    @classmethod
+    def from_arrays(cls, targets, grams, offsets, posting_targets, counts, n=2, preprocess=True, key=None):
+        """
+        Restore a search flattened with `to_arrays` without profiling any target.
+
+        The inverted index is served from the arrays (memory-mapped views work as-is);
+        targets are only profiled when a full scan or an update needs their profiles.
+
+        Args:
+            targets, grams, offsets, posting_targets, counts: Sequences returned by
+                `to_arrays`.
+            n, preprocess, key: As in the constructor.
+
+        Returns:
+            NGramSearch: The restored search.
+
+        Raises:
+            ValueError: If the arrays are inconsistent.
+        """
+        if (len(offsets) != len(grams) + 1 or offsets[0] != 0
+                or not offsets[-1] == len(posting_targets) == len(counts)):
+            raise ValueError("n-gram posting arrays are inconsistent")
+        search = cls([], n=n, preprocess=preprocess, key=key)
+        search._profiles = None
+        search._unprofiled = targets.tolist()
+        search._postings = _FlatPostings(grams, offsets, posting_targets, counts)
+        return search
+
+    def postings(self):
+        """Inverted index: n-gram -> list of (target, occurrences in the target)"""
+        if self._postings is None:
+            postings = {}
+            for target, profile in self.target_profiles.items():
+                for gram, count in profile['counts'].items():
+                    postings.setdefault(gram, []).append((target, count))
+            self._postings = postings
+        return self._postings
+
+    def query_ngrams(self, query):
+        """N-gram counts of a query, as used by `search`"""
+        return Counter(ngrams(self._normalize(query), self.n))
+
+    def candidates(self, query):
+        """Targets sharing at least one n-gram with the query (all others score 0)"""
+        postings = self.postings()
+        return {target for gram in self.query_ngrams(query) for target, _ in postings.get(gram, ())}
+
     def _normalize(self, s):
         """Uniform string preprocessing"""
         return s.lower().strip() if self.preprocess else s
@@ -36,7 +209,7 @@ class NGramSearch:
         """Precompute n-gram frequency profiles"""
         profiles = {}
         for target in targets:
-            normalized = self._normalize(target)
+            normalized = self._normalize(target if self.key is None else self.key(target))
             target_ngrams = list(ngrams(normalized, self.n))
             profiles[target] = {
                 'counts': Counter(target_ngrams),
@@ -53,14 +226,20 @@ class NGramSearch:
         query_counts = query_profile['counts']
         target_counts = target_profile['counts']
         
-        intersection = sum((query_counts & target_counts).values())
-        union = sum((query_counts | target_counts).values())
-        containment = intersection / query_profile['total'] if query_profile['total'] > 0 else 0
+        # Multiset intersection; the union follows from the totals
+        intersection = sum(min(count, target_counts[gram]) for gram, count in query_counts.items())
+        return self._combine(intersection, query_profile['total'], target_profile['total'])
+
+    @staticmethod
+    def _combine(intersection, query_total, target_total):
+        """Score of a pair sharing `intersection` n-grams (non-decreasing in it)"""
+        union = query_total + target_total - intersection
+        containment = intersection / query_total if query_total > 0 else 0
         
         jaccard = intersection / union if union > 0 else 0
         return 0.7*jaccard + 0.3*containment  # Weighted combination
 
-    def search(self, query, top_k=5, min_score=0.1):
+    def search(self, query, top_k=5, min_score=0.1, candidates=None):
         """
         Find top matches with combined scoring
         
@@ -68,6 +247,8 @@ class NGramSearch:
             query (str): Search string
             top_k (int): Maximum results to return
             min_score (float): Minimum similarity threshold
+            candidates (iterable): Only score these targets (e.g. `candidates(query)`,
+                which loses nothing when min_score > 0)
             
         Returns:
             list: Sorted matches as (target, score)
@@ -79,11 +260,121 @@ class NGramSearch:
             'total': len(query_ngrams)
         }
         
+        if candidates is None:
+            scored = self.target_profiles.items()
+        else:
+            scored = [(target, self.target_profiles[target]) for target in candidates]
         scores = []
-        for target, profile in self.target_profiles.items():
+        for target, profile in scored:
             score = self._ngram_similarity(query_profile, profile)
             if score >= min_score:
                 scores.append((target, score))
-                
+        if metrics.enabled:
+            metrics.incr('ngram.candidates_scored', len(scored))
+            metrics.incr('ngram.matches', len(scores))
+
         # Sort by score descending, then alphabetically
-        return sorted(scores, key=lambda x: (-x[1], x[0]))[:top_k]
\ No newline at end of file
+        if self.key is None:
+            return sorted(scores, key=lambda x: (-x[1], x[0]))[:top_k]
+        return sorted(scores, key=lambda x: (-x[1], self.key(x[0])))[:top_k]
+
+    def ranked(self, query, min_score=0.1):
+        """
+        Lazily yield matches in `search` order (score descending, then target).
+
+        Query n-grams are processed rarest first through the inverted index. A target
+        first met in a posting list shares at most min(R, |query|, |target|) n-grams
+        with the query, where R counts the query n-grams not processed before; it
+        enters a heap under the score of that many shared n-grams and is only scored
+        exactly when it reaches the top. A target not met yet shares at most the
+        unprocessed n-grams, so an exact score above their bound is final. Taking the
+        first top_k items thus gives `search(query, top_k, min_score)` while scoring
+        few targets beyond the best ones.
+
+        Args:
+            query (str): Search string
+            min_score (float): Minimum similarity threshold (must be > 0 for the
+                index to be exact; otherwise every target is scored)
+
+        Yields:
+            tuple: Matches as (target, score)
+        """
+        if min_score <= 0:
+            yield from self.search(query, top_k=len(self), min_score=min_score)
+            return
+        query_counts = self.query_ngrams(query)
+        total = sum(query_counts.values())
+        query_profile = {'counts': query_counts, 'total': total}
+        postings = self.postings()
+        sort_key = (lambda t: t) if self.key is None else self.key
+
+        # Entries are (-score, exact, key, target): an upper bound (exact=0) sorts
+        # before an exact score of the same value, so ties are resolved by scoring
+        heap = []
+        seen = set()
+        remaining = total
+        grams = sorted(query_counts, key=lambda g: len(postings.get(g, ())))
+        for position in range(len(grams) + 1):
+            # Best score a target outside every processed posting list can reach
+            unseen = self._combine(remaining, total, remaining) if remaining else 0.0
+            while heap and -heap[0][0] > unseen:
+                score, exact, key, target = heapq.heappop(heap)
+                if exact:
+                    yield target, -score
+                    continue
+                if metrics.enabled:
+                    metrics.incr('ngram.candidates_scored')
+                score = self._ngram_similarity(query_profile, self._profile(target))
+                if score >= min_score:
+                    heapq.heappush(heap, (-score, 1, key, target))
+            if position == len(grams) or unseen < min_score:
+                break  # The heap held only qualifying candidates and is now drained
+            gram = grams[position]
+            for target, _ in postings.get(gram, ()):
+                if target in seen:
+                    continue
+                seen.add(target)
+                target_total = self._total(target)
+                bound = self._combine(min(remaining, target_total), total, target_total)
+                if bound >= min_score:
+                    heapq.heappush(heap, (-bound, 0, sort_key(target), target))
+            remaining -= query_counts[gram]
+
+
+class _FlatPostings(Mapping):
+    """
+    Read-only inverted index over flat arrays, with the posting lists replaced by
+    updates kept aside; lists are built from the arrays on first access.
+    """
+
+    def __init__(self, grams, offsets, targets, counts):
+        self.arrays = (grams, offsets, targets, counts)
+        self._index = {tuple(gram): i for i, gram in enumerate(grams)}
+        self._lists = {}
+        self.replaced = {}
+
+    def patched(self, updates):
+        """Copy sharing the arrays, with the posting lists of `updates` replaced"""
+        clone = _FlatPostings.__new__(_FlatPostings)
+        clone.arrays, clone._index, clone._lists = self.arrays, self._index, self._lists
+        clone.replaced = {**self.replaced, **updates}
+        return clone
+
+    def __getitem__(self, gram):
+        entries = self.replaced.get(gram)
+        if entries is None:
+            entries = self._lists.get(gram)
+        if entries is None:
+            _, offsets, targets, counts = self.arrays
+            i = self._index[gram]
+            start, end = offsets[i], offsets[i + 1]
+            # Benign race: concurrent first accesses build identical lists
+            entries = self._lists[gram] = list(zip(targets[start:end].tolist(), counts[start:end].tolist()))
+        return entries
+
+    def __iter__(self):
+        yield from self._index
+        yield from (gram for gram in self.replaced if gram not in self._index)
+
+    def __len__(self):
+        return len(self._index) + sum(1 for gram in self.replaced if gram not in self._index)
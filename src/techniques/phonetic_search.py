@@ -10,8 +10,12 @@ References:
 - Philips, L. (1990). "Hanging on the Metaphone". Computer Language, 7(12), 39-44.
 """
 
+import heapq
+from array import array
+from itertools import islice
 from jellyfish import soundex, metaphone
 from dataclasses import dataclass
+from optimizations import instrumentation as metrics
 
 @dataclass
 class PhoneticConfig:
@@ -22,17 +26,132 @@ class PhoneticConfig:
     metaphone_length: int = 4 
 
 class PhoneticSearch:
-    def __init__(self, targets, config=PhoneticConfig()):
+    def __init__(self, targets, config=PhoneticConfig(), key=None):
         self.config = config
+        self.key = key  # Optional target -> string mapping (targets may be table ids)
         self.targets = self._preprocess_targets(targets)
-        
+        self._groups = None  # soundex -> metaphone -> targets, built on first use
+
+    @property
+    def targets(self):
+        """Per-target code dicts; for a search restored by `from_arrays`, built on first use"""
+        if self._targets is None:
+            self._targets = [
+                {'original': target, 'soundex': code, 'metaphone': meta}
+                for code, metas in self._groups.items()
+                for meta, targets in metas.items()
+                for target in targets
+            ]
+        return self._targets
+
+    @targets.setter
+    def targets(self, targets):
+        self._targets = targets
+
+    def to_arrays(self):
+        """
+        Flatten the code groups for persistence.
+
+        Only integer targets (e.g. string table ids, see `key`) can be flattened.
+
+        Returns:
+            tuple: List of (soundex, metaphone) code pairs, array('q') of offsets (the
+            targets of pair i are entries offsets[i] to offsets[i + 1]) and array('q')
+            of targets.
+        """
+        codes, offsets, targets = [], array('q', [0]), array('q')
+        for code, metas in self.groups().items():
+            for meta, group in metas.items():
+                codes.append((code, meta))
+                targets.extend(group)
+                offsets.append(len(targets))
+        return codes, offsets, targets
+
+    @classmethod
+    def from_arrays(cls, codes, offsets, targets, config=PhoneticConfig(), key=None):
+        """
+        Restore a search flattened with `to_arrays` without computing any code.
+
+        Args:
+            codes, offsets, targets: Sequences returned by `to_arrays` (memory-mapped
+                views work as-is).
+            config, key: As in the constructor.
+
+        Returns:
+            PhoneticSearch: The restored search.
+
+        Raises:
+            ValueError: If the arrays are inconsistent.
+        """
+        if len(offsets) != len(codes) + 1 or offsets[0] != 0 or offsets[-1] != len(targets):
+            raise ValueError("phonetic code arrays are inconsistent")
+        search = cls([], config, key)
+        offsets, targets = offsets.tolist(), targets.tolist()
+        groups = {}
+        for i, (code, meta) in enumerate(codes):
+            groups.setdefault(code, {})[meta] = targets[offsets[i]:offsets[i + 1]]
+        search._groups = groups
+        search._targets = None
+        return search
+
+    def add(self, targets):
+        """Compute codes for new targets and append them; built code groups are patched"""
+        added = self._preprocess_targets(targets)
+        if self._targets is not None:
+            self._targets.extend(added)
+        self._patch_groups(added, ())
+
+    def remove(self, targets):
+        """Drop targets from the search space; built code groups are patched"""
+        removed = set(targets)
+        if self._targets is None:
+            dropped = self._preprocess_targets(removed)
+        else:
+            dropped = [t for t in self._targets if t['original'] in removed]
+            self._targets = [t for t in self._targets if t['original'] not in removed]
+        self._patch_groups((), dropped)
+
+    def _patch_groups(self, added, dropped):
+        """Replace the code groups an update touches; groups shared with copies are never mutated"""
+        if self._groups is None or not (added or dropped):
+            return
+        removed = {t['original'] for t in dropped}
+        touched = {}
+        for target in dropped:
+            touched.setdefault(target['soundex'], {}).setdefault(target['metaphone'], [])
+        for target in added:
+            touched.setdefault(target['soundex'], {}).setdefault(target['metaphone'], []).append(
+                target['original']
+            )
+        groups = dict(self._groups)
+        for code, metas in touched.items():
+            merged = dict(groups.get(code, {}))
+            for meta, new in metas.items():
+                kept = [t for t in merged.get(meta, ()) if t not in removed] + new
+                if kept:
+                    merged[meta] = kept
+                else:
+                    merged.pop(meta, None)
+            if merged:
+                groups[code] = merged
+            else:
+                groups.pop(code, None)
+        self._groups = groups
+
+    def copy(self):
+        """Copy sharing the per-target code dicts and the code groups; linear in the number of targets"""
+        clone = PhoneticSearch([], self.config, self.key)
+        clone.targets = None if self._targets is None else list(self._targets)
+        clone._groups = self._groups
+        return clone
+
     def _preprocess(self, s):
         return s.lower().replace("-", " ").strip() if self.config.normalize else s
 
     def _preprocess_targets(self, targets):
         preprocessed = []
         for target in targets:
-            processed = self._preprocess(target)
+            processed = self._preprocess(target if self.key is None else self.key(target))
             preprocessed.append({
                 'original': target,
                 'soundex': soundex(processed),
@@ -60,17 +179,82 @@ class PhoneticSearch:
             
         return min(score, 1.0)
 
-    def search(self, query, top_k=5):
+    def groups(self):
+        """Targets grouped by soundex code, then by (truncated) metaphone code"""
+        if self._groups is None:
+            groups = {}
+            for target in self.targets:
+                groups.setdefault(target['soundex'], {}).setdefault(target['metaphone'], []).append(
+                    target['original']
+                )
+            self._groups = groups
+        return self._groups
+
+    def ranked(self, query):
+        """
+        Lazily yield matches in `search` order (score descending, then target).
+
+        A score only depends on the target's pair of codes, so each distinct pair is
+        scored once. Targets sharing the query's soundex code come first: everyone
+        else scores at most the metaphone weight, so bucket matches above it are
+        yielded before the rest of the collection is looked at.
+
+        Args:
+            query (str): Search string
+
+        Yields:
+            tuple: Matches as (target, score)
+        """
         processed_query = self._preprocess(query)
         query_codes = {
             'soundex': soundex(processed_query),
             'metaphone': metaphone(processed_query)  # Removed max_length
         }
-        
-        scored_matches = []
-        for target in self.targets:
-            score = self._calculate_score(query_codes, target)
-            if score >= self.config.min_score:
-                scored_matches.append((target['original'], score))
-                
-        return sorted(scored_matches, key=lambda x: (-x[1], x[0]))[:top_k]
\ No newline at end of file
+        min_score = self.config.min_score
+        sort_key = (lambda t: t) if self.key is None else self.key
+        groups = self.groups()
+
+        heap = []
+        scored = 0
+        for meta, targets in groups.get(query_codes['soundex'], {}).items():
+            score = self._calculate_score(query_codes, {'soundex': query_codes['soundex'], 'metaphone': meta})
+            scored += len(targets)
+            if score >= min_score:
+                heap.extend((-score, sort_key(t), t) for t in targets)
+        heapq.heapify(heap)
+        if metrics.enabled:
+            metrics.incr('phonetic.candidates_scored', scored)
+            metrics.incr('phonetic.matches', len(heap))
+
+        # Without a soundex match only the metaphone part can contribute
+        bound = min(self.config.metaphone_weight, 1.0)
+        while heap and -heap[0][0] > bound:
+            score, _, target = heapq.heappop(heap)
+            yield target, -score
+        if bound >= min_score:
+            meta_scores = {}
+            rest = []
+            scored = 0
+            for code, metas in groups.items():
+                if code == query_codes['soundex']:
+                    continue
+                for meta, targets in metas.items():
+                    score = meta_scores.get(meta)
+                    if score is None:
+                        score = meta_scores[meta] = self._calculate_score(
+                            query_codes, {'soundex': code, 'metaphone': meta}
+                        )
+                    scored += len(targets)
+                    if score >= min_score:
+                        rest.extend((-score, sort_key(t), t) for t in targets)
+            if metrics.enabled:
+                metrics.incr('phonetic.candidates_scored', scored)
+                metrics.incr('phonetic.matches', len(rest))
+            heap.extend(rest)
+            heapq.heapify(heap)
+        while heap:
+            score, _, target = heapq.heappop(heap)
+            yield target, -score
+
+    def search(self, query, top_k=5):
+        return list(islice(self.ranked(query), top_k))
\ No newline at end of file
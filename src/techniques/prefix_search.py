@@ -0,0 +1,235 @@
+"""
+Incremental Fuzzy Prefix Search (Search-as-you-type)
+
+This module provides a trie-based fuzzy prefix search for autocomplete boxes. A session
+keeps the set of "active" trie nodes (prefixes within edit distance k of the query typed
+so far) and derives the next set from it when a character is typed, instead of
+recomputing every edit-distance matrix from scratch. Backspace restores the saved state
+of the previous keystroke.
+
+References:
+- Ji, S., Li, G., Li, C., & Feng, J. (2009). "Efficient interactive fuzzy keyword search".
+  Proceedings of WWW '09, 371-380.
+- Chaudhuri, S., & Kaushik, R. (2009). "Extending autocompletion to tolerate errors".
+  Proceedings of SIGMOD '09, 707-718.
+"""
+
+
+class PrefixTrie:
+    def __init__(self, keys=(), payload_key=str):
+        """
+        Initialize the trie with a list of keys.
+
+        Args:
+            keys (iterable): Strings to index; each key is its own payload.
+            payload_key (callable): Maps a payload to the string used to order ties.
+        """
+        self.payload_key = payload_key
+        self.children = [{}]   # node id -> {char: child node id}
+        self.depth = [0]       # node id -> length of the prefix it spells
+        self.payloads = [[]]   # node id -> payloads of keys ending here
+        for key in keys:
+            self.add(key)
+
+    def add(self, key, payload=None):
+        """
+        Insert a key.
+
+        Args:
+            key (str): The string to index.
+            payload: Value reported when the key matches (defaults to the key).
+        """
+        node = 0
+        for char in key:
+            child = self.children[node].get(char)
+            if child is None:
+                child = len(self.children)
+                self.children.append({})
+                self.depth.append(self.depth[node] + 1)
+                self.payloads.append([])
+                self.children[node][char] = child
+            node = child
+        self.payloads[node].append(key if payload is None else payload)
+
+    def initial_state(self, max_distance):
+        """Active nodes for the empty query: every prefix of length <= max_distance"""
+        active = {}
+        stack = [(0, 0)]
+        while stack:
+            node, distance = stack.pop()
+            active[node] = distance
+            if distance < max_distance:
+                for child in self.children[node].values():
+                    stack.append((child, distance + 1))
+        return active
+
+    def step(self, active, char, max_distance):
+        """
+        Extend the query by one character.
+
+        Args:
+            active (dict): Active nodes of the current query (node id -> prefix distance).
+            char (str): The typed character.
+            max_distance (int): The maximum allowed edit distance.
+
+        Returns:
+            dict: Active nodes of the extended query.
+        """
+        children = self.children
+        new_active = {}
+        for node, distance in active.items():
+            # Delete the typed character
+            if distance < max_distance and new_active.get(node, max_distance + 1) > distance + 1:
+                new_active[node] = distance + 1
+            # Descendants i levels down: i-1 insertions followed by a match or substitution
+            frontier = [node]
+            for i in range(1, max_distance - distance + 2):
+                next_frontier = []
+                for parent in frontier:
+                    for label, child in children[parent].items():
+                        new_distance = distance + i - 1 if label == char else distance + i
+                        if new_distance <= max_distance and new_active.get(child, max_distance + 1) > new_distance:
+                            new_active[child] = new_distance
+                        next_frontier.append(child)
+                frontier = next_frontier
+        return new_active
+
+    def collect(self, active, max_results):
+        """
+        Rank the keys below the active nodes.
+
+        Keys are ordered by prefix distance, then by length (a shorter completion is a
+        closer one), then alphabetically. Subtrees are walked breadth-first per distance
+        level, so only as much of the trie is visited as the result count needs.
+
+        Args:
+            active (dict): Active nodes (node id -> prefix distance).
+            max_results (int): Maximum number of results to return.
+
+        Returns:
+            list: Tuples (payload, prefix distance).
+        """
+        best = {}
+        order = []
+        for level in sorted(set(active.values())):
+            buckets = {}
+            for node, distance in active.items():
+                if distance == level:
+                    buckets.setdefault(self.depth[node], []).append(node)
+            visited = set()
+            depth = min(buckets)
+            while buckets:
+                found = []
+                next_nodes = []
+                for node in buckets.pop(depth, ()):
+                    if node in visited:
+                        continue
+                    visited.add(node)
+                    found.extend(self.payloads[node])
+                    next_nodes.extend(self.children[node].values())
+                if next_nodes:
+                    buckets.setdefault(depth + 1, []).extend(next_nodes)
+                for payload in sorted(found, key=self.payload_key):
+                    if payload not in best:
+                        best[payload] = level
+                        order.append((level, depth, payload))
+                depth += 1
+                if len(best) >= max_results:
+                    break
+            if len(best) >= max_results:
+                break
+        order.sort(key=lambda x: (x[0], x[1], self.payload_key(x[2])))
+        return [(payload, distance) for distance, _, payload in order[:max_results]]
+
+
+class PrefixSearchSession:
+    def __init__(self, trie, max_distance=2, max_results=5, normalize=None, resolve=None,
+                 collapse_whitespace=False):
+        """
+        Start an autocomplete session with an empty query.
+
+        Args:
+            trie (PrefixTrie): The index to search.
+            max_distance (int): The maximum allowed prefix edit distance.
+            max_results (int): Maximum results returned per keystroke.
+            normalize (callable): Optional per-character normalization of typed text.
+            resolve (callable): Optional mapping applied to reported payloads
+                (e.g. string table ids to strings).
+            collapse_whitespace (bool): Turn every whitespace run of the query into a
+                single space and drop leading whitespace, across keystrokes (for keys
+                normalized with `" ".join(s.split())`).
+        """
+        self.trie = trie
+        self.max_distance = max_distance
+        self.max_results = max_results
+        self.normalize = normalize
+        self.resolve = resolve
+        self.collapse_whitespace = collapse_whitespace
+        self._query = []
+        self._states = [trie.initial_state(max_distance)]  # One saved state per keystroke
+
+    @property
+    def query(self):
+        return "".join(self._query)
+
+    def type(self, text):
+        """Append characters to the query and return the updated results"""
+        self._extend(self._prepare(text, self._query))
+        return self.results()
+
+    def _prepare(self, text, query):
+        """Normalize typed text that will follow `query` (a list of characters)"""
+        if self.normalize:
+            text = self.normalize(text)
+        if not self.collapse_whitespace:
+            return text
+        chars = []
+        previous = query[-1] if query else " "  # Leading whitespace is dropped
+        for char in text:
+            if char.isspace():
+                if previous == " ":
+                    continue
+                char = " "
+            chars.append(char)
+            previous = char
+        return "".join(chars)
+
+    def _extend(self, text):
+        for char in text:
+            self._states.append(self.trie.step(self._states[-1], char, self.max_distance))
+            self._query.append(char)
+
+    def backspace(self, count=1):
+        """Remove characters from the end of the query by rolling back saved states"""
+        count = min(count, len(self._query))
+        if count:
+            del self._states[-count:]
+            del self._query[-count:]
+        return self.results()
+
+    def update(self, text):
+        """
+        Set the query to `text`, reusing the state of the longest common prefix.
+
+        Args:
+            text (str): The full content of the search box.
+
+        Returns:
+            list: Tuples (payload, prefix distance).
+        """
+        text = self._prepare(text, [])
+        common = 0
+        for typed, char in zip(self._query, text):
+            if typed != char:
+                break
+            common += 1
+        self.backspace(len(self._query) - common)
+        self._extend(text[common:])
+        return self.results()
+
+    def results(self):
+        """Best completions for the current query"""
+        results = self.trie.collect(self._states[-1], self.max_results)
+        if self.resolve is None:
+            return results
+        return [(self.resolve(payload), distance) for payload, distance in results]
@@ -0,0 +1,215 @@
+"""
+Streaming Batch Record Linkage
+Fuzzy-match a file (or stdin) of user-entered place strings against a gazetteer
+
+Usage:
+    python batch_match.py --corpus data/openstreetmap/place_names_reduced.txt \\
+        --queries queries.txt --output matches.jsonl --checkpoint matches.ckpt
+
+Queries are read as a stream and processed in ordered chunks over a process pool; the
+index is built once in the parent and inherited by the workers. Results are written
+incrementally (JSONL or CSV) and, with --checkpoint, the number of queries fully written
+is recorded after every chunk so an interrupted run can be resumed.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from rapidfuzz.distance import Levenshtein
+from optimizations.bk_tree import BKTree
+from optimizations.corpus_stream import iter_corpus
+from optimizations.parallel_processing import chunker, BatchScorer
+from use_cases.tourism.search import TourismSearchEngine
+
+INDEXES = ('bktree', 'linear', 'engine')
+
+_MATCHER = None  # Per-process matcher, built once (inherited by forked workers)
+
+
+def build_matcher(corpus, index='bktree', column=None, max_distance=2, max_results=5):
+    """
+    Build the matching function for the chosen index.
+
+    Args:
+        corpus (str): Gazetteer file, one name per line or CSV.
+        index (str): 'bktree', 'linear' (rapidfuzz scan) or 'engine' (hybrid scores).
+        column (int or str): CSV column holding the names.
+        max_distance (int): Maximum edit distance for 'bktree' and 'linear'.
+        max_results (int): Maximum matches reported per query.
+
+    Returns:
+        callable: query -> list of (name, distance or score).
+    """
+    names = iter_corpus(corpus, column=column)
+    if index == 'bktree':
+        tree = BKTree([], Levenshtein.distance)
+        tree.add(names)
+        return lambda query: tree.search(query, max_distance)[:max_results]
+    if index == 'linear':
+        scorer = BatchScorer(names)
+        return lambda query: scorer.search(query, max_distance)[:max_results]
+    if index == 'engine':
+        engine = TourismSearchEngine.from_corpus(corpus, column=column, cache_size=0)
+        return lambda query: engine.search(query, max_results)
+    raise ValueError(f"Unknown index '{index}', expected one of {INDEXES}")
+
+
+def _init_worker(matcher_args):
+    global _MATCHER
+    if _MATCHER is None:  # Only rebuilt under the 'spawn' start method
+        _MATCHER = build_matcher(**matcher_args)
+
+
+def _match_chunk(chunk):
+    return [(offset, query, _MATCHER(query)) for offset, query in chunk]
+
+
+class _Writer:
+    def __init__(self, out, fmt):
+        self.out = out
+        self.fmt = fmt
+        self.csv = csv.writer(out) if fmt == 'csv' else None
+
+    def write_header(self):
+        if self.csv:
+            self.csv.writerow(['offset', 'query', 'match', 'score'])
+
+    def write(self, offset, query, matches):
+        if self.csv:
+            for name, score in matches or [('', '')]:
+                self.csv.writerow([offset, query, name, score])
+        else:
+            record = {'offset': offset, 'query': query, 'matches': [[n, s] for n, s in matches]}
+            self.out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def _read_checkpoint(path):
+    try:
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _write_checkpoint(path, offset):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(str(offset))
+    os.replace(tmp, path)  # Atomic, so a crash never leaves a torn checkpoint
+
+
+def run(queries, out, matcher_args, fmt='jsonl', workers=None, chunk_size=1000,
+        start_offset=0, checkpoint=None, progress=None):
+    """
+    Match a stream of queries and write the results in input order.
+
+    Args:
+        queries (iterable): Query strings (already positioned at `start_offset`).
+        out (file): Text stream receiving the results.
+        matcher_args (dict): Keyword arguments of `build_matcher`.
+        fmt (str): 'jsonl' or 'csv'.
+        workers (int): Worker processes (None = all cores, 1 = in-process).
+        chunk_size (int): Queries per unit of work.
+        start_offset (int): Offset of the first query, used in output and checkpoints.
+        checkpoint (str): Optional file updated with the next offset after every chunk.
+        progress (file): Optional stream receiving throughput reports.
+
+    Returns:
+        int: Number of queries processed.
+    """
+    global _MATCHER
+    workers = workers or cpu_count()
+    writer = _Writer(out, fmt)
+    if start_offset == 0:
+        writer.write_header()
+
+    _MATCHER = build_matcher(**matcher_args)
+    chunks = chunker(enumerate((q.rstrip('\r\n') for q in queries), start_offset), chunk_size)
+
+    processed = 0
+    next_offset = start_offset
+    start = time.perf_counter()
+
+    def emit(results):
+        nonlocal processed, next_offset
+        for offset, query, matches in results:
+            writer.write(offset, query, matches)
+        out.flush()
+        processed += len(results)
+        next_offset = results[-1][0] + 1
+        if checkpoint:
+            _write_checkpoint(checkpoint, next_offset)
+        if progress:
+            elapsed = time.perf_counter() - start
+            progress.write(f"{next_offset} queries done, {processed / elapsed:.1f} queries/s\n")
+            progress.flush()
+
+    if workers == 1:
+        for chunk in chunks:
+            emit(_match_chunk(chunk))
+        return processed
+
+    with Pool(workers, initializer=_init_worker, initargs=(matcher_args,)) as pool:
+        # Bounded window of in-flight chunks keeps memory flat on unbounded input
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_match_chunk, (chunk,)))
+            if len(pending) >= 2 * workers:
+                emit(pending.popleft().get())
+        while pending:
+            emit(pending.popleft().get())
+    return processed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--corpus', required=True, help="Gazetteer file (text or CSV)")
+    parser.add_argument('--column', help="CSV column with the names (name or index)")
+    parser.add_argument('--queries', default='-', help="Query file, one per line ('-' = stdin)")
+    parser.add_argument('--output', default='-', help="Result file ('-' = stdout)")
+    parser.add_argument('--format', choices=('jsonl', 'csv'), default='jsonl')
+    parser.add_argument('--index', choices=INDEXES, default='bktree')
+    parser.add_argument('--max-distance', type=int, default=2)
+    parser.add_argument('--max-results', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--resume-from', type=int, default=None,
+                        help="Skip this many queries (default: value stored in --checkpoint)")
+    parser.add_argument('--checkpoint', help="File recording the next query offset")
+    parser.add_argument('--quiet', action='store_true', help="Do not report throughput")
+    args = parser.parse_args(argv)
+
+    column = int(args.column) if args.column and args.column.isdigit() else args.column
+    matcher_args = {
+        'corpus': args.corpus, 'index': args.index, 'column': column,
+        'max_distance': args.max_distance, 'max_results': args.max_results,
+    }
+    offset = args.resume_from
+    if offset is None:
+        offset = _read_checkpoint(args.checkpoint) if args.checkpoint else 0
+
+    queries = sys.stdin if args.queries == '-' else open(args.queries, encoding='utf-8')
+    out = sys.stdout if args.output == '-' else open(
+        args.output, 'a' if offset else 'w', encoding='utf-8', newline='')
+    try:
+        run(islice(queries, offset, None), out, matcher_args, fmt=args.format,
+            workers=args.workers, chunk_size=args.chunk_size, start_offset=offset,
+            checkpoint=args.checkpoint, progress=None if args.quiet else sys.stderr)
+    finally:
+        if queries is not sys.stdin:
+            queries.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,49 +9,966 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from optimizations.bk_tree import BKTree
+from optimizations.query_cache import QueryCache
+from optimizations import instrumentation as metrics
+from optimizations.corpus_stream import iter_corpus
+from optimizations.parallel_processing import chunker
+from optimizations.string_table import StringTable
+from optimizations.query_planner import QueryPlanner, CostModel, default_bk_fraction
+from optimizations.top_k import threshold_top_k
+from algorithms.damerau_levenshtein import (
+    bit_parallel_osa_distance, damerau_levenshtein_distance, unrestricted_damerau_levenshtein_distance
+)
 from algorithms.levenshtein import levenshtein_distance
-from techniques.phonetic_search import PhoneticSearch
+from algorithms.bit_parallel import bit_parallel_levenshtein
+from algorithms.bit_parallel import SemiGlobalMatcher
+from techniques.phonetic_search import PhoneticSearch, PhoneticConfig
 from techniques.ngram_search import NGramSearch
+from techniques.prefix_search import PrefixTrie, PrefixSearchSession
+from array import array
 from collections import defaultdict
+from itertools import islice
+from dataclasses import asdict
+import hashlib
+import json
+import logging
+import mmap
+import struct
+import threading
+import time
+
+import numpy as np
+
+SNAPSHOT_VERSION = 3
+_log = logging.getLogger('fuzzysearch.snapshot')
+
+# Unit-cost edit distances, for which the planner's length and q-gram bounds hold
+UNIT_COST_DISTANCES = (
+    bit_parallel_osa_distance, damerau_levenshtein_distance, levenshtein_distance, bit_parallel_levenshtein,
+)
+
+# Optimal string alignment kernels: not metrics, so the BK-tree is routed by the
+# unrestricted Damerau-Levenshtein metric (never larger) and its results rescored
+OSA_DISTANCES = (bit_parallel_osa_distance, damerau_levenshtein_distance)
+
+
+def bk_metric(distance_func):
+    """Metric routing the BK-tree of an engine scoring with `distance_func`"""
+    return unrestricted_damerau_levenshtein_distance if distance_func in OSA_DISTANCES else distance_func
+
+
+def normalize_location(s):
+    """Canonical form shared by every sub-index and the query cache"""
+    return " ".join(normalize_typed(s).split())
+
+
+def normalize_typed(s):
+    """
+    Per-character part of `normalize_location`, safe to apply one keystroke at a time
+    (prefix sessions collapse the whitespace runs themselves)
+    """
+    return s.lower().replace("-", " ")
+
+
+class SnapshotError(ValueError):
+    """A saved engine snapshot is missing, corrupt or stale"""
+
+
+def _qualified_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def _importable_name(func):
+    """
+    Qualified name of `func` if importing it by that name gives `func` back, else None
+    (lambdas, nested functions and callable objects cannot be told apart by name).
+    """
+    target = sys.modules.get(getattr(func, '__module__', None))
+    for part in getattr(func, '__qualname__', '<unnamed>').split('.'):
+        target = getattr(target, part, None)
+    return _qualified_name(func) if target is func else None
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _IndexState:
+    """
+    Immutable-by-convention snapshot of the corpus and every sub-index.
+
+    The strings live only in `table` (originals plus their normalized column); the
+    sub-indexes store the row id of one representative per normalized form, and the
+    BK-tree maps a normalized form back to its representative (`BKTree.find`).
+    """
+
+    def __init__(self, table, rows, groups, bk_tree, phonetic, ngram, generation):
+        self.table = table
+        self.rows = rows      # live row ids, in insertion order
+        self.groups = groups  # indexed row id -> live row ids of the same normalized form
+        self.bk_tree = bk_tree
+        self.phonetic = phonetic
+        self.ngram = ngram
+        self.generation = generation
+        self.prefix_trie = None  # Built on first autocomplete use
+        self.length_index = None  # Built on first planned scan
+        self.text_matchers = {}  # (max_distance, min_length) -> (rep ids, matcher), built on use
+
+    @property
+    def locations(self):
+        return [self.table[i] for i in self.rows]
+
+    def spellings(self, rep_id):
+        """Live original spellings sharing the normalized form of row `rep_id`"""
+        return [self.table[i] for i in self.groups[rep_id]]
+
+    def get_length_index(self):
+        """
+        Indexed ids sorted by key length, with `starts[L]` the position of the first key
+        of length >= L (so the keys of length L..H are ids[starts[L]:starts[H + 1]]).
+        """
+        if self.length_index is None:
+            key = self.table.normalized
+            ids = np.fromiter(self.groups, dtype=np.int64, count=len(self.groups))
+            lengths = np.fromiter((len(key(rep)) for rep in self.groups), dtype=np.int64,
+                                  count=len(self.groups))
+            order = np.argsort(lengths, kind='stable')
+            lengths = lengths[order]
+            starts = np.searchsorted(lengths, np.arange(lengths.max(initial=0) + 2))
+            self.length_index = (ids[order], starts)
+        return self.length_index
+
+    def patch_length_index(self, old, added=(), removed=()):
+        """
+        Derive the length index from the one of `old` (if built) given the indexed ids
+        added and removed since, without re-reading every key; `old`'s arrays are kept.
+        """
+        if old.length_index is None:
+            return
+        ids, starts = old.length_index
+        key = self.table.normalized
+        lengths = np.fromiter((len(key(rep_id)) for rep_id in added), dtype=np.int64, count=len(added))
+        size = max(len(starts), int(lengths.max(initial=0)) + 2)
+        starts = np.concatenate([starts, np.full(size - len(starts), starts[-1])])
+        if len(removed):
+            keep = ~np.isin(ids, np.asarray(removed, dtype=np.int64))
+            # starts[L] counts the keys shorter than L, which precede position starts[L]
+            starts = starts - np.searchsorted(np.flatnonzero(~keep), starts)
+            ids = ids[keep]
+        if len(added):
+            # New ids go last among the keys of their length, as in a rebuild; ids
+            # inserted at one position keep their order, so they are sorted first
+            order = np.argsort(lengths, kind='stable')
+            lengths = lengths[order]
+            ids = np.insert(ids, starts[lengths + 1], np.asarray(added, dtype=np.int64)[order])
+            starts = starts + np.searchsorted(lengths, np.arange(size))
+        self.length_index = (ids, starts)
+
+    def length_range(self, low, high):
+        """Position range of the keys whose length lies in [low, high]"""
+        ids, starts = self.get_length_index()
+        last = len(starts) - 1
+        return starts[min(max(low, 0), last)], starts[min(max(high + 1, 0), last)]
+
+    def get_text_matcher(self, max_distance, min_length):
+        """
+        Representative ids of the keys at least `min_length` long, and a compiled
+        SemiGlobalMatcher over those keys (None if there are none).
+        """
+        # Benign race: concurrent first calls compile identical matchers
+        cached = self.text_matchers.get((max_distance, min_length))
+        if cached is None:
+            key = self.table.normalized
+            reps = [rep_id for rep_id in self.groups if len(key(rep_id)) >= min_length]
+            matcher = SemiGlobalMatcher([key(rep_id) for rep_id in reps], max_distance) if reps else None
+            cached = self.text_matchers[(max_distance, min_length)] = (reps, matcher)
+        return cached
+
+    def get_prefix_trie(self):
+        # Benign race: concurrent first calls build identical tries
+        if self.prefix_trie is None:
+            trie = PrefixTrie(payload_key=self.table.__getitem__)
+            for rep_id, rows in self.groups.items():
+                key = self.table.normalized(rep_id)
+                seen = set()
+                for i in rows:
+                    loc = self.table[i]
+                    if loc not in seen:
+                        seen.add(loc)
+                        trie.add(key, i)
+            self.prefix_trie = trie
+        return self.prefix_trie
+
 
 class TourismSearchEngine:
-    def __init__(self, locations):
-        self.locations = locations
-        
-        # Initialize BK-Tree with empty word list and distance function
-        self.bk_tree = BKTree([], levenshtein_distance)  # Fixed initialization
-        self.phonetic = PhoneticSearch(locations)
-        self.ngram = NGramSearch(locations, n=3)
-        
-        # Populate BK-Tree with locations
-        for loc in locations:
-            self.bk_tree.insert(loc)
-            
+    def __init__(self, locations, cache_size=1024, cache_ttl=None, warm_queries=None,
+                 distance_func=bit_parallel_osa_distance, planner=None):
+        """
+        Build every sub-index over the given locations.
+
+        Args:
+            locations (list): Location names to search in.
+            cache_size (int): Maximum number of cached query results (0 disables the cache).
+            cache_ttl (float): Optional lifetime of a cached result in seconds.
+            warm_queries (list): Frequent queries to precompute at startup.
+            distance_func (callable): Edit distance of the Levenshtein stage. The
+                default (optimal string alignment) counts a swap of adjacent letters
+                as one edit. It is not a metric, so the BK-tree is routed by the
+                unrestricted Damerau-Levenshtein distance and rescored (see
+                `bk_metric`); any other function must be a metric itself.
+            planner (QueryPlanner): Chooses the execution plan of every query
+                (default: uncalibrated cost model, see `calibrate_planner`).
+        """
         self.weights = {
             'levenshtein': 0.6,
             'phonetic': 0.3,
             'ngram': 0.1
         }
+        self.distance_func = distance_func
+        self.planner = planner or QueryPlanner()
+        self.cache = QueryCache(max_size=cache_size, ttl=cache_ttl)
+        self._write_lock = threading.Lock()
+        self._state = None
+        self.source = None  # Corpus fingerprint, set by from_corpus
+        self._build_indexes(locations)
+
+        if warm_queries:
+            self.warm_cache(warm_queries)
+
+    def _new_indexes(self, table):
+        key = table.normalized
+        return (
+            BKTree([], bk_metric(self.distance_func), key=key),
+            PhoneticSearch([], PhoneticConfig(normalize=False), key=key),
+            NGramSearch([], n=3, preprocess=False, key=key),
+        )
+
+    def _build_indexes(self, locations, chunk_size=10000):
+        """(Re)build all sub-indexes from an iterable and invalidate cached results"""
+        # Every location is normalized once, into the string table; exact duplicates
+        # are dropped before they reach it, so every row of the table is indexed
+        table = StringTable(normalized=normalize_location)
+        seen = defaultdict(list)  # Hash of a spelling -> rows holding that hash
+
+        def rows():
+            for loc in locations:
+                same_hash = seen[hash(loc)]
+                if any(table[i] == loc for i in same_hash):
+                    continue
+                row = table.append(loc, normalize_location(loc))
+                same_hash.append(row)
+                yield row
+
+        self._index_rows(table, rows(), chunk_size)
+
+    def _index_rows(self, table, rows, chunk_size):
+        """Index table rows; the sub-indexes only store ids of new normalized forms"""
+        bk_tree, phonetic, ngram = self._new_indexes(table)
+
+        # Fed one chunk at a time so the input never has to be a list
+        groups = {}
+        live = array('Q')
+        for chunk in chunker(rows, chunk_size):
+            new_ids = []
+            for row in chunk:
+                rep_id = bk_tree.insert(row)  # The existing representative of a repeated form
+                if rep_id == row:
+                    groups[row] = [row]
+                    new_ids.append(row)
+                else:
+                    spellings = groups[rep_id]
+                    loc = table[row]
+                    if any(table[i] == loc for i in spellings):
+                        continue  # Exact duplicates in a given table are left unindexed
+                    spellings.append(row)
+                live.append(row)
+            phonetic.add(new_ids)
+            ngram.add(new_ids)
+
+        with self._write_lock:
+            generation = self._state.generation + 1 if self._state else 1
+            self._swap(_IndexState(table, live, groups, bk_tree, phonetic, ngram, generation))
+
+    @classmethod
+    def from_corpus(cls, path, column=None, chunk_size=10000, **kwargs):
+        """
+        Build an engine by streaming a text or CSV corpus file.
+
+        Args:
+            path (str): Corpus file, one name per line or CSV.
+            column (int or str): CSV column holding the names (None = plain text).
+            chunk_size (int): Number of names indexed at a time.
+            **kwargs: Forwarded to the constructor (cache settings).
+
+        Returns:
+            TourismSearchEngine: The populated engine.
+        """
+        warm_queries = kwargs.pop('warm_queries', None)
+        engine = cls([], **kwargs)
+        engine._build_indexes(iter_corpus(path, column=column), chunk_size)
+        engine.source = {'path': os.path.abspath(path), 'column': column, 'sha256': _file_sha256(path)}
+        if warm_queries:
+            engine.warm_cache(warm_queries)
+        return engine
+
+    @classmethod
+    def from_table(cls, table, chunk_size=10000, **kwargs):
+        """
+        Build an engine over an existing string table without copying its strings.
+
+        A table saved with `engine.table.save(path)` can be memory-mapped here by every
+        worker process, so all of them share one physical copy of the corpus.
+
+        Args:
+            table (StringTable or str): Table with a normalized column, or its file path;
+                every row is indexed, except repeats of an earlier row's exact spelling.
+            chunk_size (int): Number of names indexed at a time.
+            **kwargs: Forwarded to the constructor (cache settings).
+
+        Returns:
+            TourismSearchEngine: The populated engine.
+        """
+        if isinstance(table, str):
+            table = StringTable.open(table)
+        if not table.has_normalized:
+            raise ValueError("the string table has no normalized column")
+        warm_queries = kwargs.pop('warm_queries', None)
+        engine = cls([], **kwargs)
+        engine._index_rows(table, range(len(table)), chunk_size)
+        if warm_queries:
+            engine.warm_cache(warm_queries)
+        return engine
+
+    def _snapshot_config(self):
+        """Everything besides the corpus that the saved indexes depend on"""
+        state = self._state
+        return {
+            'distance_func': _importable_name(self.distance_func),
+            'bk_metric': _importable_name(bk_metric(self.distance_func)),
+            'normalize': _qualified_name(normalize_location),
+            'ngram_n': state.ngram.n,
+            'phonetic': asdict(state.phonetic.config),
+        }
+
+    def save(self, directory):
+        """
+        Snapshot the corpus, every sub-index and the weights into a directory.
+
+        Files are written under temporary names and renamed; `manifest.json`, holding the
+        format version, configuration and a SHA-256 checksum of every file, is written
+        last, so an interrupted save never leaves a snapshot that passes verification.
+
+        Args:
+            directory (str): Target directory (created if needed).
+        """
+        state = self._state
+        os.makedirs(directory, exist_ok=True)
+        files = {}
+
+        def write(name, data):
+            path = os.path.join(directory, name)
+            with open(path + ".tmp", 'wb') as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            files[name] = hashlib.sha256(data).hexdigest()
+
+        def write_table(name, table):
+            path = os.path.join(directory, name)
+            table.save(path)
+            files[name] = _file_sha256(path)
+
+        write_table('strings.fzst', state.table)
+        write('rows.bin', array('Q', state.rows).tobytes())
+
+        # Groups in CSR form: the rows of reps[i] are members[offsets[i]:offsets[i + 1]]
+        reps, offsets, members = array('q'), array('q', [0]), array('q')
+        for rep_id, rows in state.groups.items():
+            reps.append(rep_id)
+            members.extend(rows)
+            offsets.append(len(members))
+        write('group_reps.bin', reps.tobytes())
+        write('group_offsets.bin', offsets.tobytes())
+        write('group_members.bin', members.tobytes())
+
+        items, parents, distances, deleted = state.bk_tree.to_arrays()
+        write('bk_items.bin', items.tobytes())
+        write('bk_parents.bin', parents.tobytes())
+        write('bk_distances.bin', distances.tobytes())
+        write('bk_deleted.bin', deleted.tobytes())
+
+        targets, grams, offsets, posting_targets, counts = state.ngram.to_arrays()
+        write_table('ngram_grams.fzst', StringTable(grams))
+        write('ngram_targets.bin', targets.tobytes())
+        write('ngram_offsets.bin', offsets.tobytes())
+        write('ngram_postings.bin', posting_targets.tobytes())
+        write('ngram_counts.bin', counts.tobytes())
+
+        codes, offsets, targets = state.phonetic.to_arrays()
+        code_table = StringTable(normalized=str)  # Soundex codes, metaphone codes as second column
+        for code, meta in codes:
+            code_table.append(code, meta)
+        write_table('phonetic_codes.fzst', code_table)
+        write('phonetic_offsets.bin', offsets.tobytes())
+        write('phonetic_targets.bin', targets.tobytes())
+
+        manifest = {
+            'format_version': SNAPSHOT_VERSION,
+            'weights': self.weights,
+            'config': self._snapshot_config(),
+            'bk_distance_type': distances.typecode,
+            'source': self.source,
+            'files': files,
+        }
+        write('manifest.json', json.dumps(manifest, indent=2).encode('utf-8'))
+
+    @classmethod
+    def load(cls, directory, corpus=None, column=None, verify=True, **kwargs):
+        """
+        Load an engine saved with `save`, without recomputing any index.
+
+        No distance, n-gram or phonetic code is computed: the string table is
+        memory-mapped and the n-gram postings are served from mapped arrays. Loading is
+        still linear in the corpus size, as the BK-tree nodes, the group map and the
+        phonetic groups are rebuilt as Python objects from their flat arrays, and
+        `verify` hashes every file; on 50k names that is about 0.5 s, against about
+        2 s for a rebuild. The n-gram profiles are only derived from the string table
+        when a full n-gram scan or an update first needs them.
 
+        If the snapshot is missing, corrupt (checksum mismatch), from another format
+        version or index configuration, or stale (`corpus` differs from the file it was
+        built from), the engine is rebuilt from `corpus` and the snapshot rewritten.
+        A distance function that cannot be imported by name (a lambda, a nested
+        function) cannot be matched against the snapshot, so it always causes a rebuild.
 
+        Args:
+            directory (str): Snapshot directory.
+            corpus (str): Optional corpus file to check staleness against and to
+                rebuild from.
+            column (int or str): CSV column of `corpus` (None = plain text).
+            verify (bool): Check the file checksums (reads every file once; skip it
+                only for snapshots on trusted storage).
+            **kwargs: Forwarded to the constructor (cache settings, distance_func).
+
+        Returns:
+            TourismSearchEngine: The loaded (or rebuilt) engine.
+
+        Raises:
+            SnapshotError: If the snapshot cannot be used and no corpus was given.
+        """
+        warm_queries = kwargs.pop('warm_queries', None)
+        try:
+            engine = cls._load_snapshot(directory, corpus, column, verify, kwargs)
+        except (OSError, ValueError, KeyError, struct.error) as error:
+            if corpus is None:
+                raise SnapshotError(f"cannot load snapshot {directory}: {error}") from error
+            _log.warning("Rebuilding engine snapshot %s: %s", directory, error)
+            if metrics.enabled:
+                metrics.incr('engine.snapshot_rebuilds')
+            engine = cls.from_corpus(corpus, column=column, **kwargs)
+            engine.save(directory)
+        if warm_queries:
+            engine.warm_cache(warm_queries)
+        return engine
+
+    @classmethod
+    def _load_snapshot(cls, directory, corpus, column, verify, kwargs):
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != SNAPSHOT_VERSION:
+            raise SnapshotError(f"unsupported snapshot version {manifest.get('format_version')}")
+
+        engine = cls([], **kwargs)
+        config = engine._snapshot_config()
+        if config['distance_func'] is None:
+            raise SnapshotError(f"cannot identify distance function {engine.distance_func!r}")
+        if manifest['config'] != config:
+            raise SnapshotError("index configuration differs from the snapshot")
+        if corpus is not None:
+            source = manifest['source']
+            if (source is None or source['column'] != column
+                    or source['sha256'] != _file_sha256(corpus)):
+                raise SnapshotError(f"snapshot is stale for {corpus}")
+        if verify:
+            for name, digest in manifest['files'].items():
+                if _file_sha256(os.path.join(directory, name)) != digest:
+                    raise SnapshotError(f"checksum mismatch for {name}")
+
+        def path(name):
+            return os.path.join(directory, name)
+
+        def map_array(name, typecode):
+            with open(path(name), 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return array(typecode)  # Empty files cannot be mapped
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(mm) % array(typecode).itemsize:
+                raise SnapshotError(f"{name} is truncated")
+            return memoryview(mm).cast(typecode)
+
+        def read_table(name):
+            table = StringTable.open(path(name))
+            try:
+                return [(table[i], table.normalized(i)) for i in range(len(table))]
+            finally:
+                table.close()
+
+        table = StringTable.open(path('strings.fzst'))
+        _, phonetic, ngram = engine._new_indexes(table)
+        bk_tree = BKTree.from_arrays(
+            map_array('bk_items.bin', 'q'), map_array('bk_parents.bin', 'q'),
+            map_array('bk_distances.bin', manifest['bk_distance_type']),
+            map_array('bk_deleted.bin', 'q'), bk_metric(engine.distance_func), key=table.normalized,
+        )
+        rows = array('Q')
+        rows.frombytes(map_array('rows.bin', 'Q').tobytes())
+
+        reps = map_array('group_reps.bin', 'q').tolist()
+        offsets = map_array('group_offsets.bin', 'q').tolist()
+        members = map_array('group_members.bin', 'q').tolist()
+        if len(offsets) != len(reps) + 1 or offsets[0] != 0 or offsets[-1] != len(members):
+            raise SnapshotError("group arrays are inconsistent")
+        groups = {rep_id: members[offsets[i]:offsets[i + 1]] for i, rep_id in enumerate(reps)}
+
+        ngram = NGramSearch.from_arrays(
+            map_array('ngram_targets.bin', 'q'), [gram for gram, _ in read_table('ngram_grams.fzst')],
+            map_array('ngram_offsets.bin', 'q'), map_array('ngram_postings.bin', 'q'),
+            map_array('ngram_counts.bin', 'q'), n=ngram.n, preprocess=ngram.preprocess, key=ngram.key,
+        )
+        phonetic = PhoneticSearch.from_arrays(
+            read_table('phonetic_codes.fzst'), map_array('phonetic_offsets.bin', 'q'),
+            map_array('phonetic_targets.bin', 'q'), phonetic.config, phonetic.key,
+        )
+
+        engine.weights = manifest['weights']
+        engine.source = manifest['source']
+        with engine._write_lock:
+            engine._swap(_IndexState(table, rows, groups, bk_tree, phonetic, ngram,
+                                     engine._state.generation + 1))
+        return engine
+
+    def _swap(self, state):
+        # A single reference assignment: readers see either the old or the new state
+        self._state = state
+        self.cache.clear()
+
+    @property
+    def locations(self):
+        """Current location names, decoded from the string table on demand"""
+        return self._state.locations
+
+    @property
+    def table(self):
+        return self._state.table
+
+    @property
+    def bk_tree(self):
+        return self._state.bk_tree
+
+    @property
+    def phonetic(self):
+        return self._state.phonetic
+
+    @property
+    def ngram(self):
+        return self._state.ngram
+
+    def add_locations(self, locations):
+        """
+        Incrementally add locations to every sub-index.
+
+        The update is applied to clones of the current indexes and published with a
+        single swap, so concurrent searches keep being served from a consistent
+        snapshot. The clones share every unchanged BK-tree node, n-gram posting list,
+        phonetic group and length-index entry with the old indexes, and only the
+        touched ones are replaced, so the next search pays no rebuild. The string
+        table, the group map and the per-target profile and code containers are
+        still copied, a fast O(N) step per call, and the first call on a
+        memory-mapped table (`from_table`, `load`) replaces the shared mapping with a
+        private in-memory copy; pass additions in batches rather than one name at a
+        time.
+
+        Args:
+            locations (iterable): Location names to add.
+        """
+        with self._write_lock:
+            old = self._state
+            table = old.table.copy()  # A full copy; row ids are stable, so old ids stay valid
+            groups = dict(old.groups)
+            bk_tree = old.bk_tree.copy()
+            phonetic = old.phonetic.copy()
+            ngram = old.ngram.copy()
+            for index in (bk_tree, phonetic, ngram):
+                index.key = table.normalized
+            new_ids = []
+            added = array('Q')
+            for loc in locations:
+                key = normalize_location(loc)
+                rep_id = bk_tree.find(key)
+                rows = groups.get(rep_id, []) if rep_id is not None else []
+                if any(table[i] == loc for i in rows):
+                    continue
+                row = table.append(loc, key)
+                if rep_id is None:
+                    # A new form, or a removed one coming back into its old tree node
+                    rep_id = bk_tree.insert(row)
+                    new_ids.append(rep_id)
+                groups[rep_id] = rows + [row]
+                added.append(row)
+            phonetic.add(new_ids)
+            ngram.add(new_ids)
+
+            state = _IndexState(table, old.rows + added, groups, bk_tree, phonetic, ngram, old.generation + 1)
+            state.patch_length_index(old, added=new_ids)
+            self._swap(state)
+
+    def remove_locations(self, locations):
+        """
+        Incrementally remove locations from every sub-index.
+
+        Like `add_locations`, every call patches the built indexes but copies the
+        group map and the per-target containers (O(N)), so removals are best passed
+        in batches.
+
+        Args:
+            locations (iterable): Location names to remove (unknown names are ignored).
+        """
+        with self._write_lock:
+            old = self._state
+            table = old.table
+            groups = dict(old.groups)
+            removed_rows = set()
+            dropped_keys = []
+            dropped_ids = []
+            for loc in set(locations):
+                key = normalize_location(loc)
+                rep_id = old.bk_tree.find(key)
+                rows = groups.get(rep_id, []) if rep_id is not None else []
+                remaining = [i for i in rows if table[i] != loc]
+                if len(remaining) == len(rows):
+                    continue
+                removed_rows.update(i for i in rows if table[i] == loc)
+                if remaining:
+                    groups[rep_id] = remaining
+                else:
+                    del groups[rep_id]
+                    dropped_keys.append(key)
+                    dropped_ids.append(rep_id)
+
+            bk_tree = old.bk_tree.copy()
+            for key in dropped_keys:
+                bk_tree.remove(key)
+            phonetic = old.phonetic.copy()
+            phonetic.remove(dropped_ids)
+            ngram = old.ngram.copy()
+            ngram.remove(dropped_ids)
+
+            state = _IndexState(
+                table, array('Q', (i for i in old.rows if i not in removed_rows)),
+                groups, bk_tree, phonetic, ngram, old.generation + 1
+            )
+            state.patch_length_index(old, removed=dropped_ids)
+            self._swap(state)
 
     def search(self, query, max_results=5):
         """Main interface for tourism queries"""
+        with metrics.timer('engine.search_seconds'):
+            state = self._state  # Pin one consistent snapshot for the whole query
+            normalized_query = normalize_location(query)
+            key = (state.generation, normalized_query, max_results)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return list(cached)
+
+            results = self._search(state, normalized_query, max_results)
+            self.cache.put(key, tuple(results))
+            return results
+
+    def plan(self, state, normalized_query, radius=2):
+        """
+        Choose the cheapest exact plan of every stage for one query.
+
+        Args:
+            state (_IndexState): The snapshot the query runs against.
+            normalized_query (str): The normalized query.
+            radius (int): Edit-distance radius of the Levenshtein stage.
+
+        Returns:
+            Plan: Chosen plan per stage, with the estimated costs.
+        """
+        n = len(state.groups)
+        length = len(normalized_query)
+        low, high = state.length_range(length - radius, length + radius)
+        postings = state.ngram.postings()
+        grams = state.ngram.query_ngrams(normalized_query)
+        posting_entries = sum(len(postings.get(gram, ())) for gram in grams)
+        plan = self.planner.plan(
+            self.planner.levenshtein_costs(
+                n, length, radius, int(high - low), posting_entries, q=state.ngram.n,
+                bounded=self.distance_func in UNIT_COST_DISTANCES,
+            ),
+            self.planner.ngram_costs(n, posting_entries, min_score=0.1),
+        )
+        if metrics.enabled:
+            metrics.incr('engine.plan.levenshtein.' + plan.levenshtein)
+            metrics.incr('engine.plan.ngram.' + plan.ngram)
+        return plan
+
+    def calibrate_planner(self, queries, radius=2):
+        """
+        Measure the planner's unit costs on this engine and install the fitted model.
+
+        Args:
+            queries (list): Representative queries (a few dozen are enough).
+            radius (int): Edit-distance radius of the Levenshtein stage.
+
+        Returns:
+            CostModel: The calibrated model.
+        """
+        state = self._state
+        queries = [normalize_location(q) for q in queries]
+        keys = [state.table.normalized(rep_id) for rep_id in state.groups]
+        sample = keys[::max(1, len(keys) // 200)]  # Spread over the whole key space
+        n = len(keys)
+
+        def time_calls(distance_func):
+            start = time.perf_counter()
+            for q in queries:
+                for key in sample:
+                    distance_func(key, q)
+            return (time.perf_counter() - start) / max(1, len(queries) * len(sample))
+
+        distance_call = time_calls(self.distance_func)
+        routing_call = time_calls(state.bk_tree.distance_func)
+
+        start = time.perf_counter()
+        for q in queries:
+            state.ngram.search(q)
+        ngram_score = (time.perf_counter() - start) / max(1, len(queries) * n)
+
+        postings = state.ngram.postings()
+        entries = 0
+        start = time.perf_counter()
+        for q in queries:
+            shared = defaultdict(int)
+            for gram, count in state.ngram.query_ngrams(q).items():
+                for target, target_count in postings.get(gram, ()):
+                    shared[target] += min(count, target_count)
+                entries += len(postings.get(gram, ()))
+        posting_entry = (time.perf_counter() - start) / max(1, entries)
+
+        # Share of q-gram candidates that survive the count filter
+        survivors = candidates = 0
+        for q in queries:
+            if len(q) - state.ngram.n + 1 - radius * (state.ngram.n + 1) > 0:
+                low, high = state.length_range(len(q) - radius, len(q) + radius)
+                q_entries = sum(len(postings.get(g, ())) for g in state.ngram.query_ngrams(q))
+                candidates += min(int(high - low), q_entries)
+                survivors += self._qgram_levenshtein(state, q, radius, count_only=True)
+
+        # Visited share of the BK-tree, counted on a clone with a counting distance
+        tree = state.bk_tree.copy()
+        route = tree.distance_func
+        calls = 0
+
+        def counting(a, b):
+            nonlocal calls
+            calls += 1
+            return route(a, b)
+
+        tree.distance_func = counting
+        fractions = defaultdict(list)
+        for q in queries:
+            calls = 0
+            tree.search(q, radius)
+            fractions[(radius, len(q))].append(calls / max(1, n))
+        measured = {k: sum(v) / len(v) for k, v in fractions.items()}
+        ratios = []
+        for (r, length), fraction in measured.items():
+            default = default_bk_fraction(r, length)
+            if default > 0:  # The default model predicts no visit at radius 0
+                ratios.append(fraction / default)
+
+        model = CostModel(
+            distance_call=distance_call,
+            routing_call=routing_call,
+            ngram_score=ngram_score,
+            posting_entry=posting_entry,
+            bk_visit_fraction=measured,
+            bk_fraction_scale=sum(ratios) / len(ratios) if ratios else 1.0,
+            qgram_pass_fraction=survivors / candidates if candidates else CostModel.qgram_pass_fraction,
+        )
+        self.planner = QueryPlanner(model)
+        return model
+
+    def _score(self, state, rep_ids, normalized_query, radius):
+        """
+        Distance to each of the given keys, keeping those within the radius.
+
+        The one place every plan evaluates `distance_func`, counted as
+        `engine.distance_calls`; BK-tree routing is counted by the tree itself
+        (`bk_tree.distance_calls`).
+        """
+        if metrics.enabled:
+            rep_ids = list(rep_ids)
+            metrics.incr('engine.distance_calls', len(rep_ids))
+        key = state.table.normalized
+        results = []
+        for rep_id in rep_ids:
+            distance = self.distance_func(key(rep_id), normalized_query)
+            if distance <= radius:
+                results.append((rep_id, distance))
+        return results
+
+    def _bktree_levenshtein(self, state, normalized_query, radius):
+        """
+        Keys found by the BK-tree; a tree routed by another metric than `distance_func`
+        (see `bk_metric`) returns a superset, which is rescored.
+        """
+        routed = state.bk_tree.search(normalized_query, radius)
+        if state.bk_tree.distance_func is self.distance_func:
+            return routed
+        return self._score(state, (rep_id for rep_id, _ in routed), normalized_query, radius)
+
+    def _scan_levenshtein(self, state, normalized_query, radius):
+        """Distance to every key whose length is within the radius of the query's"""
+        ids, _ = state.get_length_index()
+        length = len(normalized_query)
+        low, high = state.length_range(length - radius, length + radius)
+        return self._score(state, ids[low:high].tolist(), normalized_query, radius)
+
+    def _qgram_levenshtein(self, state, normalized_query, radius, count_only=False):
+        """
+        Distance to every key passing the q-gram count filter (see the planner); with
+        `count_only`, just the number of keys passing it.
+        """
+        q = state.ngram.n
+        length = len(normalized_query)
+        postings = state.ngram.postings()
+        shared = defaultdict(int)
+        for gram, count in state.ngram.query_ngrams(normalized_query).items():
+            for rep_id, target_count in postings.get(gram, ()):
+                shared[rep_id] += min(count, target_count)
+        key = state.table.normalized
+        passed = []
+        for rep_id, common in shared.items():
+            target = key(rep_id)
+            if abs(len(target) - length) > radius:
+                continue
+            if common < max(length, len(target)) - q + 1 - radius * (q + 1):
+                continue
+            passed.append(rep_id)
+        return len(passed) if count_only else self._score(state, passed, normalized_query, radius)
+
+    def _search(self, state, normalized_query, max_results):
+        plan = self.plan(state, normalized_query)
+
         # Get results from each technique
-        lev_matches = self.bk_tree.search(query, 2)
-        pho_matches = self.phonetic.search(query)
-        ngram_matches = self.ngram.search(query)
-        
-        # Combine scores
-        scores = defaultdict(float)
-        for word, dist in lev_matches:
-            scores[word] += self.weights['levenshtein'] * (1 - dist/10)
-            
-        for word, score in pho_matches:
-            scores[word] += self.weights['phonetic'] * score
-            
-        for word, score in ngram_matches:
-            scores[word] += self.weights['ngram'] * score
-            
-        # Return top matches
-        return sorted(scores.items(), key=lambda x: -x[1])[:max_results]
\ No newline at end of file
+        with metrics.timer('engine.stage.levenshtein_seconds'):
+            if plan.levenshtein == 'scan':
+                lev_matches = self._scan_levenshtein(state, normalized_query, 2)
+            elif plan.levenshtein == 'qgram':
+                lev_matches = self._qgram_levenshtein(state, normalized_query, 2)
+            else:
+                lev_matches = self._bktree_levenshtein(state, normalized_query, 2)
+        with metrics.timer('engine.stage.phonetic_seconds'):
+            pho_matches = list(islice(state.phonetic.ranked(normalized_query), 5))
+        with metrics.timer('engine.stage.ngram_seconds'):
+            if plan.ngram == 'index':
+                ngram_matches = list(islice(state.ngram.ranked(normalized_query), 5))
+            else:
+                ngram_matches = state.ngram.search(normalized_query)
+
+        # Merge the ranked lists, stopping once no unseen location can reach the top
+        lev_scores = {word: 1 - dist/10 for word, dist in lev_matches}
+        pho_scores = dict(pho_matches)
+        ngram_scores = dict(ngram_matches)
+        with metrics.timer('engine.stage.merge_seconds'):
+            return threshold_top_k(
+                [
+                    (self.weights['levenshtein'],
+                     sorted(lev_scores.items(), key=lambda x: -x[1]), lev_scores.get),
+                    (self.weights['phonetic'], pho_matches, pho_scores.get),
+                    (self.weights['ngram'], ngram_matches, ngram_scores.get),
+                ],
+                max_results,
+                # Representative ids stand for their original spellings
+                expand=state.spellings,
+            )
+
+    def find_in_text(self, text, max_distance=1, min_length=4):
+        """
+        Find every location mentioned in free text, allowing typos.
+
+        The text is scanned once, for all location names at the same time
+        ("we stayed near punta blanka beach" mentions "Punta Blanca"). The compiled
+        names are kept per (max_distance, min_length) until the locations change.
+
+        Args:
+            text (str or iterable of str): The text, or a stream of text chunks.
+            max_distance (int): The maximum allowed edit distance of a mention.
+            min_length (int): Names shorter than this are not searched for (a short
+                name within a few edits matches almost anywhere).
+
+        Returns:
+            list: Tuples (location, start, end, distance) with text[start:end] the
+            mention, ordered by position.
+        """
+        with metrics.timer('engine.find_in_text_seconds'):
+            state = self._state
+            reps, matcher = state.get_text_matcher(max_distance, min_length)
+            if matcher is None:
+                return []
+            scan = matcher.scan()
+            found = []
+            for chunk in ([text] if isinstance(text, str) else text):
+                # Per-symbol normalization keeps text offsets intact
+                found.extend(scan.feed([" " if c == "-" else c.lower() for c in chunk]))
+            found.extend(scan.finish())
+
+            results = [
+                (loc, start, end, distance)
+                for p, start, end, distance in found
+                for loc in dict.fromkeys(state.table[i] for i in state.groups[reps[p]])
+            ]
+            return sorted(results, key=lambda x: (x[1], x[2], x[3], x[0]))
+
+    def prefix_session(self, max_distance=2, max_results=5):
+        """
+        Start a search-as-you-type session over the current locations.
+
+        Each keystroke extends the previous keystroke's state instead of searching
+        from scratch, and matching is prefix-aware ("Saint Geo" finds
+        "Saint George's Anglican Church" at distance 0).
+
+        Args:
+            max_distance (int): The maximum allowed prefix edit distance.
+            max_results (int): Maximum results returned per keystroke.
+
+        Returns:
+            PrefixSearchSession: Session whose `type`, `backspace` and `update`
+            return tuples (location, prefix distance).
+        """
+        state = self._state
+        return PrefixSearchSession(
+            state.get_prefix_trie(), max_distance, max_results,
+            normalize=normalize_typed, resolve=state.table.__getitem__, collapse_whitespace=True
+        )
+
+    def warm_cache(self, queries, max_results=5):
+        """
+        Precompute results for known frequent queries.
+
+        Args:
+            queries (iterable): Query strings to run through `search`.
+            max_results (int): Result count the cached entries are keyed on.
+        """
+        for query in queries:
+            self.search(query, max_results)
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters of the result cache"""
+        return self.cache.stats()
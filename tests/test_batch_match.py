@@ -0,0 +1,64 @@
+"""
+Unit Tests for the Streaming Batch Record-Linkage CLI
+
+This module runs the batch matcher end to end on the OSM sample data.
+"""
+
+import unittest
+import tempfile
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from use_cases.tourism.batch_match import main
+
+DATA_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt'))
+QUERIES = ["Perla Marna", "Mazora", "Calle 10", "xyzxyzxyz", "Bohio Cabarte"]
+
+
+class TestBatchMatch(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.queries = os.path.join(self.dir.name, 'queries.txt')
+        with open(self.queries, 'w', encoding='utf-8') as f:
+            f.write("\n".join(QUERIES) + "\n")
+
+    def _run(self, output, *extra):
+        main(['--corpus', DATA_FILE, '--queries', self.queries, '--output', output,
+              '--chunk-size', '2', '--quiet', *extra])
+        with open(output, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_parallel_matches_serial_in_order(self):
+        serial = self._run(os.path.join(self.dir.name, 'serial.jsonl'), '--workers', '1')
+        parallel = self._run(os.path.join(self.dir.name, 'parallel.jsonl'), '--workers', '2')
+        self.assertEqual(serial, parallel)
+        self.assertEqual([r['query'] for r in serial], QUERIES)
+        self.assertEqual(serial[0]['matches'][0], ["Perla Marina", 1])
+        self.assertEqual(serial[3]['matches'], [])
+
+    def test_resume_from_checkpoint(self):
+        output = os.path.join(self.dir.name, 'out.jsonl')
+        checkpoint = os.path.join(self.dir.name, 'out.ckpt')
+        with open(checkpoint, 'w') as f:
+            f.write("3")
+        records = self._run(output, '--workers', '1', '--checkpoint', checkpoint)
+        self.assertEqual([r['offset'] for r in records], [3, 4])
+        with open(checkpoint) as f:
+            self.assertEqual(f.read(), "5")
+
+    def test_csv_engine_output(self):
+        output = os.path.join(self.dir.name, 'out.csv')
+        main(['--corpus', DATA_FILE, '--queries', self.queries, '--output', output,
+              '--format', 'csv', '--index', 'engine', '--workers', '1', '--quiet'])
+        with open(output, encoding='utf-8') as f:
+            rows = f.read().splitlines()
+        self.assertEqual(rows[0], "offset,query,match,score")
+        self.assertTrue(rows[1].startswith("0,Perla Marna,Perla Marina,"))
+
+
+if __name__ == "__main__":
+    unittest.main()
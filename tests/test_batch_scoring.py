@@ -0,0 +1,84 @@
+"""
+Unit Tests for Native Batch Scoring
+
+This module checks the rapidfuzz-backed linear search and the length-grouped batch
+scorer against a plain Levenshtein scan, including repeated targets.
+"""
+
+import unittest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from algorithms.levenshtein import levenshtein_distance
+from optimizations.parallel_processing import BatchScorer, parallel_fuzzy_search
+from optimizations.corpus_stream import iter_corpus
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+
+
+def reference(query, targets, k):
+    matches = [(t, levenshtein_distance(query, t)) for t in targets]
+    return sorted((m for m in matches if m[1] <= k), key=lambda x: (x[1], x[0]))
+
+
+class TestBatchScoring(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        names = list(iter_corpus(DATA_FILE))
+        cls.targets = names + names[:50] + ["", "a"]
+        rng = random.Random(2)
+        cls.queries = [n[:-1] + "x" for n in rng.sample(names, 30)] + ["", "ab", names[3]]
+
+    def test_linear_and_parallel_paths(self):
+        for query in self.queries:
+            for k in (0, 1, 2):
+                expected = reference(query, self.targets, k)
+                self.assertEqual(parallel_fuzzy_search(query, self.targets, k), expected)
+                self.assertEqual(parallel_fuzzy_search(query, self.targets, k, min_parallel_size=0, n_jobs=2),
+                                 expected)
+
+    def test_scorer_matches_linear_search(self):
+        scorer = BatchScorer(self.targets)
+        self.assertEqual(len(scorer), len(self.targets))
+        self.assertLess(len(scorer.choices), len(self.targets))
+        for query in self.queries:
+            expected = reference(query, self.targets, 2)
+            self.assertEqual(scorer.search(query, 2), expected)
+            self.assertEqual(scorer.search(query, 2, workers=-1), expected)
+            self.assertEqual(parallel_fuzzy_search(query, scorer, 2), expected)
+        self.assertEqual(scorer.search_many(self.queries, 2),
+                         [reference(q, self.targets, 2) for q in self.queries])
+
+    def test_ids_map_back_to_every_occurrence(self):
+        scorer = BatchScorer(["cayo", "matanzas", "cayo", "cayos"])
+        self.assertEqual(scorer.match_ids("cayo", 1), [(0, 0), (2, 0), (3, 1)])
+        self.assertEqual(scorer.search("cayo", 1), [("cayo", 0), ("cayo", 0), ("cayos", 1)])
+
+    def test_ids_ordered_by_distance_then_id(self):
+        scorer = BatchScorer(["cayos", "matanzas", "cayo", "caya", "cayo"])
+        self.assertEqual(scorer.match_ids("cayo", 1), [(2, 0), (4, 0), (0, 1), (3, 1)])
+
+    def test_plain_list_is_deduplicated(self):
+        calls = []
+        original = BatchScorer._unique_matches
+
+        def recording(scorer, query, max_distance, workers):
+            calls.append(len(scorer.choices))
+            return original(scorer, query, max_distance, workers)
+
+        BatchScorer._unique_matches = recording
+        self.addCleanup(setattr, BatchScorer, '_unique_matches', original)
+        targets = ["cayo", "cayo", "Cayo Coco", "cayo"]
+        self.assertEqual(parallel_fuzzy_search("cayo", targets, 1), [("cayo", 0)] * 3)
+        self.assertEqual(calls, [2])
+
+    def test_empty_targets(self):
+        self.assertEqual(parallel_fuzzy_search("apple", [], 2), [])
+        self.assertEqual(BatchScorer([]).search_many(["apple"], 2), [[]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit Tests for Streaming Corpus Loading
+
+This module provides unit tests for the memory-mapped corpus reader and the chunked
+index builder.
+"""
+
+import unittest
+import tempfile
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from optimizations.corpus_stream import iter_corpus, build_from_stream
+from optimizations.bk_tree import BKTree
+from techniques.ngram_search import NGramSearch
+from techniques.phonetic_search import PhoneticSearch
+from algorithms.levenshtein import levenshtein_distance
+from use_cases.tourism.search import TourismSearchEngine
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+
+
+class TestCorpusStream(unittest.TestCase):
+    def _write(self, content):
+        f = tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8')
+        f.write(content)
+        f.close()
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_text_dedupe_and_normalize(self):
+        path = self._write("La Habana\n  La Habana \n\nPunta Blanca\r\nRío\n")
+        self.assertEqual(list(iter_corpus(path)), ["La Habana", "Punta Blanca", "Río"])
+        self.assertEqual(len(list(iter_corpus(path, dedupe=False))), 4)
+
+    def test_csv_column_by_name(self):
+        path = self._write('id,name\n1,"Saint George\'s, Anglican Church"\n2,La Habana\n3,La Habana\n')
+        self.assertEqual(list(iter_corpus(path, column='name')),
+                         ["Saint George's, Anglican Church", "La Habana"])
+
+    def test_empty_file(self):
+        self.assertEqual(list(iter_corpus(self._write(""))), [])
+
+    def test_chunked_builds_match_list_builds(self):
+        names = list(iter_corpus(DATA_FILE))
+        tree = BKTree([], levenshtein_distance)
+        report = build_from_stream(tree, iter_corpus(DATA_FILE), chunk_size=100)
+        self.assertEqual(report.items, len(names))
+        self.assertEqual(report.chunks, -(-len(names) // 100))
+        self.assertGreater(report.peak_memory_bytes, 0)
+        self.assertEqual(sorted(tree.search("Calle 10", 1)),
+                         sorted(BKTree(names, levenshtein_distance).search("Calle 10", 1)))
+
+        ngram = NGramSearch([])
+        build_from_stream(ngram, iter_corpus(DATA_FILE), chunk_size=100, track_memory=False)
+        self.assertEqual(ngram.search("Mazora"), NGramSearch(names).search("Mazora"))
+
+        phonetic = PhoneticSearch([])
+        build_from_stream(phonetic, iter_corpus(DATA_FILE), chunk_size=100)
+        self.assertEqual(phonetic.search("Mazora"), PhoneticSearch(names).search("Mazora"))
+
+    def test_engine_from_corpus(self):
+        engine = TourismSearchEngine.from_corpus(DATA_FILE, chunk_size=50)
+        self.assertEqual(engine.search("Perla Marna")[0][0], "Perla Marina")
+
+
+if __name__ == "__main__":
+    unittest.main()
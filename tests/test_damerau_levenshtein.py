@@ -6,6 +6,7 @@ covering edge cases, real-world scenarios, and all possible types of string comp
 """
 
 import unittest
+import random
 import sys
 import os
 
@@ -13,7 +14,11 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
 
 # Import the function directly from the file
-from algorithms.damerau_levenshtein import damerau_levenshtein_distance
+from algorithms.damerau_levenshtein import (
+    damerau_levenshtein_distance, bit_parallel_osa_distance, bit_parallel_osa_distance_bounded,
+    unrestricted_damerau_levenshtein_distance
+)
+from optimizations.bk_tree import BKTree
 
 class TestDamerauLevenshteinDistance(unittest.TestCase):
     # Basic Tests
@@ -95,5 +100,67 @@ class TestDamerauLevenshteinDistance(unittest.TestCase):
         self.assertEqual(damerau_levenshtein_distance("aaaaa", "aaaab"), 1)  # Repeated characters
         self.assertEqual(damerau_levenshtein_distance("aaaaa", "bbbbb"), 5)  # All characters differ
 
+class TestBitParallelOSADistance(unittest.TestCase):
+    def test_matches_dynamic_programming(self):
+        rng = random.Random(4)
+        for _ in range(500):
+            a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 10)))
+            b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 10)))
+            self.assertEqual(bit_parallel_osa_distance(a, b), damerau_levenshtein_distance(a, b))
+
+    def test_transposition(self):
+        self.assertEqual(bit_parallel_osa_distance("Pnuta", "Punta"), 1)
+        self.assertEqual(bit_parallel_osa_distance("abcdef", "abcfed"), 2)
+        self.assertEqual(bit_parallel_osa_distance("ca", "abc"), 3)  # Restricted edit distance
+
+    def test_long_and_unicode_strings(self):
+        self.assertEqual(bit_parallel_osa_distance("a" * 1000, "b" * 1000), 1000)
+        self.assertEqual(bit_parallel_osa_distance("こんにちは", "こんにちわ"), 1)
+        self.assertEqual(bit_parallel_osa_distance("", "kitten"), 6)
+
+    def test_bounded(self):
+        self.assertEqual(bit_parallel_osa_distance_bounded("kitten", "sitting", 3), 3)
+        self.assertEqual(bit_parallel_osa_distance_bounded("kitten", "sitting", 2), 3)
+        self.assertEqual(bit_parallel_osa_distance_bounded("a", "a" * 10, 2), 3)
+
+
+class TestOSABKTree(unittest.TestCase):
+    def test_unrestricted_is_lower_bound(self):
+        rng = random.Random(5)
+        for _ in range(500):
+            a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            self.assertLessEqual(unrestricted_damerau_levenshtein_distance(a, b),
+                                 bit_parallel_osa_distance(a, b))
+        self.assertEqual(unrestricted_damerau_levenshtein_distance("ca", "abc"), 2)
+
+    def test_rescored_tree_matches_scan(self):
+        rng = random.Random(6)
+
+        def mutate(word):
+            chars = list(word)
+            for _ in range(rng.randint(0, 3)):
+                i = rng.randrange(max(1, len(chars)))
+                op = rng.choice("tsid")
+                if op == "t" and i + 1 < len(chars):
+                    chars[i], chars[i + 1] = chars[i + 1], chars[i]
+                elif op == "s" and chars:
+                    chars[i] = rng.choice("abcdn")
+                elif op == "i":
+                    chars.insert(i, rng.choice("abcdn"))
+                elif chars:
+                    del chars[i]
+            return "".join(chars)
+
+        base = ["".join(rng.choice("abcdn") for _ in range(rng.randint(1, 7))) for _ in range(60)]
+        words = list(dict.fromkeys(base + [mutate(w) for w in base for _ in range(5)]))
+        tree = BKTree(words, unrestricted_damerau_levenshtein_distance, rescore=bit_parallel_osa_distance)
+        for query in [mutate(w) for w in base for _ in range(3)] + ["anhu"]:
+            for k in (1, 2):
+                expected = sorted((w, bit_parallel_osa_distance(w, query)) for w in words
+                                  if bit_parallel_osa_distance(w, query) <= k)
+                self.assertEqual(sorted(tree.search(query, k)), expected)
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Unit Tests for the Integer-Encoded Corpus
+
+This module checks the alphabet/corpus encoding, the kernels running on encoded views
+and the shared-memory round trip, plus the bit-parallel kernel against the classic one.
+"""
+
+import unittest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from algorithms.encoding import Alphabet, EncodedCorpus
+from algorithms.levenshtein import levenshtein_distance
+from algorithms.damerau_levenshtein import damerau_levenshtein_distance
+from algorithms.bit_parallel import bit_parallel_levenshtein, bit_parallel_levenshtein_encoded
+
+NAMES = ["La Habana", "Punta Blanca", "Saint George's Anglican Church", "Autopista a Pinar del Río", ""]
+
+
+class TestEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        corpus = EncodedCorpus(NAMES)
+        self.assertEqual(len(corpus), len(NAMES))
+        self.assertEqual([corpus.decode(i) for i in range(len(corpus))], NAMES)
+        self.assertEqual(corpus.buffer.typecode, 'H')
+        self.assertEqual(len(corpus.buffer), sum(map(len, NAMES)))
+
+    def test_encode_known_does_not_grow(self):
+        alphabet = Alphabet("ab")
+        self.assertEqual(alphabet.encode_known("abz"), [0, 1, 2])
+        self.assertEqual(len(alphabet), 2)
+
+    def test_kernels_on_views(self):
+        rng = random.Random(3)
+        words = ["".join(rng.choice("abcé") for _ in range(rng.randint(0, 10))) for _ in range(60)]
+        corpus = EncodedCorpus(words)
+        size = len(corpus.alphabet)
+        for i in range(0, 60, 2):
+            a, b = words[i], words[i + 1]
+            expected = levenshtein_distance(a, b)
+            self.assertEqual(bit_parallel_levenshtein(a, b), expected)
+            self.assertEqual(levenshtein_distance(corpus[i], corpus[i + 1]), expected)
+            self.assertEqual(bit_parallel_levenshtein_encoded(corpus[i], corpus[i + 1], size), expected)
+            self.assertEqual(damerau_levenshtein_distance(corpus[i], corpus[i + 1]),
+                             damerau_levenshtein_distance(a, b))
+
+    def test_unknown_query_characters(self):
+        corpus = EncodedCorpus(NAMES)
+        size = len(corpus.alphabet)
+        for query in ["habanaz", "xx", "La Habanaz", "Punta Blanqa", "ü"]:
+            encoded = corpus.alphabet.encode_known(query)
+            for i, name in enumerate(NAMES):
+                self.assertEqual(bit_parallel_levenshtein_encoded(encoded, corpus[i], size),
+                                 levenshtein_distance(query, name))
+                self.assertEqual(bit_parallel_levenshtein_encoded(corpus[i], encoded, size),
+                                 levenshtein_distance(query, name))
+
+    def test_shared_memory_attach(self):
+        corpus = EncodedCorpus(NAMES)
+        shm, handle = corpus.share()
+        try:
+            attached = EncodedCorpus.attach(handle)
+            self.assertEqual([attached.decode(i) for i in range(len(attached))], NAMES)
+            self.assertEqual(levenshtein_distance(attached[0], corpus[1]),
+                             levenshtein_distance(NAMES[0], NAMES[1]))
+            attached.close()
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+if __name__ == "__main__":
+    unittest.main()
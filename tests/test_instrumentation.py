@@ -0,0 +1,82 @@
+"""
+Unit Tests for Hot-Path Instrumentation
+
+This module checks the metric sinks and the counters emitted by the indexes and the
+tourism search engine.
+"""
+
+import unittest
+import tempfile
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from optimizations import instrumentation as metrics
+from optimizations.bk_tree import BKTree
+from algorithms.levenshtein import levenshtein_distance
+from use_cases.tourism.search import TourismSearchEngine
+
+TARGETS = ["apple", "banana", "orange", "grape", "pineapple"]
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.sink = metrics.InMemorySink()
+        metrics.set_sink(self.sink)
+        self.addCleanup(metrics.set_sink, None)
+
+    def test_disabled_by_default_after_reset(self):
+        metrics.set_sink(None)
+        self.assertFalse(metrics.enabled)
+        BKTree(TARGETS, levenshtein_distance).search("aple", 1)
+        self.assertEqual(self.sink.snapshot()['counters'], {})
+
+    def test_bk_tree_counters(self):
+        tree = BKTree(TARGETS, levenshtein_distance)
+        plain = tree._search_instrumented("aple", 1)
+        counters = self.sink.snapshot()['counters']
+        self.assertEqual(counters['bk_tree.searches'], 1)
+        self.assertEqual(counters['bk_tree.distance_calls'], counters['bk_tree.nodes_visited'])
+        self.assertLessEqual(counters['bk_tree.nodes_visited'] + counters['bk_tree.subtrees_pruned'],
+                             len(TARGETS))
+        metrics.set_sink(None)
+        self.assertEqual(tree.search("aple", 1), plain)
+
+    def test_engine_stages_and_cache(self):
+        engine = TourismSearchEngine(["La Habana", "Punta Blanca"])
+        engine.search("La Havana")
+        engine.search("la havana")
+        snapshot = self.sink.snapshot()
+        self.assertEqual(snapshot['counters']['query_cache.hits'], 1)
+        self.assertEqual(snapshot['counters']['ngram.candidates_scored'], 2)
+        self.assertEqual(snapshot['histograms']['engine.search_seconds']['count'], 2)
+        for stage in ('levenshtein', 'phonetic', 'ngram'):
+            self.assertEqual(snapshot['histograms'][f'engine.stage.{stage}_seconds']['count'], 1)
+
+    def test_engine_counts_every_distance_call(self):
+        engine = TourismSearchEngine(["La Habana", "La Habanera", "Punta Blanca", "Punta Blanco"])
+        state = engine._state
+        query = "la habnaa"  # Within reach only through a transposition
+        for levenshtein in (engine._scan_levenshtein, engine._qgram_levenshtein, engine._bktree_levenshtein):
+            self.sink.reset()
+            matches = levenshtein(state, query, 2)
+            self.assertIn(0, [rep_id for rep_id, _ in matches])
+            self.assertGreaterEqual(self.sink.snapshot()['counters']['engine.distance_calls'], len(matches))
+        self.assertIn('bk_tree.distance_calls', self.sink.snapshot()['counters'])
+
+    def test_prometheus_export(self):
+        path = os.path.join(tempfile.mkdtemp(), 'metrics.prom')
+        sink = metrics.PrometheusTextSink(path)
+        sink.incr('bk_tree.nodes_visited', 3)
+        sink.observe('engine.search_seconds', 0.002)
+        sink.write()
+        with open(path) as f:
+            text = f.read()
+        self.assertIn("fuzzysearch_bk_tree_nodes_visited_total 3", text)
+        self.assertIn('fuzzysearch_engine_search_seconds_bucket{le="0.0025"} 1', text)
+        self.assertIn("fuzzysearch_engine_search_seconds_count 1", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
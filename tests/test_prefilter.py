@@ -0,0 +1,59 @@
+"""
+Unit Tests for the Lower-Bound Prefilter
+
+This module checks that the length/histogram/q-gram filter never rejects a true match
+and that it skips most candidates on the OSM sample data.
+"""
+
+import unittest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from optimizations.prefilter import LowerBoundFilter
+from optimizations.parallel_processing import parallel_fuzzy_search
+from optimizations.corpus_stream import iter_corpus
+from algorithms.levenshtein import levenshtein_distance
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+
+
+class TestLowerBoundFilter(unittest.TestCase):
+    def test_never_rejects_true_matches(self):
+        rng = random.Random(2)
+        targets = ["".join(rng.choice("abcd") for _ in range(rng.randint(0, 9))) for _ in range(300)]
+        prefilter = LowerBoundFilter(targets, q=2, histogram_size=3)
+        for _ in range(50):
+            query = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 9)))
+            for k in range(4):
+                survivors = set(prefilter.filter(query, k))
+                for target in targets:
+                    if levenshtein_distance(query, target) <= k:
+                        self.assertIn(target, survivors)
+
+    def test_stats_add_up(self):
+        prefilter = LowerBoundFilter(["apple", "banana", "orange", "grape", "pineapple"])
+        prefilter.candidates("aple", 1)
+        stats = prefilter.stats
+        self.assertEqual(stats['checked'],
+                         stats['length'] + stats['histogram'] + stats['qgram'] + stats['passed'])
+
+    def test_rejects_most_osm_candidates(self):
+        names = list(iter_corpus(DATA_FILE))
+        prefilter = LowerBoundFilter(names)
+        rng = random.Random(0)
+        for name in rng.sample(names, 50):
+            query = name[:-1] + "x"
+            for k in (1, 2):
+                self.assertEqual(
+                    parallel_fuzzy_search(query, names, k, prefilter=prefilter),
+                    parallel_fuzzy_search(query, names, k)
+                )
+        stats = prefilter.stats
+        self.assertGreater(1 - stats['passed'] / stats['checked'], 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
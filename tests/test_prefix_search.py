@@ -0,0 +1,63 @@
+"""
+Unit Tests for Incremental Fuzzy Prefix Search
+
+This module checks the trie-based search-as-you-type session against a brute-force
+prefix edit distance.
+"""
+
+import unittest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from techniques.prefix_search import PrefixTrie, PrefixSearchSession
+from algorithms.levenshtein import levenshtein_distance
+
+
+def prefix_distance(query, target):
+    return min(levenshtein_distance(query, target[:j]) for j in range(len(target) + 1))
+
+
+class TestPrefixSearch(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.words = sorted({
+            "".join(rng.choice("abc") for _ in range(rng.randint(1, 7))) for _ in range(150)
+        })
+        self.trie = PrefixTrie(self.words)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(11)
+        for _ in range(100):
+            query = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 6)))
+            k = rng.randint(0, 2)
+            session = PrefixSearchSession(self.trie, k, max_results=len(self.words))
+            expected = {w: prefix_distance(query, w) for w in self.words}
+            expected = {w: d for w, d in expected.items() if d <= k}
+            self.assertEqual(dict(session.type(query)), expected)
+
+    def test_ranking_prefers_short_completions(self):
+        trie = PrefixTrie(["punta blanca", "punta", "punta cana"])
+        session = PrefixSearchSession(trie, max_distance=1, max_results=2)
+        self.assertEqual(session.type("punt"), [("punta", 0), ("punta cana", 0)])
+
+    def test_backspace_restores_previous_state(self):
+        session = PrefixSearchSession(self.trie, max_distance=1)
+        before = session.type("abc")
+        session.type("cc")
+        self.assertEqual(session.backspace(2), before)
+        self.assertEqual(session.update("abca"), PrefixSearchSession(self.trie, 1).type("abca"))
+
+    def test_collapse_whitespace(self):
+        trie = PrefixTrie(["punta blanca", "punta cana"])
+        session = PrefixSearchSession(trie, max_distance=0, collapse_whitespace=True)
+        session.type(" punta ")
+        self.assertEqual(session.type("  bl"), [("punta blanca", 0)])
+        self.assertEqual(session.query, "punta bl")
+        self.assertEqual(session.update("punta   c"), [("punta cana", 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Unit Tests for the Cost-Based Query Planner
+
+This module checks the plan choices of the cost models, their calibration, and that
+every plan the engine can execute returns exactly the same results.
+"""
+
+import unittest
+import tempfile
+import json
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from optimizations import instrumentation as metrics
+from optimizations.query_planner import QueryPlanner, CostModel, Plan
+from algorithms.weighted_edit_distance import weighted_edit_distance
+from algorithms.levenshtein import levenshtein_distance
+from algorithms.damerau_levenshtein import damerau_levenshtein_distance
+from use_cases.tourism.search import TourismSearchEngine, normalize_location
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+
+
+class FixedPlanner(QueryPlanner):
+    def __init__(self, levenshtein, ngram):
+        super().__init__()
+        self.fixed = (levenshtein, ngram)
+
+    def plan(self, levenshtein_costs, ngram_costs):
+        return Plan(*self.fixed, costs={})
+
+
+class TestQueryPlanner(unittest.TestCase):
+    def test_short_queries_avoid_bk_tree(self):
+        planner = QueryPlanner()
+        costs = planner.levenshtein_costs(n=100000, query_length=2, radius=2, length_candidates=500)
+        self.assertEqual(min(costs, key=costs.get), 'scan')
+
+    def test_long_queries_use_qgrams(self):
+        planner = QueryPlanner()
+        costs = planner.levenshtein_costs(n=100000, query_length=25, radius=2,
+                                          length_candidates=20000, postings=3000)
+        self.assertEqual(min(costs, key=costs.get), 'qgram')
+        # The q-gram bound is vacuous for short queries, so that plan is not offered
+        self.assertNotIn('qgram', planner.levenshtein_costs(100000, 10, 2, 20000, postings=3000))
+
+    def test_non_unit_cost_distance_keeps_bk_tree(self):
+        costs = QueryPlanner().levenshtein_costs(100000, 2, 2, 10, postings=5, bounded=False)
+        self.assertEqual(list(costs), ['bktree'])
+        engine = TourismSearchEngine(["La Habana", "Punta Blanca"],
+                                     distance_func=lambda a, b: weighted_edit_distance(a, b, (1, 1, 1, 1)))
+        self.assertEqual(engine.plan(engine._state, "la", 2).levenshtein, 'bktree')
+
+    def test_unit_cost_distances_get_every_plan(self):
+        for distance_func in (damerau_levenshtein_distance, levenshtein_distance):
+            engine = TourismSearchEngine(["La Habana", "Punta Blanca"], distance_func=distance_func)
+            self.assertEqual(engine.plan(engine._state, "la", 2).levenshtein, 'scan')
+
+    def test_ngram_index_needs_positive_min_score(self):
+        planner = QueryPlanner()
+        self.assertIn('index', planner.ngram_costs(1000, 50, 0.1))
+        self.assertNotIn('index', planner.ngram_costs(1000, 50, 0))
+
+    def test_from_benchmark(self):
+        report = {
+            'meta': {'corpus_size': 1000},
+            'results': {
+                'kernel/bit_parallel_osa': {'pairs': 10, 'mean_us': 4.0},
+                'index/ngram': {'p50_ms': 2.0},
+            },
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.json")
+            with open(path, 'w') as f:
+                json.dump(report, f)
+            model = CostModel.from_benchmark(path, posting_entry=1e-7)
+        self.assertAlmostEqual(model.distance_call, 4e-6)
+        self.assertAlmostEqual(model.ngram_score, 2e-6)
+        self.assertEqual(model.posting_entry, 1e-7)
+
+
+class TestPlannedEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(DATA_FILE, encoding="utf-8") as f:
+            cls.names = [line.strip() for line in f if line.strip()]
+        rng = random.Random(4)
+        cls.queries = [q[:-1] + "x" for q in rng.sample(cls.names, 40)]
+        cls.queries += ["La", "x", "Saint Georges Anglican Chruch", "Autopista a Pinar del Rio"]
+
+    def test_every_plan_returns_identical_results(self):
+        reference = TourismSearchEngine(self.names, cache_size=0, planner=FixedPlanner('bktree', 'scan'))
+        expected = [reference.search(q) for q in self.queries]
+        for levenshtein in ('scan', 'qgram'):
+            for ngram in ('scan', 'index'):
+                engine = TourismSearchEngine(self.names, cache_size=0, planner=FixedPlanner(levenshtein, ngram))
+                for query, result in zip(self.queries, expected):
+                    if levenshtein == 'qgram':
+                        q = normalize_location(query)
+                        if 'qgram' not in QueryPlanner().levenshtein_costs(1, len(q), 2, 1, postings=1):
+                            continue  # Only planned when its bound holds
+                    self.assertEqual(engine.search(query), result)
+        planned = TourismSearchEngine(self.names, cache_size=0)
+        self.assertEqual([planned.search(q) for q in self.queries], expected)
+
+    def test_plans_agree_where_osa_is_not_a_metric(self):
+        rng = random.Random(8)
+
+        def swap_and_edit(name):
+            chars = list(name)
+            i = rng.randrange(len(chars) - 1)
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+            if rng.random() < 0.5:
+                del chars[rng.randrange(len(chars))]
+            return "".join(chars)
+
+        names = [n for n in self.names if len(n) > 3]
+        corpus = names + [swap_and_edit(n) for n in rng.sample(names, 300)] + ["au", "colé poit"]
+        queries = [swap_and_edit(n) for n in rng.sample(names, 60)] + ["anhu", "colé pwti"]
+        engine = TourismSearchEngine(corpus, cache_size=0)
+        state = engine._state
+        disagree = 0
+        for query in map(normalize_location, queries):
+            bktree = sorted(engine._bktree_levenshtein(state, query, 2))
+            self.assertEqual(bktree, sorted(engine._scan_levenshtein(state, query, 2)))
+            if 'qgram' in QueryPlanner().levenshtein_costs(1, len(query), 2, 1, postings=1):
+                self.assertEqual(bktree, sorted(engine._qgram_levenshtein(state, query, 2)))
+            disagree += any(levenshtein_distance(state.table.normalized(i), query) != d for i, d in bktree)
+        self.assertGreater(disagree, 0)  # The corpus does exercise transpositions
+        expected = [engine.search(q) for q in queries]
+        for levenshtein in ('bktree', 'scan'):
+            forced = TourismSearchEngine(corpus, cache_size=0, planner=FixedPlanner(levenshtein, 'index'))
+            self.assertEqual([forced.search(q) for q in queries], expected)
+
+    def test_plan_reported_in_metrics(self):
+        sink = metrics.InMemorySink()
+        metrics.set_sink(sink)
+        self.addCleanup(metrics.set_sink, None)
+        engine = TourismSearchEngine(self.names, cache_size=0)
+        for query in self.queries:
+            engine.search(query)
+        counters = sink.snapshot()['counters']
+        self.assertEqual(sum(v for k, v in counters.items() if k.startswith('engine.plan.levenshtein.')),
+                         len(self.queries))
+        self.assertEqual(sum(v for k, v in counters.items() if k.startswith('engine.plan.ngram.')),
+                         len(self.queries))
+
+    def test_calibrate_planner(self):
+        engine = TourismSearchEngine(self.names, cache_size=0)
+        expected = [engine.search(q) for q in self.queries]
+        model = engine.calibrate_planner(self.queries[:10])
+        self.assertIs(engine.planner.cost_model, model)
+        self.assertGreater(model.distance_call, 0)
+        self.assertGreater(model.ngram_score, 0)
+        self.assertTrue(model.bk_visit_fraction)
+        self.assertEqual([engine.search(q) for q in self.queries], expected)
+
+    def test_calibrate_planner_at_radius_zero(self):
+        engine = TourismSearchEngine(self.names, cache_size=0)
+        model = engine.calibrate_planner(self.queries[:10], radius=0)
+        self.assertEqual(model.bk_fraction_scale, 1.0)
+        self.assertTrue(all(radius == 0 for radius, _ in model.bk_visit_fraction))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Unit Tests for Semi-Global Bit-Parallel Matching
+
+This module checks the multi-pattern streaming matcher against a plain dynamic
+programming reference, and the engine's free-text location search.
+"""
+
+import unittest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from algorithms.bit_parallel import SemiGlobalMatcher, find_approximate
+from algorithms.levenshtein import levenshtein_distance
+from use_cases.tourism.search import TourismSearchEngine
+
+
+def semi_global_scores(pattern, text):
+    """Distance of the best match of `pattern` ending at each text position"""
+    previous = list(range(len(pattern) + 1))
+    scores = []
+    for char in text:
+        current = [0]
+        for i in range(1, len(pattern) + 1):
+            current.append(min(previous[i] + 1, current[i - 1] + 1,
+                               previous[i - 1] + (pattern[i - 1] != char)))
+        scores.append(current[-1])
+        previous = current
+    return scores
+
+
+def best_run_ends(scores, max_distance):
+    """(end, distance) of the lowest-distance end of every run within max_distance"""
+    ends = []
+    j = 0
+    while j < len(scores):
+        if scores[j] > max_distance:
+            j += 1
+            continue
+        best = j
+        while j < len(scores) and scores[j] <= max_distance:
+            if scores[j] < scores[best]:
+                best = j
+            j += 1
+        ends.append((best + 1, scores[best]))
+    return ends
+
+
+class TestSemiGlobalMatcher(unittest.TestCase):
+    def test_finds_mentions(self):
+        text = "we stayed near punta blanka beach"
+        matches = find_approximate(["punta blanca", "la habana"], text, 1)
+        self.assertEqual(matches, [(0, 15, 27, 1)])
+        self.assertEqual(text[15:27], "punta blanka")
+
+    def test_matches_reference(self):
+        random.seed(3)
+        for _ in range(200):
+            patterns = ["".join(random.choice("abc") for _ in range(random.randint(1, 9)))
+                        for _ in range(random.randint(1, 8))]
+            text = "".join(random.choice("abcd") for _ in range(random.randint(0, 40)))
+            k = random.randint(0, 2)
+            expected = sorted((p, end, d) for p, pattern in enumerate(patterns)
+                              for end, d in best_run_ends(semi_global_scores(pattern, text), k))
+            found = find_approximate(patterns, text, k)
+            self.assertEqual(sorted((p, end, d) for p, _, end, d in found), expected)
+            for p, start, end, d in found:
+                self.assertEqual(levenshtein_distance(patterns[p], text[start:end]), d)
+
+    def test_streamed_chunks_match_whole_text(self):
+        random.seed(5)
+        patterns = ["havana", "varadero", "trinidad", "vinales", "cienfuegos"]
+        words = patterns + ["the", "bus", "to", "hotel", "beach", "havanna", "trinidat"]
+        text = " ".join(random.choice(words) for _ in range(300))
+        chunks = [text[i:i + 17] for i in range(0, len(text), 17)]
+        self.assertEqual(find_approximate(patterns, chunks, 1), find_approximate(patterns, text, 1))
+
+    def test_padding_does_not_change_results(self):
+        patterns = ["cayo", "punta", "la habana", "saint george's anglican church"]
+        text = "from cayo coco to la havanna past saint georges anglican church"
+        unpadded = SemiGlobalMatcher(patterns, 2, max_padding=0)
+        found = unpadded.feed(text) + unpadded.finish()
+        self.assertEqual(find_approximate(patterns, text, 2), sorted(found, key=lambda x: (x[2], x[0])))
+        self.assertEqual(len(SemiGlobalMatcher(patterns, 2, max_padding=100).blocks), 1)
+
+    def test_empty_pattern_rejected(self):
+        with self.assertRaises(ValueError):
+            SemiGlobalMatcher(["", "havana"], 1)
+
+
+class TestFindInText(unittest.TestCase):
+    def test_engine_mentions(self):
+        engine = TourismSearchEngine(["Punta Blanca", "La Habana", "Matanzas", "Cayo"])
+        text = "We stayed near Punta-Blanka beach, then drove to La Havana."
+        self.assertEqual(engine.find_in_text(text), [
+            ("Punta Blanca", 15, 27, 1),
+            ("La Habana", 49, 58, 1),
+        ])
+        self.assertEqual(engine.find_in_text(["We stayed near Punta-Bla", "nka beach"]),
+                         [("Punta Blanca", 15, 27, 1)])
+
+    def test_engine_reuses_compiled_names(self):
+        engine = TourismSearchEngine(["Punta Blanca", "La Habana", "Matanzas", "Cayo"])
+        text = "From La Havana to Matanzaz"
+        first = engine.find_in_text(text)
+        matcher = engine._state.get_text_matcher(1, 4)[1]
+        self.assertEqual(engine.find_in_text(text), first)
+        self.assertIs(engine._state.get_text_matcher(1, 4)[1], matcher)
+        engine.add_locations(["Trinidad"])
+        self.assertEqual(engine.find_in_text(text + " and Trinidat")[-1], ("Trinidad", 31, 38, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
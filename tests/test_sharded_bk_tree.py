@@ -0,0 +1,54 @@
+"""
+Unit Tests for the Sharded BK-Tree Forest
+
+This module checks that length- and hash-partitioned forests, searched serially or over
+a process pool, return exactly what a single BK-tree returns.
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from optimizations.sharded_bk_tree import ShardedBKForest
+from optimizations.bk_tree import BKTree
+from optimizations.corpus_stream import iter_corpus
+from algorithms.levenshtein import levenshtein_distance
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+QUERIES = ["Perla Marna", "Mazora", "Calle 10", "Bohio Cabarte", "La", "Estacion de Policia"]
+
+
+class TestShardedBKForest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.names = list(iter_corpus(DATA_FILE))
+        cls.tree = BKTree(cls.names, levenshtein_distance)
+
+    def expected(self, query, k):
+        return sorted(self.tree.search(query, k), key=lambda x: (x[1], x[0]))
+
+    def test_length_shards_match_single_tree(self):
+        forest = ShardedBKForest(self.names, levenshtein_distance, n_shards=6)
+        self.assertEqual(sum(map(len, forest.shard_words)), len(self.names))
+        for query in QUERIES:
+            for k in (0, 1, 2):
+                self.assertEqual(forest.search(query, k), self.expected(query, k))
+
+    def test_length_shards_are_skipped(self):
+        forest = ShardedBKForest(self.names, levenshtein_distance, n_shards=6)
+        self.assertLess(len(forest.shards_for("Mazora", 1)), len(forest.shards))
+        for (lo, hi), words in zip(forest.ranges, forest.shard_words):
+            self.assertTrue(all(lo <= len(w) <= hi for w in words))
+
+    def test_hash_shards_over_pool(self):
+        forest = ShardedBKForest(self.names, levenshtein_distance, n_shards=4, partition='hash')
+        with forest.pool(n_jobs=2) as pool:
+            results = pool.search_many(QUERIES, 2)
+            self.assertEqual(pool.search("Mazora", 1), self.expected("Mazora", 1))
+        self.assertEqual(results, [self.expected(q, 2) for q in QUERIES])
+
+
+if __name__ == "__main__":
+    unittest.main()
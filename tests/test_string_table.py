@@ -0,0 +1,158 @@
+"""
+Unit Tests for the Compact String Table
+
+This module checks the in-memory and memory-mapped string table, the id-keyed
+sub-indexes, and that an engine built on the table answers like one built from strings.
+"""
+
+import unittest
+import tempfile
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from optimizations.string_table import StringTable
+from optimizations.bk_tree import BKTree
+from algorithms.levenshtein import levenshtein_distance
+from techniques.ngram_search import NGramSearch
+from techniques.phonetic_search import PhoneticSearch
+from use_cases.tourism.search import TourismSearchEngine, normalize_location
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+NAMES = ["La Habana", "Punta Blanca", "Saint George's Anglican Church", "Autopista a Pinar del Río", ""]
+
+
+class TestStringTable(unittest.TestCase):
+    def test_round_trip(self):
+        table = StringTable(NAMES, normalized=normalize_location)
+        self.assertEqual(len(table), len(NAMES))
+        self.assertEqual(list(table), NAMES)
+        self.assertEqual([table.normalized(i) for i in range(len(table))],
+                         [normalize_location(n) for n in NAMES])
+        self.assertEqual(table.append("Playa Girón"), len(NAMES))
+
+    def test_without_normalized_column(self):
+        table = StringTable(NAMES)
+        self.assertFalse(table.has_normalized)
+        self.assertEqual(table.normalized(1), "Punta Blanca")
+
+    def test_save_and_open(self):
+        table = StringTable(NAMES, normalized=normalize_location)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "names.fzst")
+            table.save(path)
+            mapped = StringTable.open(path)
+            self.assertEqual(list(mapped), NAMES)
+            self.assertEqual(mapped.normalized(3), "autopista a pinar del río")
+            with self.assertRaises(TypeError):
+                mapped.append("x")
+            grown = mapped.copy()
+            grown.append("Playa Girón")
+            self.assertEqual(grown[len(NAMES)], "Playa Girón")
+            mapped.close()
+
+    def test_open_rejects_other_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "names.txt")
+            with open(path, 'wb') as f:
+                f.write(b"La Habana\n" * 10)
+            with self.assertRaises(ValueError):
+                StringTable.open(path)
+
+    def test_open_rejects_truncated_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "names.fzst")
+            StringTable(NAMES, normalized=normalize_location).save(path)
+            size = os.path.getsize(path)
+            for keep in (size - 1, 40, 10):
+                with open(path, 'r+b') as f:
+                    f.truncate(keep)
+                with self.assertRaises(ValueError):
+                    StringTable.open(path)
+
+
+class TestKeyedIndexes(unittest.TestCase):
+    def setUp(self):
+        with open(DATA_FILE, encoding="utf-8") as f:
+            self.names = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+        self.table = StringTable(self.names)
+        self.ids = range(len(self.table))
+
+    def test_bk_tree_stores_ids(self):
+        by_string = BKTree(self.names, levenshtein_distance)
+        by_id = BKTree(self.ids, levenshtein_distance, key=self.table.__getitem__)
+        for query in ["Havana", "Punta Blanka", "Matanzaz"]:
+            self.assertEqual(sorted(by_string.search(query, 2)),
+                             sorted((self.table[i], d) for i, d in by_id.search(query, 2)))
+
+    def test_bk_tree_finds_ids(self):
+        tree = BKTree(self.ids, levenshtein_distance, key=self.table.__getitem__)
+        self.assertEqual(tree.find(self.names[3]), 3)
+        self.assertIsNone(tree.find(self.names[3] + "x"))
+        tree.remove(self.names[3])
+        self.assertIsNone(tree.find(self.names[3]))
+
+    def test_ngram_and_phonetic_store_ids(self):
+        for cls in (NGramSearch, PhoneticSearch):
+            by_string = cls(self.names)
+            by_id = cls(self.ids, key=self.table.__getitem__)
+            for query in ["Havana", "Punta Blanka", "Santa Klara"]:
+                self.assertEqual(by_string.search(query),
+                                 [(self.table[i], s) for i, s in by_id.search(query)])
+
+    def test_flattened_indexes_answer_alike(self):
+        tree = BKTree(self.ids, levenshtein_distance, key=self.table.__getitem__)
+        tree.remove(self.names[5])
+        ngram = NGramSearch(self.ids, key=self.table.__getitem__)
+        phonetic = PhoneticSearch(self.ids, key=self.table.__getitem__)
+        restored = (
+            BKTree.from_arrays(*tree.to_arrays(), levenshtein_distance, key=self.table.__getitem__),
+            NGramSearch.from_arrays(*ngram.to_arrays(), key=self.table.__getitem__),
+            PhoneticSearch.from_arrays(*phonetic.to_arrays(), key=self.table.__getitem__),
+        )
+        for query in ["Havana", "Punta Blanka", "Santa Klara", self.names[5]]:
+            self.assertEqual(sorted(restored[0].search(query, 2)), sorted(tree.search(query, 2)))
+            self.assertEqual(list(restored[1].ranked(query)), list(ngram.ranked(query)))
+            self.assertEqual(restored[2].search(query), phonetic.search(query))
+        self.assertEqual(restored[1].search("Havana"), ngram.search("Havana"))  # Profiles on demand
+        self.assertEqual(len(restored[1].target_profiles), len(self.names))
+        self.assertEqual(len(restored[2].targets), len(self.names))
+
+
+class TestEngineOnTable(unittest.TestCase):
+    def test_from_table_matches_constructor(self):
+        with open(DATA_FILE, encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip()]
+        engine = TourismSearchEngine(names)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "names.fzst")
+            engine.table.save(path)
+            mapped = TourismSearchEngine.from_table(path)
+            self.assertEqual(mapped.locations, list(dict.fromkeys(names)))  # Duplicates merged
+            for query in ["Punta Blanka", "La Havana", "Saint Gorge"]:
+                self.assertEqual(mapped.search(query), engine.search(query))
+            mapped.add_locations(["Punta Blanco"])
+            self.assertEqual(mapped.search("Punta Blanco")[0][0], "Punta Blanco")
+            mapped.table.close()
+
+    def test_groups_are_keyed_by_row_id(self):
+        engine = TourismSearchEngine(["La Habana", "LA HABANA", "Matanzas"])
+        engine.add_locations(["La-Habana", "Cayo Coco"])
+        engine.remove_locations(["Matanzas"])
+        groups = engine._state.groups
+        # No copy of the corpus strings outside the table
+        self.assertTrue(all(isinstance(rep_id, int) for rep_id in groups))
+        self.assertEqual(groups, {0: [0, 1, 3], 4: [4]})
+
+    def test_readded_form_reuses_indexed_id(self):
+        engine = TourismSearchEngine(["La Habana", "LA HABANA", "Matanzas"])
+        engine.remove_locations(["La Habana", "LA HABANA"])
+        engine.add_locations(["La-Habana"])
+        results = engine.search("La Havana")
+        self.assertEqual([loc for loc, _ in results].count("La-Habana"), 1)
+        self.assertEqual(results[0][0], "La-Habana")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Unit Tests for Threshold-Algorithm Top-k Merging
+
+This module checks the threshold merge against exhaustive scoring, the ranked
+iterators of the phonetic and n-gram techniques against their full searches, and that
+the engine's merged top-k equals summing and sorting every technique's results.
+"""
+
+import unittest
+import random
+import sys
+import os
+from collections import defaultdict
+from itertools import islice
+from jellyfish import soundex, metaphone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from optimizations import instrumentation as metrics
+from optimizations.top_k import threshold_top_k
+from techniques.ngram_search import NGramSearch
+from techniques.phonetic_search import PhoneticSearch
+from use_cases.tourism.search import TourismSearchEngine, normalize_location
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+
+
+def exhaustive_top_k(lists, weights, k, expand=lambda item: [item]):
+    scores = defaultdict(float)
+    for weight, ranked in zip(weights, lists):
+        for item, score in ranked:
+            scores[item] += weight * score
+    combined = [(entry, score) for item, score in scores.items() for entry in expand(item)]
+    return sorted(combined, key=lambda x: (-x[1], x[0]))[:k]
+
+
+class TestThresholdTopK(unittest.TestCase):
+    def test_matches_exhaustive_merge(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            weights = [rng.choice([0.6, 0.3, 0.1, 1.0]) for _ in range(rng.randint(1, 3))]
+            lists = []
+            for _ in weights:
+                items = rng.sample(range(30), rng.randint(0, 15))
+                # Few distinct scores, so ties between items are common
+                ranked = sorted(((i, rng.choice([0.2, 0.5, 0.8, 1.0])) for i in items),
+                                key=lambda x: -x[1])
+                lists.append(ranked)
+            k = rng.randint(0, 8)
+            sources = [(w, ranked, dict(ranked).get) for w, ranked in zip(weights, lists)]
+            self.assertEqual(threshold_top_k(sources, k), exhaustive_top_k(lists, weights, k))
+
+    def test_expanded_entries(self):
+        spellings = {1: ["La Habana", "LA HABANA"], 2: ["Cayo"], 3: ["Matanzas"]}
+        ranked = [(1, 0.9), (2, 0.9), (3, 0.5)]
+        self.assertEqual(
+            threshold_top_k([(1.0, ranked, dict(ranked).get)], 2, expand=spellings.get),
+            [("Cayo", 0.9), ("LA HABANA", 0.9)],
+        )
+
+    def test_stops_early(self):
+        sink = metrics.InMemorySink()
+        metrics.set_sink(sink)
+        self.addCleanup(metrics.set_sink, None)
+        ranked = [(i, 1 - i / 1000) for i in range(1000)]
+        self.assertEqual(threshold_top_k([(1.0, ranked, dict(ranked).get)], 3),
+                         [(0, 1.0), (1, 0.999), (2, 0.998)])
+        self.assertLess(sink.snapshot()['counters']['top_k.sorted_reads'], 10)
+
+
+class TestRankedTechniques(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(DATA_FILE, encoding="utf-8") as f:
+            cls.names = list(dict.fromkeys(normalize_location(line) for line in f if line.strip()))
+        rng = random.Random(11)
+        cls.queries = [q[:-1] + "x" for q in rng.sample(cls.names, 30)] + ["la", "x", ""]
+
+    def test_ngram_ranked_matches_search(self):
+        search = NGramSearch(self.names)
+        for query in self.queries:
+            everything = search.search(query, top_k=len(self.names))
+            self.assertEqual(list(search.ranked(query)), everything)
+            self.assertEqual(list(islice(search.ranked(query), 5)), search.search(query))
+            self.assertEqual(list(search.ranked(query, min_score=0.4)),
+                             [m for m in everything if m[1] >= 0.4])
+
+    def test_phonetic_ranked_matches_full_scan(self):
+        search = PhoneticSearch(self.names)
+        for query in self.queries:
+            processed = search._preprocess(query)
+            codes = {'soundex': soundex(processed), 'metaphone': metaphone(processed)}
+            expected = sorted(
+                ((t['original'], search._calculate_score(codes, t)) for t in search.targets),
+                key=lambda x: (-x[1], x[0]),
+            )
+            expected = [m for m in expected if m[1] >= search.config.min_score]
+            self.assertEqual(list(search.ranked(query)), expected)
+
+    def test_ranked_follows_updates(self):
+        for cls in (NGramSearch, PhoneticSearch):
+            search = cls(["la habana", "matanzas"])
+            list(search.ranked("la havana"))
+            search.add(["la havana"])
+            self.assertEqual(next(search.ranked("la havana"))[0], "la havana")
+            search.remove(["la havana"])
+            self.assertEqual(next(search.ranked("la havana"))[0], "la habana")
+
+
+class TestEngineTopK(unittest.TestCase):
+    def test_engine_matches_exhaustive_merge(self):
+        with open(DATA_FILE, encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip()]
+        engine = TourismSearchEngine(names + ["LA HABANA", "La-Habana"], cache_size=0)
+        state = engine._state
+        rng = random.Random(12)
+        queries = [q[:-1] + "x" for q in rng.sample(names, 30)] + ["La Havana", "la", ""]
+        for query in queries:
+            q = normalize_location(query)
+            lists = [
+                [(word, 1 - dist / 10) for word, dist in engine._bktree_levenshtein(state, q, 2)],
+                state.phonetic.search(q),
+                state.ngram.search(q),
+            ]
+            weights = [engine.weights[name] for name in ('levenshtein', 'phonetic', 'ngram')]
+            for k in (1, 5, 12):
+                self.assertEqual(engine.search(query, max_results=k),
+                                 exhaustive_top_k(lists, weights, k, expand=state.spellings))
+
+
+if __name__ == "__main__":
+    unittest.main()
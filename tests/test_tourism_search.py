@@ -0,0 +1,238 @@
+"""
+Unit Tests for the Tourism Location Search Engine
+
+This module provides unit tests for the hybrid tourism search engine and its
+supporting components (result cache, snapshots).
+"""
+
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from use_cases.tourism.search import TourismSearchEngine, SnapshotError, normalize_location
+from optimizations.query_cache import QueryCache
+from algorithms.levenshtein import levenshtein_distance
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+QUERIES = ["Punta Blanka", "La Havana", "Saint Gorge", "Matanzaz", "Trinidat"]
+LOCATIONS = [
+    "La Habana", "Punta Blanca",
+    "Saint George's Anglican Church",
+    "Autopista a Pinar del Río"
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = QueryCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = QueryCache(max_size=4, ttl=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 5
+        self.assertEqual(cache.get("a"), 1)
+        clock.now = 10
+        self.assertIsNone(cache.get("a"))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['expirations']), (1, 1, 1))
+
+    def test_zero_size_disables(self):
+        cache = QueryCache(max_size=0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+
+class TestTourismSearchEngine(unittest.TestCase):
+    def test_common_misspellings(self):
+        engine = TourismSearchEngine(LOCATIONS)
+        self.assertEqual(engine.search("Punta Blanka")[0][0], "Punta Blanca")
+        self.assertEqual(engine.search("La Havana")[0][0], "La Habana")
+        self.assertEqual(engine.search("Saint Gorge")[0][0], "Saint George's Anglican Church")
+
+    def test_duplicate_locations_are_merged(self):
+        engine = TourismSearchEngine(LOCATIONS + ["La Habana", "la habana", "La Habana", "Las Habanas"])
+        results = engine.search("La Havana", max_results=3)
+        self.assertEqual([loc for loc, _ in results], ["La Habana", "la habana", "Las Habanas"])
+        self.assertEqual(sorted(engine.locations), sorted(LOCATIONS + ["la habana", "Las Habanas"]))
+        self.assertEqual(list(engine.table), engine.locations)  # No orphan rows
+        engine.remove_locations(["La Habana"])
+        self.assertEqual(engine.search("La Havana")[0][0], "la habana")
+
+    def test_normalize_location(self):
+        self.assertEqual(normalize_location("  La   HAVANA "), "la havana")
+        self.assertEqual(normalize_location("Saint-George"), "saint george")
+
+    def test_query_variants_share_cache_entry(self):
+        engine = TourismSearchEngine(LOCATIONS)
+        first = engine.search("La Havana")
+        second = engine.search("la havana ")
+        self.assertEqual(first, second)
+        stats = engine.cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_warm_cache(self):
+        engine = TourismSearchEngine(LOCATIONS, warm_queries=["La Havana", "Punta Blanka"])
+        engine.search("punta blanka")
+        self.assertEqual(engine.cache_stats()['hits'], 1)
+
+    def test_add_locations_invalidates_cache(self):
+        engine = TourismSearchEngine(LOCATIONS)
+        engine.search("La Havana")
+        engine.add_locations(["La Havana Vieja"])
+        self.assertEqual(len(engine.cache), 0)
+        self.assertIn("La Havana Vieja", [loc for loc, _ in engine.search("La Havana")])
+
+    def test_incremental_updates_match_rebuild(self):
+        engine = TourismSearchEngine(LOCATIONS[:2])
+        engine.add_locations(LOCATIONS[2:] + ["Playa Girón"])
+        engine.remove_locations(["Playa Girón", "Unknown Place"])
+        rebuilt = TourismSearchEngine(LOCATIONS)
+        for query in ["Punta Blanka", "Saint Gorge", "La Havana", "Playa Giron"]:
+            self.assertEqual(engine.search(query), rebuilt.search(query))
+        self.assertEqual(sorted(engine.locations), sorted(LOCATIONS))
+
+    def test_removed_location_can_be_added_back(self):
+        engine = TourismSearchEngine(LOCATIONS)
+        engine.remove_locations(["La Habana"])
+        self.assertNotIn("La Habana", [loc for loc, _ in engine.search("La Havana")])
+        engine.add_locations(["La Habana"])
+        self.assertEqual(engine.search("La Havana")[0][0], "La Habana")
+
+    def test_updates_do_not_affect_pinned_snapshot(self):
+        engine = TourismSearchEngine(LOCATIONS)
+        snapshot = engine._state
+        engine.add_locations(["Punta Blanco"])
+        engine.remove_locations(["Punta Blanca"])
+        matches = snapshot.bk_tree.search("punta blanca", 0)
+        self.assertEqual([(snapshot.table.normalized(i), d) for i, d in matches], [("punta blanca", 0)])
+        self.assertEqual(len(snapshot.bk_tree.search("punta blanco", 0)), 0)
+        self.assertEqual(len(snapshot.ngram.target_profiles), len(LOCATIONS))
+
+    def test_updates_patch_built_indexes(self):
+        engine = TourismSearchEngine(LOCATIONS + ["Playa Girón", "Cayo Coco"])
+        engine.search("La Havana")  # Builds the postings, the phonetic groups and the length index
+        engine.add_locations(["Playa Larga", "Cayo Largo del Sur", "Punta Blanco"])
+        engine.remove_locations(["Cayo Coco", "Punta Blanca"])
+        state = engine._state
+        patched = (dict(state.ngram.postings()), state.phonetic.groups(), state.length_index)
+        state.ngram._postings = state.phonetic._groups = state.length_index = None
+        postings = state.ngram.postings()
+        self.assertEqual({g: sorted(e) for g, e in patched[0].items()}, {g: sorted(e) for g, e in postings.items()})
+        self.assertEqual(patched[1], state.phonetic.groups())
+        ids, starts = state.get_length_index()
+        self.assertEqual(patched[2][0].tolist(), ids.tolist())
+        self.assertEqual(patched[2][1][:len(starts)].tolist(), starts.tolist())
+
+    def test_prefix_session(self):
+        engine = TourismSearchEngine(LOCATIONS)
+        session = engine.prefix_session()
+        results = session.type("Saint Geo")
+        self.assertEqual(results[0], ("Saint George's Anglican Church", 0))
+        self.assertEqual(session.type("x")[0][0], "Saint George's Anglican Church")
+        self.assertEqual(session.backspace(), results)
+        self.assertEqual(session.update("Punta Blank")[0], ("Punta Blanca", 1))
+        self.assertEqual(session.query, "punta blank")
+
+    def test_prefix_session_collapses_whitespace(self):
+        engine = TourismSearchEngine(LOCATIONS)
+        expected = engine.prefix_session().type("la hab")
+        session = engine.prefix_session()
+        self.assertEqual(session.update("  La  Hab"), expected)
+        self.assertEqual(session.query, "la hab")
+        session = engine.prefix_session()
+        session.type(" La ")
+        self.assertEqual(session.type(" \tHab"), expected)
+        self.assertEqual(session.query, "la hab")
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.directory = os.path.join(self.tmp, "snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip(self):
+        engine = TourismSearchEngine.from_corpus(DATA_FILE)
+        engine.remove_locations(["La Habana"])
+        engine.weights['ngram'] = 0.2
+        engine.save(self.directory)
+        loaded = TourismSearchEngine.load(self.directory, corpus=DATA_FILE)
+        self.assertEqual(loaded.weights, engine.weights)
+        self.assertEqual(loaded.locations, engine.locations)
+        for query in QUERIES:
+            self.assertEqual(loaded.search(query), engine.search(query))
+        loaded.add_locations(["La Habana"])
+        self.assertEqual(loaded.search("La Havana")[0][0], "La Habana")
+
+    def test_corrupt_snapshot_is_rebuilt(self):
+        TourismSearchEngine.from_corpus(DATA_FILE).save(self.directory)
+        with open(os.path.join(self.directory, "bk_items.bin"), 'r+b') as f:
+            f.write(b"\xff" * 8)
+        with self.assertRaises(SnapshotError):
+            TourismSearchEngine.load(self.directory)
+        rebuilt = TourismSearchEngine.load(self.directory, corpus=DATA_FILE)
+        fresh = TourismSearchEngine.from_corpus(DATA_FILE)
+        self.assertEqual(rebuilt.search("Punta Blanka"), fresh.search("Punta Blanka"))
+        TourismSearchEngine.load(self.directory)  # The snapshot was rewritten
+
+    def test_truncated_snapshot_without_verification(self):
+        engine = TourismSearchEngine.from_corpus(DATA_FILE)
+        for name in ("strings.fzst", "group_members.bin", "bk_parents.bin", "ngram_postings.bin"):
+            engine.save(self.directory)
+            path = os.path.join(self.directory, name)
+            with open(path, 'r+b') as f:
+                f.truncate(os.path.getsize(path) - 3)
+            with self.assertRaises(SnapshotError):
+                TourismSearchEngine.load(self.directory, verify=False)
+            rebuilt = TourismSearchEngine.load(self.directory, corpus=DATA_FILE, verify=False)
+            self.assertEqual(rebuilt.search("Punta Blanka"), engine.search("Punta Blanka"))
+
+    def test_unimportable_distance_is_rebuilt(self):
+        TourismSearchEngine(LOCATIONS, distance_func=lambda a, b: levenshtein_distance(a, b)).save(self.directory)
+        with self.assertRaises(SnapshotError):
+            TourismSearchEngine.load(self.directory, distance_func=lambda a, b: 0)
+        TourismSearchEngine(LOCATIONS, distance_func=levenshtein_distance).save(self.directory)
+        TourismSearchEngine.load(self.directory, distance_func=levenshtein_distance)
+        with self.assertRaises(SnapshotError):
+            TourismSearchEngine.load(self.directory, distance_func=lambda a, b: levenshtein_distance(a, b))
+
+    def test_stale_snapshot_is_rebuilt(self):
+        corpus = os.path.join(self.tmp, "names.txt")
+        with open(corpus, 'w', encoding='utf-8') as f:
+            f.write("\n".join(LOCATIONS))
+        TourismSearchEngine.from_corpus(corpus).save(self.directory)
+        with open(corpus, 'a', encoding='utf-8') as f:
+            f.write("\nPlaya Girón")
+        engine = TourismSearchEngine.load(self.directory, corpus=corpus)
+        self.assertIn("Playa Girón", engine.locations)
+
+    def test_missing_snapshot(self):
+        with self.assertRaises(SnapshotError):
+            TourismSearchEngine.load(self.directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
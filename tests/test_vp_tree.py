@@ -0,0 +1,80 @@
+"""
+Unit Tests for the Vantage-Point Tree
+
+This module checks range and k-nearest-neighbour queries of the VP-tree against a
+linear scan, for integer and real-valued edit distances and a continuous metric.
+"""
+
+import unittest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from optimizations.vp_tree import VPTree
+from algorithms.levenshtein import levenshtein_distance
+from algorithms.weighted_edit_distance import EditCostModel, SPANISH_CONFUSIONS, cost_matrix_edit_distance
+from rapidfuzz.distance import DamerauLevenshtein
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/openstreetmap/place_names_reduced.txt')
+
+
+def linear_scan(items, distance_func, query):
+    return sorted(((item, distance_func(item, query)) for item in items), key=lambda x: (x[1], x[0]))
+
+
+class TestVPTree(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(DATA_FILE, encoding="utf-8") as f:
+            cls.names = list(dict.fromkeys(line.strip().lower() for line in f if line.strip()))
+        rng = random.Random(7)
+        cls.queries = [q[:-1] + "x" for q in rng.sample(cls.names, 15)] + ["havana", "punta blanka"]
+
+    def check(self, tree, distance_func, radii):
+        for query in self.queries:
+            expected = linear_scan(self.names, distance_func, query)
+            for radius in radii:
+                self.assertEqual(tree.range_search(query, radius),
+                                 [r for r in expected if r[1] <= radius])
+            self.assertEqual(tree.knn(query, 5), expected[:5])
+
+    def test_levenshtein(self):
+        tree = VPTree(self.names, levenshtein_distance)
+        self.check(tree, levenshtein_distance, [0, 1, 2])
+        self.assertGreater(tree.stats['distance_calls_saved'], 0)
+        self.assertEqual(tree.stats['distance_calls'] + tree.stats['distance_calls_saved'],
+                         tree.stats['queries'] * len(self.names))
+
+    def test_damerau_levenshtein(self):
+        self.check(VPTree(self.names, DamerauLevenshtein.distance), DamerauLevenshtein.distance, [1, 2])
+
+    def test_fractional_weights(self):
+        # Substitutions cost 0.5-1 and never more than a deletion plus an insertion, and a
+        # transposition never beats two substitutions, so the distance is a metric
+        model = EditCostModel(insertion=0.75, deletion=0.75, transposition=2.0,
+                              substitution_costs={pair: 0.5 for pair in SPANISH_CONFUSIONS})
+        distance = lambda a, b: cost_matrix_edit_distance(a, b, model)
+        self.check(VPTree(self.names, distance, leaf_size=4), distance, [0.5, 1.25, 2.5])
+
+    def test_continuous_metric(self):
+        rng = random.Random(11)
+        points = [(rng.random(), rng.random()) for _ in range(500)]
+        euclidean = lambda a, b: ((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5
+        tree = VPTree(points, euclidean)
+        for query in [(0.5, 0.5), (0.1, 0.9), (1.2, -0.3)]:
+            expected = linear_scan(points, euclidean, query)
+            self.assertEqual(tree.range_search(query, 0.1), [r for r in expected if r[1] <= 0.1])
+            self.assertEqual(tree.knn(query, 10), expected[:10])
+
+    def test_small_trees(self):
+        self.assertEqual(VPTree([], levenshtein_distance).knn("havana", 3), [])
+        tree = VPTree(["havana", "habana", "havana"], levenshtein_distance)
+        self.assertEqual(len(tree), 2)
+        self.assertEqual(tree.knn("havana", 5), [("havana", 0), ("habana", 1)])
+        self.assertEqual(tree.knn("havana", 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
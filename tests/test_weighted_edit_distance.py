@@ -0,0 +1,67 @@
+"""
+Unit Tests for Weighted Edit Distance with Character-Dependent Costs
+
+This module checks the cost-matrix kernel against the unit-cost Damerau-Levenshtein
+distance and the tourism cost model on typical place-name confusions.
+"""
+
+import math
+import random
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src/')))
+
+from algorithms.weighted_edit_distance import (
+    EditCostModel, cost_matrix_edit_distance, tourism_cost_model, keyboard_adjacent_pairs
+)
+from algorithms.damerau_levenshtein import damerau_levenshtein_distance
+
+
+class TestCostMatrixEditDistance(unittest.TestCase):
+    def test_unit_costs_match_damerau(self):
+        model = EditCostModel()
+        rng = random.Random(5)
+        for _ in range(300):
+            a = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 8)))
+            b = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 8)))
+            self.assertEqual(cost_matrix_edit_distance(a, b, model), damerau_levenshtein_distance(a, b))
+
+    def test_tourism_confusions_are_cheap(self):
+        model = tourism_cost_model()
+        self.assertAlmostEqual(cost_matrix_edit_distance("La Havana", "La Habana", model), 0.5)
+        self.assertAlmostEqual(cost_matrix_edit_distance("Rio", "Río", model), 0.1)
+        self.assertAlmostEqual(cost_matrix_edit_distance("olguin", "holguin", model), 0.5)
+        self.assertAlmostEqual(cost_matrix_edit_distance("Punta Blsnca", "Punta Blanca", model), 0.7)
+        self.assertEqual(cost_matrix_edit_distance("Punta Blxnca", "Punta Blanca", model), 1.0)
+
+    def test_asymmetric_insert_delete(self):
+        model = EditCostModel(insertion_costs={'h': 0.2})
+        self.assertAlmostEqual(cost_matrix_edit_distance("olguin", "holguin", model), 0.2)
+        self.assertAlmostEqual(cost_matrix_edit_distance("holguin", "olguin", model), 1.0)
+
+    def test_bounded_early_exit(self):
+        model = EditCostModel()
+        self.assertEqual(cost_matrix_edit_distance("kitten", "sitting", model, max_cost=3), 3)
+        self.assertTrue(math.isinf(cost_matrix_edit_distance("kitten", "sitting", model, max_cost=2)))
+        self.assertTrue(math.isinf(cost_matrix_edit_distance("a" * 50, "b" * 50, model, max_cost=1)))
+
+    def test_bounded_cheap_transposition(self):
+        # A row can exceed the bound while a transposition from the row before it
+        # brings the next one back under it
+        model = EditCostModel(transposition=0.5)
+        self.assertEqual(cost_matrix_edit_distance("ab", "ba", model), 0.5)
+        self.assertEqual(cost_matrix_edit_distance("ab", "ba", model, max_cost=0.5), 0.5)
+        self.assertAlmostEqual(cost_matrix_edit_distance("xaby", "xbay", model, max_cost=0.6), 0.5)
+        self.assertTrue(math.isinf(cost_matrix_edit_distance("ab", "ba", model, max_cost=0.4)))
+
+    def test_keyboard_pairs(self):
+        pairs = keyboard_adjacent_pairs()
+        self.assertIn(("a", "s"), pairs)
+        self.assertIn(("q", "a"), pairs)
+        self.assertNotIn(("a", "l"), pairs)
+
+
+if __name__ == "__main__":
+    unittest.main()